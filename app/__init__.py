@@ -4,21 +4,49 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate  #  NUEVO
 from config import Config
 from app.database import db
+from app.cache import cache_dashboard
+from app.codigos import generador_codigos
+from app import agenda, cache_equipos, compresion, eventos, imagenes, replicas
+from app.metricas import Metricas
+from app.serializadores import ProveedorJSONRapido
 
 migrate = Migrate()  #  NUEVO
 
-def create_app():
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     CORS(app)
+    if app.config.get('JSON_RAPIDO', True):
+        app.json = ProveedorJSONRapido(app)
+
+    # SQLite en memoria usa una sola conexión fija: las opciones de tamaño
+    # del pool no aplican (se usa en benchmarks y pruebas locales)
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if uri in ('sqlite://', 'sqlite:///:memory:'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            k: v for k, v in app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}).items()
+            if not k.startswith(('pool_size', 'max_overflow', 'pool_timeout'))
+        }
 
     # Inicializar base de datos
     db.init_app(app)
+    replicas.init_app(app)
     migrate.init_app(app, db)  #  NUEVO
+    cache_dashboard.ttl = app.config.get('DASHBOARD_CACHE_TTL', 30)
+    cache_equipos.init_app(app)
+    generador_codigos.init_app(app)
+    agenda.init_app(app)
+    imagenes.init_app(app)
+    eventos.init_app(app)
+    Metricas(app)
+    compresion.init_app(app)
 
     from app.routes import routes
     app.register_blueprint(routes)
 
+    from app.comandos import registrar_comandos
+    registrar_comandos(app)
+
     @app.route('/')
     def home():
         return "Servidor Flask conectado a PostgreSQL correctamente ✅"
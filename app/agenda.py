@@ -0,0 +1,221 @@
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import select
+
+from app.cambios import al_confirmar
+from app.database import db
+from app.models import Equipo
+from app.versiones import leer_versiones
+
+# ============================================================
+# 📅 Agenda de próximos mantenimientos (montículo en memoria)
+# ============================================================
+# Cada proceso mantiene un heap de (proximo_mantenimiento, equipo_id).
+# Las escrituras solo anotan qué equipos cambiaron; la próxima consulta
+# relee esos equipos con un único SELECT ... WHERE id IN (...) y los
+# reinserta. Las entradas viejas quedan en el heap marcadas como obsoletas
+# y se descartan al recorrerlo (o al compactar).
+#
+# Los cambios de otros procesos se detectan con la versión de la tabla
+# equipos que @condicional ya leyó (igual que app/cache_equipos.py): si
+# subió más que los commits propios, escribió otro proceso. No se sabe qué
+# equipos tocó, así que hasta la próxima recarga completa la agenda se
+# responde con la consulta indexada (proximo_mantenimiento <= límite) en
+# vez del heap. Así el cuerpo corresponde siempre al ETag y, con varios
+# workers escribiendo, no se recorre toda la flota en cada petición.
+#
+# Un hilo en segundo plano recarga todo cada cierto tiempo y avisa de los
+# equipos atrasados.
+
+logger = logging.getLogger(__name__)
+
+
+def consulta_agenda(limite):
+    return (
+        select(Equipo.proximo_mantenimiento, Equipo.id, Equipo.codigo, Equipo.nombre)
+        .where(Equipo.proximo_mantenimiento <= limite)
+        .order_by(Equipo.proximo_mantenimiento, Equipo.id)
+    )
+
+
+class AgendaMantenimientos:
+    def __init__(self, intervalo=300):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._heap = []          # (fecha, equipo_id, version)
+        self._vigentes = {}      # equipo_id → (fecha, codigo, nombre, version)
+        self._version = 0
+        self._cargada = False
+        self._pendientes = set()
+        self._hilo = None
+        self._version_tabla = None  # versión de equipos con la que está al día
+        self._propios = 0           # commits propios con equipos desde entonces
+        self._ajena = False         # escribió otro proceso: el heap va atrasado
+
+    # --------------------------------------------------------
+    # Mantenimiento del heap
+    # --------------------------------------------------------
+    def cargar(self):
+        # La versión se lee antes que las filas: si alguien escribe en medio,
+        # la próxima comparación vuelve a recargar (nunca al revés)
+        version_tabla = leer_versiones(['equipos'])[0]
+        filas = db.session.execute(
+            select(Equipo.id, Equipo.codigo, Equipo.nombre, Equipo.proximo_mantenimiento)
+            .where(Equipo.proximo_mantenimiento.isnot(None))
+        ).all()
+        with self._lock:
+            self._version += 1
+            self._vigentes = {f.id: (f.proximo_mantenimiento, f.codigo, f.nombre, self._version) for f in filas}
+            self._heap = [(fecha, id, version) for id, (fecha, _, _, version) in self._vigentes.items()]
+            heapq.heapify(self._heap)
+            self._cargada = True
+            self._version_tabla = version_tabla
+            self._propios = 0
+            self._ajena = False
+
+    def marcar(self, equipo_id=None):
+        """Anota un equipo modificado; sin id, fuerza una recarga completa."""
+        with self._lock:
+            if equipo_id is None:
+                self._cargada = False
+            else:
+                self._pendientes.add(equipo_id)
+
+    def anotar_commit(self):
+        """Un commit propio que subió la versión de equipos."""
+        with self._lock:
+            self._propios += 1
+
+    def _comparar_version(self, version):
+        # Versiones leídas de la réplica pueden ir atrasadas: solo cuenta subir
+        with self._lock:
+            if self._ajena or version is None or self._version_tabla is None or version <= self._version_tabla:
+                return
+            if version - self._version_tabla > self._propios:
+                self._ajena = True
+            else:
+                self._version_tabla = version
+                self._propios = 0
+
+    def _sincronizar(self, version=None):
+        """Aplica los cambios propios; devuelve False si el heap va atrasado."""
+        self._comparar_version(version)
+        with self._lock:
+            cargada, ajena = self._cargada, self._ajena
+            pendientes, self._pendientes = self._pendientes, set()
+        if not cargada:
+            self.cargar()
+            return True
+        if ajena:
+            return False
+        if not pendientes:
+            return True
+
+        filas = db.session.execute(
+            select(Equipo.id, Equipo.codigo, Equipo.nombre, Equipo.proximo_mantenimiento)
+            .where(Equipo.id.in_(pendientes))
+        ).all()
+        encontrados = {f.id: f for f in filas}
+        with self._lock:
+            for equipo_id in pendientes:
+                self._vigentes.pop(equipo_id, None)
+                fila = encontrados.get(equipo_id)
+                if fila is None or fila.proximo_mantenimiento is None:
+                    continue
+                self._version += 1
+                self._vigentes[equipo_id] = (fila.proximo_mantenimiento, fila.codigo, fila.nombre, self._version)
+                heapq.heappush(self._heap, (fila.proximo_mantenimiento, equipo_id, self._version))
+
+            # Compactar cuando las entradas obsoletas dominan el heap
+            if len(self._heap) > 2 * len(self._vigentes) + 64:
+                self._heap = [(f, id, v) for id, (f, _, _, v) in self._vigentes.items()]
+                heapq.heapify(self._heap)
+        return True
+
+    # --------------------------------------------------------
+    # Consultas
+    # --------------------------------------------------------
+    def hasta(self, limite, version=None):
+        """Equipos con próximo mantenimiento <= ``limite``, ordenados por fecha.
+
+        Recorre solo los nodos del heap que cumplen la condición (si un nodo
+        es mayor que el límite, todo su subárbol también lo es), así el costo
+        depende de cuántos equipos vencen y no del tamaño de la flota.
+        ``version`` es la versión de equipos leída para el ETag, si la hay.
+        Si otro proceso escribió desde la última recarga, responde la base.
+        """
+        if not self._sincronizar(version):
+            return [tuple(f) for f in db.session.execute(consulta_agenda(limite))]
+        resultado = []
+        with self._lock:
+            heap, pila = self._heap, [0] if self._heap else []
+            while pila:
+                i = pila.pop()
+                fecha, equipo_id, version = heap[i]
+                if fecha > limite:
+                    continue
+                vigente = self._vigentes.get(equipo_id)
+                if vigente and vigente[3] == version:
+                    resultado.append((fecha, equipo_id, vigente[1], vigente[2]))
+                for hijo in (2 * i + 1, 2 * i + 2):
+                    if hijo < len(heap):
+                        pila.append(hijo)
+        resultado.sort()
+        return resultado
+
+    # --------------------------------------------------------
+    # Hilo de refresco
+    # --------------------------------------------------------
+    def iniciar(self, app):
+        if self.intervalo <= 0 or self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._hilo = threading.Thread(target=self._bucle, args=(app,), name='agenda-mantenimientos', daemon=True)
+        self._hilo.start()
+
+    def _bucle(self, app):
+        evento = threading.Event()
+        while not evento.wait(self.intervalo):
+            try:
+                with app.app_context():
+                    self.cargar()
+                    atrasados = self.hasta(datetime.now().date() - timedelta(days=1))
+                    if atrasados:
+                        logger.warning("%d equipos con mantenimiento atrasado (el más antiguo: %s, %s)",
+                                       len(atrasados), atrasados[0][2], atrasados[0][0])
+                    db.session.remove()
+            except Exception:
+                logger.exception("No se pudo refrescar la agenda de mantenimientos")
+
+
+def obtener_agenda():
+    return current_app.extensions['agenda']
+
+
+@al_confirmar
+def _actualizar_agenda(cambios):
+    agenda = current_app.extensions.get('agenda') if has_app_context() else None
+    if agenda is None:
+        return
+    equipos = [c for c in cambios if c.tabla == 'equipos']
+    if equipos:
+        agenda.anotar_commit()
+    for cambio in equipos:
+        agenda.marcar(cambio.id)
+
+
+def init_app(app):
+    agenda = AgendaMantenimientos(app.config.get('AGENDA_INTERVALO', 300))
+    app.extensions['agenda'] = agenda
+
+    # El hilo arranca con la primera petición, no al importar la app
+    # (así los comandos de consola como "flask db upgrade" no lo lanzan)
+    @app.before_request
+    def _iniciar_agenda():
+        agenda.iniciar(app)
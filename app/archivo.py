@@ -0,0 +1,108 @@
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app.cambios import marcar_cambio
+from app.database import db
+from app.models import Mantenimiento, MantenimientoArchivado
+
+# ============================================================
+# 🗃️ Mantenimientos por año: particiones y archivo
+# ============================================================
+# En PostgreSQL, mantenimientos está particionada por año de fecha
+# (mantenimientos_2025, ..., más mantenimientos_default); las consultas con
+# rango de fecha solo leen las particiones del rango. En otros motores es
+# una tabla común.
+#
+# "flask archivar-mantenimientos" mueve los años viejos a
+# mantenimientos_archivo: la tabla de trabajo queda con los años recientes,
+# el detalle por id sigue disponible y los conteos por mes siguen en
+# mantenimientos_mensuales (que no cambia al archivar). En PostgreSQL la
+# partición del año archivado se elimina entera (sin filas muertas).
+
+PARTICION_DEFAULT = 'mantenimientos_default'
+COLUMNAS = ('id', 'tipo', 'fecha', 'agente', 'descripcion', 'equipo_id')
+
+
+def nombre_particion(anio):
+    return f'mantenimientos_{anio}'
+
+
+def rango_anio(anio):
+    return date(anio, 1, 1), date(anio + 1, 1, 1)
+
+
+def particiones():
+    """Nombres de las particiones de mantenimientos (vacío si no está particionada)."""
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return set()
+    return set(db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('mantenimientos')"
+    )).scalars())
+
+
+def crear_particiones(hasta_anio):
+    """Crea las particiones que falten desde el año actual hasta ``hasta_anio``.
+
+    Si la partición por defecto ya tiene filas de ese año no se puede crear
+    (PostgreSQL lo rechaza): se devuelve en ``omitidas`` para moverlas a mano.
+    """
+    existentes = particiones()
+    if not existentes:
+        return [], []
+    creadas, omitidas = [], []
+    for anio in range(date.today().year, hasta_anio + 1):
+        nombre = nombre_particion(anio)
+        if nombre in existentes:
+            continue
+        desde, hasta = rango_anio(anio)
+        ocupada = db.session.execute(text(
+            f"SELECT 1 FROM {PARTICION_DEFAULT} WHERE fecha >= :desde AND fecha < :hasta LIMIT 1"
+        ), {"desde": desde, "hasta": hasta}).first()
+        if ocupada:
+            omitidas.append(anio)
+            continue
+        db.session.execute(text(
+            f"CREATE TABLE {nombre} PARTITION OF mantenimientos FOR VALUES FROM ('{desde}') TO ('{hasta}')"
+        ))
+        creadas.append(anio)
+    return creadas, omitidas
+
+
+def anios_archivables(antes):
+    """Años con mantenimientos sin archivar anteriores a ``antes`` (ix_mantenimientos_fecha_id)."""
+    primera = db.session.execute(select(func.min(Mantenimiento.fecha))).scalar()
+    if primera is None:
+        return []
+    return list(range(primera.year, antes))
+
+
+def contar_anio(anio):
+    desde, hasta = rango_anio(anio)
+    return db.session.execute(
+        select(func.count()).select_from(Mantenimiento).where(Mantenimiento.fecha >= desde, Mantenimiento.fecha < hasta)
+    ).scalar()
+
+
+def archivar_anio(anio):
+    """Mueve los mantenimientos de ``anio`` al archivo; devuelve cuántos. No hace commit."""
+    desde, hasta = rango_anio(anio)
+    en_rango = (Mantenimiento.fecha >= desde, Mantenimiento.fecha < hasta)
+    columnas = [getattr(Mantenimiento, c) for c in COLUMNAS]
+
+    movidos = db.session.execute(
+        insert(MantenimientoArchivado).from_select(COLUMNAS, select(*columnas).where(*en_rango))
+    ).rowcount
+    if nombre_particion(anio) in particiones():
+        db.session.execute(text(f"DROP TABLE {nombre_particion(anio)}"))
+    # Lo que quede (partición por defecto u otros motores)
+    db.session.execute(delete(Mantenimiento).where(*en_rango).execution_options(synchronize_session=False))
+
+    if movidos:
+        marcar_cambio('mantenimientos', 'archivado')
+    return movidos
+
+
+def esta_archivado(mantenimiento_id):
+    return db.session.get(MantenimientoArchivado, mantenimiento_id) is not None
@@ -0,0 +1,166 @@
+from datetime import datetime
+
+from sqlalchemy import delete, extract, func, select
+
+from app import historial
+from app.cambios import marcar_cambio
+from app.database import db
+from app.models import Equipo, Mantenimiento
+from app.servicios import recalcular_fechas_de
+
+# ============================================================
+# 🗑️ Borrado masivo de equipos y mantenimientos
+# ============================================================
+# Se borra por lista de ids o por filtro con un único DELETE por tabla.
+# Los mantenimientos de los equipos borrados los elimina la base
+# (ON DELETE CASCADE). El commit lo hace el llamador.
+#
+# Un borrado por filtro puede tocar millones de filas: no se traen con
+# RETURNING. Los equipos se cuentan antes (los ids se devuelven solo si no
+# pasan de LIMITE_IDS) y de los mantenimientos se lee solo un agregado
+# por mes, equipo y tipo, que es lo que necesitan el historial y las fechas.
+
+LIMITE_IDS = 10000
+
+
+def _objeto(datos):
+    if not isinstance(datos, dict):
+        raise ValueError("El cuerpo debe ser un objeto JSON")
+    return datos
+
+
+def _ids(datos):
+    ids = datos.get('ids')
+    if ids is None:
+        return None
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise ValueError("ids debe ser una lista de números enteros")
+    if len(ids) > LIMITE_IDS:
+        raise ValueError(f"Se pueden borrar como máximo {LIMITE_IDS} ids por petición")
+    return ids
+
+
+def _fecha(datos, campo):
+    try:
+        return datetime.strptime(datos[campo], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError(f"Formato de fecha inválido en {campo} (use YYYY-MM-DD)")
+
+
+def condiciones_equipos(datos):
+    condiciones = []
+    ids = _ids(_objeto(datos))
+    if ids is not None:
+        condiciones.append(Equipo.id.in_(ids))
+    if datos.get('estado'):
+        condiciones.append(func.lower(Equipo.estado) == str(datos['estado']).lower())
+    if not condiciones:
+        raise ValueError("Indique ids o un filtro (estado)")
+    return condiciones
+
+
+def condiciones_mantenimientos(datos):
+    condiciones = []
+    ids = _ids(_objeto(datos))
+    if ids is not None:
+        condiciones.append(Mantenimiento.id.in_(ids))
+    if datos.get('equipo_id') is not None:
+        if not isinstance(datos['equipo_id'], int) or isinstance(datos['equipo_id'], bool):
+            raise ValueError("equipo_id debe ser un número entero")
+        condiciones.append(Mantenimiento.equipo_id == datos['equipo_id'])
+    if datos.get('tipo'):
+        condiciones.append(Mantenimiento.tipo == datos['tipo'])
+    if datos.get('desde'):
+        condiciones.append(Mantenimiento.fecha >= _fecha(datos, 'desde'))
+    if datos.get('hasta'):
+        condiciones.append(Mantenimiento.fecha <= _fecha(datos, 'hasta'))
+    if not condiciones:
+        raise ValueError("Indique ids o algún filtro (equipo_id, tipo, desde, hasta)")
+    return condiciones
+
+
+def _borrar(modelo, condiciones, *columnas):
+    """DELETE ... RETURNING ``columnas``; sin RETURNING, las lee antes."""
+    if db.session.get_bind().dialect.delete_returning:
+        return db.session.execute(
+            delete(modelo).where(*condiciones).returning(*columnas)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    filas = db.session.execute(select(*columnas).where(*condiciones)).all()
+    db.session.execute(delete(modelo).where(*condiciones).execution_options(synchronize_session=False))
+    return filas
+
+
+def eliminar_equipos(condiciones, por_ids=False):
+    """Devuelve (cantidad, ids); ids es None si el filtro pasó de LIMITE_IDS."""
+    # El resumen mensual no tiene clave foránea: se limpia con el mismo filtro
+    historial.quitar_equipos(select(Equipo.id).where(*condiciones))
+    if not por_ids and db.session.scalar(
+        select(func.count()).select_from(Equipo).where(*condiciones)
+    ) > LIMITE_IDS:
+        cantidad, ids = db.session.execute(
+            delete(Equipo).where(*condiciones).execution_options(synchronize_session=False)
+        ).rowcount, None
+    else:
+        ids = [fila.id for fila in _borrar(Equipo, condiciones, Equipo.id)]
+        cantidad = len(ids)
+    if cantidad:
+        marcar_cambio('equipos', 'eliminado')
+        marcar_cambio('mantenimientos', 'eliminado')
+    return cantidad, ids
+
+
+def eliminar_mantenimientos(condiciones, por_ids=False):
+    if por_ids:
+        # Como mucho LIMITE_IDS filas: se traen con el mismo DELETE
+        filas = _borrar(Mantenimiento, condiciones, Mantenimiento.fecha, Mantenimiento.equipo_id, Mantenimiento.tipo)
+        if filas:
+            historial.ajustar(filas, -1)
+            _actualizar_equipos({fila.equipo_id for fila in filas})
+        return len(filas)
+
+    eliminados, grupos = _borrar_agrupado(condiciones)
+    if not grupos:
+        return 0
+    historial.ajustar_meses(
+        ((f"{int(g.anio):04d}-{int(g.mes):02d}", g.equipo_id, g.tipo), -g.cantidad) for g in grupos
+    )
+    _actualizar_equipos({g.equipo_id for g in grupos})
+    return eliminados
+
+
+def _claves_mes(tabla):
+    return (extract('year', tabla.fecha).label('anio'), extract('month', tabla.fecha).label('mes'),
+            tabla.equipo_id, tabla.tipo)
+
+
+def _borrar_agrupado(condiciones):
+    """DELETE por filtro; devuelve (cantidad, filas (anio, mes, equipo_id, tipo, cantidad))."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Una sola sentencia: el agregado es exactamente lo que se borró,
+        # aunque otra transacción inserte filas que cumplen el filtro
+        borrados = (delete(Mantenimiento).where(*condiciones)
+                    .returning(Mantenimiento.fecha, Mantenimiento.equipo_id, Mantenimiento.tipo)
+                    .cte('borrados'))
+        claves = _claves_mes(borrados.c)
+        grupos = db.session.execute(select(*claves, func.count().label('cantidad')).group_by(*claves)).all()
+        return sum(g.cantidad for g in grupos), grupos
+
+    # SQLite: la transacción que leyó es la única que puede escribir hasta el commit
+    claves = _claves_mes(Mantenimiento)
+    grupos = db.session.execute(
+        select(*claves, func.count().label('cantidad')).where(*condiciones).group_by(*claves)
+    ).all()
+    if not grupos:
+        return 0, grupos
+    resultado = db.session.execute(
+        delete(Mantenimiento).where(*condiciones).execution_options(synchronize_session=False)
+    )
+    return resultado.rowcount, grupos
+
+
+def _actualizar_equipos(equipo_ids):
+    recalcular_fechas_de(equipo_ids)
+    marcar_cambio('mantenimientos', 'eliminado')
+    marcar_cambio('equipos', 'actualizado')
@@ -0,0 +1,68 @@
+from sqlalchemy import DDL, column, event, or_, select, table, text
+
+from app.database import db
+from app.models import Equipo
+
+# ============================================================
+# 🔎 Búsqueda de texto en equipos (nombre, marca, modelo)
+# ============================================================
+# Búsqueda por subcadena sin distinguir mayúsculas, con índice:
+#   - PostgreSQL: índice GIN de trigramas (pg_trgm) sobre las tres
+#     columnas; ILIKE '%texto%' lo usa directamente.
+#   - SQLite: tabla FTS5 con tokenizador trigram, sincronizada con
+#     triggers; se consulta con MATCH.
+# Con menos de 3 caracteres no hay trigramas: se recorre la tabla con LIKE.
+
+MINIMO_TRIGRAMA = 3
+
+equipos_busqueda = table('equipos_busqueda', column('rowid'))
+
+# La migración crea lo mismo; estos DDL cubren las bases creadas con
+# create_all (benchmarks y pruebas locales)
+DDL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_equipos_busqueda_trgm ON equipos "
+    "USING gin (nombre gin_trgm_ops, marca gin_trgm_ops, modelo gin_trgm_ops)",
+]
+
+DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS equipos_busqueda USING fts5("
+    "nombre, marca, modelo, content='equipos', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS equipos_busqueda_ai AFTER INSERT ON equipos BEGIN "
+    "INSERT INTO equipos_busqueda(rowid, nombre, marca, modelo) VALUES (new.id, new.nombre, new.marca, new.modelo); END",
+    "CREATE TRIGGER IF NOT EXISTS equipos_busqueda_ad AFTER DELETE ON equipos BEGIN "
+    "INSERT INTO equipos_busqueda(equipos_busqueda, rowid, nombre, marca, modelo) "
+    "VALUES ('delete', old.id, old.nombre, old.marca, old.modelo); END",
+    "CREATE TRIGGER IF NOT EXISTS equipos_busqueda_au AFTER UPDATE OF nombre, marca, modelo ON equipos BEGIN "
+    "INSERT INTO equipos_busqueda(equipos_busqueda, rowid, nombre, marca, modelo) "
+    "VALUES ('delete', old.id, old.nombre, old.marca, old.modelo); "
+    "INSERT INTO equipos_busqueda(rowid, nombre, marca, modelo) VALUES (new.id, new.nombre, new.marca, new.modelo); END",
+]
+
+for sentencia in DDL_POSTGRESQL:
+    event.listen(Equipo.__table__, 'after_create', DDL(sentencia).execute_if(dialect='postgresql'))
+for sentencia in DDL_SQLITE:
+    event.listen(Equipo.__table__, 'after_create', DDL(sentencia).execute_if(dialect='sqlite'))
+event.listen(Equipo.__table__, 'after_drop',
+             DDL("DROP TABLE IF EXISTS equipos_busqueda").execute_if(dialect='sqlite'))
+
+
+def _escapar_like(texto):
+    return texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def condicion_texto(texto):
+    """Condición WHERE para equipos cuyo nombre, marca o modelo contiene ``texto``."""
+    dialecto = db.session.get_bind().dialect.name
+    if dialecto == 'sqlite' and len(texto) >= MINIMO_TRIGRAMA:
+        # Frase entre comillas: el texto se busca tal cual, sin operadores FTS
+        frase = '"' + texto.replace('"', '""') + '"'
+        return Equipo.id.in_(
+            select(equipos_busqueda.c.rowid).where(text("equipos_busqueda MATCH :frase").bindparams(frase=frase))
+        )
+
+    patron = f"%{_escapar_like(texto)}%"
+    return or_(*(
+        columna.ilike(patron, escape='\\')
+        for columna in (Equipo.nombre, Equipo.marca, Equipo.modelo)
+    ))
@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # dependencia opcional: solo para la caché compartida
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# 🗄️ Caché en memoria con expiración (TTL) e invalidación
+# ============================================================
+
+class CacheTTL:
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._datos = {}
+        self._generacion = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave, calcular, version=None, ttl=None):
+        """Devuelve el valor guardado en ``clave`` o lo calcula con ``calcular()``.
+
+        ``version`` identifica los datos de los que sale el valor (p. ej. las
+        versiones de las tablas en la base): una entrada guardada con otra
+        versión no se usa y se reemplaza. Así las escrituras de otros
+        procesos, que no pasan por invalidar(), tampoco dejan valores viejos.
+        ``ttl`` reemplaza al de la caché para este valor.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada and entrada[0] > ahora and entrada[1] == version:
+                self.aciertos += 1
+                return entrada[2]
+            self.fallos += 1
+            generacion = self._generacion
+
+        valor = calcular()
+
+        with self._lock:
+            # Si hubo una invalidación mientras se calculaba, no se guarda
+            if generacion == self._generacion:
+                self._datos[clave] = (ahora + (self.ttl if ttl is None else ttl), version, valor)
+        return valor
+
+    def invalidar(self, *grupos):
+        """Borra las entradas de los grupos indicados (o todas).
+
+        Una clave puede ser un texto o una tupla cuyo primer elemento es el
+        grupo, p. ej. ('mantenimientos-historial', '2024-01', ...).
+        """
+        with self._lock:
+            self._generacion += 1
+            self.invalidaciones += 1
+            if grupos:
+                for clave in list(self._datos):
+                    grupo = clave[0] if isinstance(clave, tuple) else clave
+                    if grupo in grupos:
+                        del self._datos[clave]
+            else:
+                self._datos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+                "ttl": self.ttl,
+            }
+
+
+cache_dashboard = CacheTTL()
+
+
+# ============================================================
+# 🧺 Cachés de registros: LRU local o compartida (Redis)
+# ============================================================
+# Misma interfaz (obtener / guardar / quitar / vaciar / estadisticas) para
+# que quien la use no dependa del backend. Los valores son bytes.
+
+class CacheLRU:
+    """Caché del proceso, acotada a ``maximo`` entradas (expulsa la menos usada)."""
+
+    compartida = False
+
+    def __init__(self, maximo=10000, ttl=300):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()  # clave → (vence, valor), de la menos a la más usada
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.expirados = 0
+
+    def obtener(self, clave):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is not None and entrada[0] <= ahora:
+                del self._datos[clave]
+                self.expirados += 1
+                entrada = None
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, valor, ttl=None):
+        vence = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._datos[clave] = (vence, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+
+    def quitar(self, *claves):
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    def vaciar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "backend": "local",
+                "entradas": len(self._datos),
+                "maximo": self.maximo,
+                "ttl": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "expirados": self.expirados,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
+
+
+class CacheRedis:
+    """Caché compartida por todos los procesos.
+
+    Redis expulsa por su cuenta (maxmemory-policy allkeys-lru) y vence las
+    claves con el TTL. Si Redis falla se responde como un fallo de caché:
+    la petición sigue con la base de datos.
+    """
+
+    compartida = True
+
+    def __init__(self, url, ttl=300, prefijo='cache'):
+        if redis is None:
+            raise RuntimeError("La caché compartida requiere el paquete redis (pip install redis)")
+        self.ttl = ttl
+        self.prefijo = prefijo
+        self._cliente = redis.Redis.from_url(url, socket_timeout=0.5)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.errores = 0
+
+    def _clave(self, clave):
+        return f"{self.prefijo}:{clave}"
+
+    def _contar(self, campo):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def obtener(self, clave):
+        try:
+            valor = self._cliente.get(self._clave(clave))
+        except redis.RedisError:
+            logger.warning("Caché compartida no disponible", exc_info=True)
+            self._contar('errores')
+            valor = None
+        self._contar('aciertos' if valor is not None else 'fallos')
+        return valor
+
+    def guardar(self, clave, valor, ttl=None):
+        try:
+            self._cliente.set(self._clave(clave), valor, ex=max(1, int(self.ttl if ttl is None else ttl)))
+        except redis.RedisError:
+            self._contar('errores')
+
+    def quitar(self, *claves):
+        if not claves:
+            return
+        try:
+            self._cliente.delete(*(self._clave(c) for c in claves))
+        except redis.RedisError:
+            # Una invalidación perdida deja datos viejos hasta el TTL
+            logger.exception("No se pudo invalidar la caché compartida")
+            self._contar('errores')
+
+    def vaciar(self):
+        try:
+            claves = list(self._cliente.scan_iter(match=self._clave('*'), count=1000))
+            for inicio in range(0, len(claves), 1000):
+                self._cliente.delete(*claves[inicio:inicio + 1000])
+        except redis.RedisError:
+            logger.exception("No se pudo vaciar la caché compartida")
+            self._contar('errores')
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            datos = {
+                "backend": "redis",
+                "ttl": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "errores": self.errores,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+            }
+        try:
+            # Expulsiones de todo el servidor Redis (no solo de este prefijo)
+            datos["desalojos"] = self._cliente.info('stats').get('evicted_keys')
+        except redis.RedisError:
+            datos["desalojos"] = None
+        return datos
@@ -0,0 +1,133 @@
+import threading
+
+from flask import current_app, g, has_app_context
+
+from app.cache import CacheLRU, CacheRedis
+from app.cambios import al_confirmar
+from app.database import db
+
+# ============================================================
+# 🧾 Caché del detalle de equipos (GET /equipos/<id>)
+# ============================================================
+# Se guarda el JSON ya serializado de cada equipo. Cada commit que marca
+# cambios de equipos (app/cambios.py) quita esos ids al confirmarse; un
+# cambio masivo (sin id) vacía la caché.
+#
+# Backend local (por defecto): cada worker tiene la suya y no se entera
+# de las escrituras de los demás. Para eso se usa la versión de la tabla
+# equipos que @condicional ya leyó: si subió más que los commits propios,
+# escribió otro proceso y la caché se vacía entera (la versión no dice qué
+# ids cambiaron). Sirve para un solo worker; con varios que escriben casi
+# nunca acierta.
+# Con EQUIPOS_CACHE_URL (redis://...) la caché es compartida y cada
+# escritura quita solo sus ids para todos; es la opción para gunicorn con
+# varios workers (gunicorn.conf.py avisa si falta). Una lectura en curso en
+# otro proceso aún puede reponer un valor viejo, el TTL acota ese caso.
+#
+# Con réplica de lectura, lo leído de la réplica va en entradas aparte que
+# duran como mucho REPLICA_PEGAJOSA_SEGUNDOS y nunca se sirven a quien lee
+# de la primaria (leer lo propio sigue valiendo).
+
+
+class CacheEquipos:
+    def __init__(self, backend, ttl_replica=None):
+        self.backend = backend
+        self.ttl_replica = ttl_replica
+        self._lock = threading.Lock()
+        self._generacion = 0   # sube con cada invalidación
+        self._version = None   # versión de equipos con la que está al día (backend local)
+        self._locales = 0      # commits propios con equipos desde entonces
+        self.vaciados = 0
+
+    @staticmethod
+    def _clave(equipo_id, replica=False):
+        return f"r{equipo_id}" if replica else str(equipo_id)
+
+    @staticmethod
+    def _en_replica():
+        return bool(db.session.info.get('lectura'))
+
+    def obtener(self, equipo_id):
+        """Devuelve (JSON guardado o None, generación para pasarle a guardar())."""
+        if self.backend is None:
+            return None, None
+        if not self.backend.compartida:
+            self._sincronizar(g.get('versiones', {}).get('equipos'))
+        with self._lock:
+            generacion = self._generacion
+        return self.backend.obtener(self._clave(equipo_id, self._en_replica())), generacion
+
+    def guardar(self, equipo_id, cuerpo, generacion):
+        if self.backend is None:
+            return
+        replica = self._en_replica()
+        with self._lock:
+            # Si hubo una invalidación mientras se leía la fila, podría ser vieja
+            if generacion != self._generacion:
+                return
+            self.backend.guardar(self._clave(equipo_id, replica), cuerpo, self.ttl_replica if replica else None)
+
+    def invalidar(self, cambios):
+        ids, todos = set(), False
+        for cambio in cambios:
+            if cambio.tabla == 'equipos':
+                todos = todos or cambio.id is None
+                ids.add(cambio.id)
+        if not ids or self.backend is None:
+            return
+        with self._lock:
+            self._generacion += 1
+            self._locales += 1
+            if todos:
+                self.backend.vaciar()
+            else:
+                self.backend.quitar(*(self._clave(i, r) for i in ids for r in (False, True)))
+
+    def _sincronizar(self, version):
+        # Versiones leídas de la réplica pueden ir atrasadas: solo cuenta subir
+        with self._lock:
+            if version is None or (self._version is not None and version <= self._version):
+                return
+            if self._version is not None and version - self._version > self._locales:
+                self._generacion += 1
+                self.vaciados += 1
+                self.backend.vaciar()
+            self._version = version
+            self._locales = 0
+
+    def estadisticas(self):
+        if self.backend is None:
+            return {"backend": None}
+        datos = self.backend.estadisticas()
+        # Vaciados por escrituras de otros procesos (solo backend local)
+        datos["vaciados"] = self.vaciados
+        return datos
+
+
+def crear_backend(app):
+    tamano = app.config.get('EQUIPOS_CACHE_TAMANO', 10000)
+    if tamano <= 0:
+        return None
+    ttl = app.config.get('EQUIPOS_CACHE_TTL', 300)
+    url = app.config.get('EQUIPOS_CACHE_URL')
+    if url:
+        return CacheRedis(url, ttl, prefijo='equipo')
+    return CacheLRU(tamano, ttl)
+
+
+@al_confirmar
+def _invalidar(cambios):
+    cache = current_app.extensions.get('cache_equipos') if has_app_context() else None
+    if cache is not None:
+        cache.invalidar(cambios)
+
+
+def init_app(app):
+    ttl_replica = None
+    if app.config.get('REPLICA_DATABASE_URI'):
+        ttl_replica = min(app.config.get('EQUIPOS_CACHE_TTL', 300), app.config.get('REPLICA_PEGAJOSA_SEGUNDOS', 5))
+    app.extensions['cache_equipos'] = CacheEquipos(crear_backend(app), ttl_replica)
+
+
+def obtener_cache_equipos():
+    return current_app.extensions['cache_equipos']
@@ -0,0 +1,41 @@
+from collections import namedtuple
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from app.database import db
+
+# ============================================================
+# 📣 Registro de cambios confirmados
+# ============================================================
+# Las rutas de escritura marcan qué cambió antes del commit; cuando la
+# transacción se confirma se avisa a los suscriptores (cachés, etc.).
+# Si hay rollback, los cambios marcados se descartan.
+
+Cambio = namedtuple('Cambio', ['tabla', 'accion', 'id'])
+
+_suscriptores = []
+
+
+def al_confirmar(funcion):
+    """Registra ``funcion(cambios)``; se llama tras cada commit con cambios."""
+    _suscriptores.append(funcion)
+    return funcion
+
+
+def marcar_cambio(tabla, accion=None, id=None):
+    db.session.info.setdefault('cambios', []).append(Cambio(tabla, accion, id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _despues_de_commit(session):
+    cambios = session.info.pop('cambios', None)
+    if not cambios:
+        return
+    for funcion in _suscriptores:
+        funcion(cambios)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _despues_de_rollback(session):
+    session.info.pop('cambios', None)
@@ -0,0 +1,100 @@
+import threading
+
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from app.database import db
+from app.models import Contador, Equipo
+
+# ============================================================
+# 🔢 Generación de códigos de equipo
+# ============================================================
+# PostgreSQL: nextval() sobre equipos_codigo_seq (no bloquea a nadie).
+# Otros motores: se reserva un bloque de números en la tabla contadores
+# con una transacción corta e independiente, y el bloque se reparte en
+# memoria. En ambos casos dos creadores concurrentes nunca reciben el
+# mismo número, así que no hace falta reintentar.
+
+CONTADOR_EQUIPOS = 'equipos'
+
+
+class GeneradorCodigos:
+    def __init__(self, formato='{n}', bloque=20):
+        self.formato = formato
+        self.bloque = bloque
+        self._lock = threading.Lock()
+        self._reservados = {}  # engine → [siguiente, fin)
+
+    def init_app(self, app):
+        self.formato = app.config.get('EQUIPO_CODIGO_FORMATO', self.formato)
+        self.bloque = app.config.get('EQUIPO_CODIGO_BLOQUE', self.bloque)
+
+    def formatear(self, numero):
+        # El formato puede ser una plantilla ("EQ-{n:05d}") o una función
+        if callable(self.formato):
+            return self.formato(numero)
+        return self.formato.format(n=numero)
+
+    def siguiente(self):
+        return self.reservar(1)[0]
+
+    def reservar(self, cantidad):
+        return [self.formatear(n) for n in self._numeros(cantidad)]
+
+    def _numeros(self, cantidad):
+        engine = db.engine
+        if engine.dialect.name == 'postgresql':
+            with engine.connect() as conn:
+                return list(conn.execute(
+                    text("SELECT nextval('equipos_codigo_seq') FROM generate_series(1, :n)"),
+                    {"n": cantidad}
+                ).scalars())
+
+        numeros = []
+        with self._lock:
+            siguiente, fin = self._reservados.get(engine, (0, 0))
+            while len(numeros) < cantidad:
+                if siguiente >= fin:
+                    tamano = max(self.bloque, cantidad - len(numeros))
+                    ultimo = _reservar_bloque(engine, tamano)
+                    siguiente, fin = ultimo - tamano + 1, ultimo + 1
+                tomar = min(fin - siguiente, cantidad - len(numeros))
+                numeros.extend(range(siguiente, siguiente + tomar))
+                siguiente += tomar
+            self._reservados[engine] = (siguiente, fin)
+        return numeros
+
+
+def _reservar_bloque(engine, tamano):
+    """Suma ``tamano`` al contador y devuelve el último número reservado."""
+    with engine.begin() as conn:
+        valor = conn.execute(
+            update(Contador)
+            .where(Contador.nombre == CONTADOR_EQUIPOS)
+            .values(valor=Contador.valor + tamano)
+            .returning(Contador.valor)
+        ).scalar()
+        if valor is not None:
+            return valor
+
+    # Primera vez: el contador arranca en el mayor código numérico existente
+    inicial = max(
+        (int(c) for c in _codigos(engine) if c.isdigit()),
+        default=0
+    )
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(Contador).values(nombre=CONTADOR_EQUIPOS, valor=inicial))
+    except IntegrityError:
+        pass  # otro proceso lo creó primero
+    return _reservar_bloque(engine, tamano)
+
+
+def _codigos(engine):
+    with engine.connect() as conn:
+        yield from conn.execute(
+            select(Equipo.codigo).execution_options(yield_per=1000)
+        ).scalars()
+
+
+generador_codigos = GeneradorCodigos()
@@ -0,0 +1,180 @@
+import gzip
+import time
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.datastructures import MultiDict
+
+from app import archivo, historial
+from app.cambios import marcar_cambio
+from app.database import db
+from app.exportacion import CONSULTAS_EXPORTACION, FORMATOS_EXPORTACION, ejecutar, generar
+from app.importacion import IMPORTADORES, TAMANO_LOTE, FORMATOS, leer_filas
+from app.servicios import TAMANO_LOTE_FECHAS, recalcular_lote
+
+# ============================================================
+# 🛠️ Comandos de consola (flask <comando>)
+# ============================================================
+
+@click.command('importar')
+@click.argument('tabla', type=click.Choice(list(IMPORTADORES)))
+@click.argument('archivo', type=click.File('rb'))
+@click.option('--formato', type=click.Choice(FORMATOS), help='Por defecto se deduce de la extensión.')
+@click.option('--lote', default=TAMANO_LOTE, show_default=True, help='Filas por transacción.')
+@with_appcontext
+def importar(tabla, archivo, formato, lote):
+    """Importa equipos o mantenimientos desde un archivo CSV o NDJSON."""
+    if not formato:
+        formato = 'csv' if archivo.name.lower().endswith('.csv') else 'ndjson'
+
+    reporte = IMPORTADORES[tabla](leer_filas(archivo, formato), max(lote, 1))
+
+    for error in reporte['errores']:
+        click.echo(f"Fila {error['fila']}: {error['error']}", err=True)
+    click.echo(f"{reporte['insertados']} de {reporte['filas']} filas importadas, "
+               f"{len(reporte['errores'])} con errores")
+
+
+@click.command('exportar')
+@click.argument('tabla', type=click.Choice(list(CONSULTAS_EXPORTACION)))
+@click.argument('destino', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('--formato', type=click.Choice(list(FORMATOS_EXPORTACION)),
+              help='Por defecto se deduce de la extensión (sin contar .gz).')
+@click.option('--filtro', 'filtros', multiple=True, metavar='CLAVE=VALOR',
+              help='Parámetro del listado: estado=Activo, orden=-nombre, fields=id,nombre, archivados=1... '
+                   '(se puede repetir).')
+@with_appcontext
+def exportar(tabla, destino, formato, filtros):
+    """Exporta equipos o mantenimientos a CSV o XLSX ("-" escribe en la salida estándar).
+
+    Si el destino termina en .gz se comprime con gzip mientras se escribe.
+    """
+    args = MultiDict()
+    for filtro in filtros:
+        clave, separador, valor = filtro.partition('=')
+        if not separador:
+            raise click.BadParameter(f"se esperaba CLAVE=VALOR: {filtro}", param_hint='--filtro')
+        args.add(clave, valor)
+
+    comprimir = destino.lower().endswith('.gz')
+    if not formato:
+        base = destino[:-3] if comprimir else destino
+        formato = 'xlsx' if base.lower().endswith('.xlsx') else 'csv'
+    try:
+        campos, consultas = CONSULTAS_EXPORTACION[tabla](args)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--filtro')
+
+    filas = 0
+
+    def contar(resultado):
+        nonlocal filas
+        for fila in resultado:
+            filas += 1
+            yield fila
+
+    with click.open_file(destino, 'wb') as archivo_destino:
+        salida = gzip.GzipFile(fileobj=archivo_destino, mode='wb') if comprimir else archivo_destino
+        for parte in generar(formato, campos, contar(ejecutar(consultas)), tabla):
+            salida.write(parte.encode() if isinstance(parte, str) else parte)
+        if comprimir:
+            salida.close()
+    click.echo(f"{filas} filas exportadas a {destino}", err=True)
+
+
+@click.command('reconstruir-historial')
+@with_appcontext
+def reconstruir_historial():
+    """Recalcula la tabla mantenimientos_mensuales desde cero."""
+    filas = historial.reconstruir()
+    # Sube la versión de mantenimientos: ETags, caché del dashboard y /eventos
+    # dejan de servir el historial anterior (las fechas de equipos no cambian)
+    marcar_cambio('mantenimientos', 'actualizado')
+    db.session.commit()
+    click.echo(f"Historial mensual reconstruido: {filas} filas")
+
+
+@click.command('recalcular-fechas')
+@click.option('--dry-run', 'simular', is_flag=True, help='Solo muestra las diferencias, no escribe.')
+@click.option('--lote', default=TAMANO_LOTE_FECHAS, show_default=True, help='Equipos por transacción.')
+@click.option('--hoy', type=click.DateTime(formats=['%Y-%m-%d']), help='Fecha de referencia (por defecto, hoy).')
+@click.option('--mostrar', default=20, show_default=True, help='Diferencias a listar en --dry-run.')
+@with_appcontext
+def recalcular_fechas(simular, lote, hoy, mostrar):
+    """Recalcula último y próximo mantenimiento de todos los equipos."""
+    hoy = hoy.date() if hoy else datetime.now().date()
+    inicio = time.perf_counter()
+    desde, revisados, corregidos, mostrados = 0, 0, 0, 0
+
+    while True:
+        desde, cantidad, diferencias = recalcular_lote(desde, hoy, max(lote, 1), aplicar=not simular)
+        if desde is None:
+            break
+        revisados += cantidad
+        corregidos += len(diferencias)
+
+        if simular:
+            db.session.rollback()
+            for d in diferencias[:max(mostrar - mostrados, 0)]:
+                click.echo(f"equipo {d.id}: último {d.ultimo_antes} → {d.ultimo}, "
+                           f"próximo {d.proximo_antes} → {d.proximo}")
+                mostrados += 1
+        else:
+            if diferencias:
+                marcar_cambio('equipos', 'actualizado')
+            db.session.commit()
+
+        duracion = time.perf_counter() - inicio
+        click.echo(f"{revisados} equipos revisados, {corregidos} con diferencias "
+                   f"({revisados / duracion:,.0f} equipos/s)", err=True)
+
+    duracion = time.perf_counter() - inicio
+    accion = "a corregir" if simular else "corregidos"
+    click.echo(f"{revisados} equipos revisados, {corregidos} {accion} en {duracion:.1f} s "
+               f"({revisados / duracion if duracion else 0:,.0f} equipos/s)")
+
+
+@click.command('archivar-mantenimientos')
+@click.option('--antes', type=int,
+              help='Archiva los años anteriores a este (por defecto: año actual - MANTENIMIENTOS_ANIOS_ACTIVOS).')
+@click.option('--dry-run', 'simular', is_flag=True, help='Solo muestra cuántos mantenimientos se archivarían.')
+@with_appcontext
+def archivar_mantenimientos(antes, simular):
+    """Mueve los años viejos de mantenimientos a mantenimientos_archivo (un año por transacción)."""
+    actual = datetime.now().year
+    if antes is None:
+        antes = actual - current_app.config.get('MANTENIMIENTOS_ANIOS_ACTIVOS', 2)
+    if antes > actual:
+        # Solo años ya cerrados: lo archivado nunca es "este mes" ni próximo
+        raise click.BadParameter(f"solo se pueden archivar años anteriores a {actual}", param_hint='--antes')
+
+    total = 0
+    for anio in archivo.anios_archivables(antes):
+        if simular:
+            cantidad = archivo.contar_anio(anio)
+        else:
+            cantidad = archivo.archivar_anio(anio)
+            db.session.commit()
+        total += cantidad
+        click.echo(f"{anio}: {cantidad} mantenimientos {'a archivar' if simular else 'archivados'}")
+
+    if not simular:
+        # PostgreSQL: particiones para el año en curso y el siguiente
+        creadas, omitidas = archivo.crear_particiones(actual + 1)
+        db.session.commit()
+        for anio in creadas:
+            click.echo(f"Partición {archivo.nombre_particion(anio)} creada")
+        for anio in omitidas:
+            click.echo(f"No se creó {archivo.nombre_particion(anio)}: {archivo.PARTICION_DEFAULT} "
+                       f"ya tiene mantenimientos de {anio}", err=True)
+    click.echo(f"Total: {total} mantenimientos {'a archivar' if simular else 'archivados'} (años < {antes})")
+
+
+def registrar_comandos(app):
+    app.cli.add_command(importar)
+    app.cli.add_command(exportar)
+    app.cli.add_command(reconstruir_historial)
+    app.cli.add_command(recalcular_fechas)
+    app.cli.add_command(archivar_mantenimientos)
@@ -0,0 +1,55 @@
+import gzip
+import zlib
+
+from flask import request
+
+# ============================================================
+# 🗜️ Compresión gzip de respuestas grandes
+# ============================================================
+# Se comprimen las respuestas JSON / NDJSON / texto que superan
+# COMPRESION_MINIMA bytes, si el cliente acepta gzip. Las respuestas en
+# streaming (NDJSON) se comprimen al vuelo, sin juntarlas en memoria.
+
+TIPOS_COMPRIMIBLES = ('application/json', 'application/x-ndjson', 'text/plain', 'text/csv')
+
+
+def _comprimir_flujo(partes, nivel):
+    compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)  # 31 → formato gzip
+    for parte in partes:
+        if isinstance(parte, str):
+            parte = parte.encode()
+        datos = compresor.compress(parte)
+        if datos:
+            yield datos
+    yield compresor.flush()
+
+
+def init_app(app):
+    minima = app.config.get('COMPRESION_MINIMA', 1024)
+    nivel = app.config.get('COMPRESION_NIVEL', 6)
+    if minima is None or minima < 0:
+        return
+
+    @app.after_request
+    def _comprimir(respuesta):
+        if (respuesta.status_code != 200
+                or 'Content-Encoding' in respuesta.headers
+                or respuesta.mimetype not in TIPOS_COMPRIMIBLES
+                or request.method == 'HEAD'):
+            return respuesta
+        respuesta.vary.add('Accept-Encoding')
+        if 'gzip' not in request.accept_encodings:
+            return respuesta
+
+        if respuesta.is_streamed:
+            if respuesta.direct_passthrough:
+                return respuesta
+            respuesta.response = _comprimir_flujo(respuesta.response, nivel)
+            respuesta.headers.pop('Content-Length', None)
+        else:
+            datos = respuesta.get_data()
+            if len(datos) < minima:
+                return respuesta
+            respuesta.set_data(gzip.compress(datos, nivel))
+        respuesta.headers['Content-Encoding'] = 'gzip'
+        return respuesta
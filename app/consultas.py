@@ -0,0 +1,138 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import exists, func, select
+
+from app.models import Equipo, Mantenimiento, MantenimientoArchivado
+
+# ============================================================
+# 🧾 Consultas del dashboard y de fechas de mantenimiento
+# ============================================================
+# Todas las condiciones se escriben como rangos sobre columnas indexadas
+# (nada de extract()/to_char() sobre la columna), así el motor puede usar
+# los índices declarados en app/models.py (y, en PostgreSQL, descartar las
+# particiones anuales que no tocan).
+#
+# Los años archivados (mantenimientos_archivo) son todos anteriores al año
+# en curso: cuentan en los totales y como último mantenimiento de un equipo
+# sin mantenimientos recientes, pero nunca como próximo ni como "este mes".
+
+
+def rango_del_mes(dia):
+    inicio = date(dia.year, dia.month, 1)
+    return inicio, inicio + relativedelta(months=1)
+
+
+def consulta_estados_equipos():
+    # Conteo por estado: un recorrido del índice ix_equipos_estado_id
+    return select(Equipo.estado, func.count().label('cantidad')).group_by(Equipo.estado)
+
+
+def resumir_estados(filas):
+    conteos = {estado: cantidad for estado, cantidad in filas}
+    return {
+        "total": sum(conteos.values()),
+        "activos": conteos.get("Activo", 0),
+        "inactivos": conteos.get("Inactivo", 0),
+        "equipos_en_mantenimiento": sum(
+            cantidad for estado, cantidad in conteos.items()
+            if estado and estado.lower() == "en mantenimiento"
+        ),
+    }
+
+
+def _contar(*condiciones):
+    return select(func.count()).select_from(Mantenimiento).where(*condiciones).scalar_subquery()
+
+
+def consulta_resumen_mantenimientos(hoy):
+    # Tres conteos por rango de fecha en una sola ida a la base; el archivo
+    # se cuenta una vez y suma a total y atrasados
+    inicio_mes, inicio_siguiente = rango_del_mes(hoy)
+    archivados = select(func.count().label('cantidad')).select_from(MantenimientoArchivado).subquery()
+    return select(
+        (_contar() + archivados.c.cantidad).label('total'),
+        _contar(Mantenimiento.fecha >= inicio_mes, Mantenimiento.fecha < inicio_siguiente).label('este_mes'),
+        (_contar(Mantenimiento.fecha < hoy) + archivados.c.cantidad).label('atrasados'),
+    ).select_from(archivados)
+
+
+def resumir_mantenimientos(fila):
+    return {
+        "total": fila.total,
+        "este_mes": fila.este_mes,
+        "atrasados": fila.atrasados
+    }
+
+
+def consulta_equipos_sin_mantenimiento():
+    return select(Equipo.id, Equipo.nombre, Equipo.codigo).where(
+        ~exists().where(Mantenimiento.equipo_id == Equipo.id),
+        ~exists().where(MantenimientoArchivado.equipo_id == Equipo.id),
+    ).order_by(Equipo.id)
+
+
+def listar_equipos_sin_mantenimiento(filas):
+    return [{"id": e.id, "nombre": e.nombre, "codigo": e.codigo} for e in filas]
+
+
+def listar_historial(filas):
+    return [{"mes": fila.mes, "cantidad": int(fila.cantidad)} for fila in filas]
+
+
+def consulta_proximos(limite):
+    # Rango sobre ix_equipos_proximo_mantenimiento (proximo, id)
+    # Mismas columnas y orden que las entradas de la agenda en memoria
+    return select(Equipo.proximo_mantenimiento, Equipo.id, Equipo.codigo, Equipo.nombre).where(
+        Equipo.proximo_mantenimiento <= limite
+    ).order_by(Equipo.proximo_mantenimiento, Equipo.id)
+
+
+def listar_proximos(filas, hoy):
+    """``filas``: tuplas (fecha, equipo_id, codigo, nombre) ordenadas por fecha."""
+    return [
+        {
+            "id": equipo_id,
+            "codigo": codigo,
+            "nombre": nombre,
+            "proximo_mantenimiento": fecha.isoformat(),
+            "dias_restantes": (fecha - hoy).days,
+            "atrasado": fecha < hoy,
+        }
+        for fecha, equipo_id, codigo, nombre in filas
+    ]
+
+
+def subconsultas_fechas(equipo_id, hoy):
+    """MAX/MIN alrededor de hoy: dos búsquedas en ix_mantenimientos_equipo_fecha.
+
+    ``equipo_id`` puede ser un valor o la columna Equipo.id (subconsultas
+    correlacionadas dentro de un SELECT sobre equipos). El archivo solo se
+    consulta si el equipo no tiene mantenimientos pasados sin archivar
+    (COALESCE no evalúa el segundo argumento si el primero tiene valor).
+    """
+    ultimo = func.coalesce(
+        select(func.max(Mantenimiento.fecha))
+        .where(Mantenimiento.equipo_id == equipo_id, Mantenimiento.fecha <= hoy)
+        .scalar_subquery(),
+        subconsulta_ultimo_archivado(equipo_id),
+    )
+    proximo = (
+        select(func.min(Mantenimiento.fecha))
+        .where(Mantenimiento.equipo_id == equipo_id, Mantenimiento.fecha > hoy)
+        .scalar_subquery()
+    )
+    return ultimo.label('ultimo'), proximo.label('proximo')
+
+
+def consulta_fechas_equipo(equipo_id, hoy):
+    return select(*subconsultas_fechas(equipo_id, hoy))
+
+
+def subconsulta_ultimo_archivado(equipo_id):
+    # Una búsqueda en ix_mantenimientos_archivo_equipo_fecha
+    return (
+        select(func.max(MantenimientoArchivado.fecha))
+        .where(MantenimientoArchivado.equipo_id == equipo_id)
+        .scalar_subquery()
+    )
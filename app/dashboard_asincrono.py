@@ -0,0 +1,321 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs
+
+from sqlalchemy.engine import make_url
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header, parse_cookie, parse_etags
+
+from app import historial
+from app.replicas import COOKIE_PRIMARIA, pegado_a_primaria
+from app.consultas import (
+    consulta_equipos_sin_mantenimiento, consulta_estados_equipos, consulta_proximos,
+    consulta_resumen_mantenimientos, listar_equipos_sin_mantenimiento,
+    listar_historial, listar_proximos, resumir_estados, resumir_mantenimientos
+)
+from app.versiones import cache_control, consulta_versiones, etag_de, ordenar_versiones
+
+try:
+    import greenlet  # noqa: F401  (lo necesita sqlalchemy.ext.asyncio)
+    from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:  # dependencia opcional
+    create_async_engine = None
+
+# ============================================================
+# ⚡ Dashboard asíncrono (ASGI + SQLAlchemy AsyncEngine)
+# ============================================================
+# Las mismas rutas /dashboard/* que la app Flask, servidas por una
+# aplicación ASGI mínima sobre un AsyncEngine (asyncpg / aiosqlite). Una
+# petición esperando a la base no ocupa un hilo, y /dashboard lanza las
+# cuatro consultas a la vez, cada una en su propia conexión.
+#
+# Las consultas son las de app/consultas.py y las respuestas son
+# idénticas a las de la versión síncrona, ETag incluido. La caché usa las
+# versiones por tabla (app/versiones.py), así que ve las escrituras de
+# cualquier proceso sin depender de avisos en memoria.
+#
+# Con réplica configurada (app/replicas.py) se lee de ella, salvo los
+# clientes con la cookie de escritura reciente, que leen de la primaria.
+#
+# También sirve /eventos (Server-Sent Events, app/eventos.py): cada
+# cliente conectado es una corrutina en vez de un hilo.
+#
+#   uvicorn asgi:app
+
+DRIVERS_ASINCRONOS = {'postgresql': 'asyncpg', 'sqlite': 'aiosqlite'}
+MAXIMO_ENTRADAS = 1024
+
+# Base de la petición en curso; las tareas de asyncio.gather la heredan
+_base = ContextVar('base', default='primaria')
+
+
+def uri_asincrona(uri):
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in DRIVERS_ASINCRONOS:
+        raise RuntimeError(f"No hay driver asíncrono para {backend}")
+    return url.set(drivername=f"{backend}+{DRIVERS_ASINCRONOS[backend]}")
+
+
+class _Peticion:
+    def __init__(self, scope):
+        self.path = scope['path']
+        self.query = scope.get('query_string', b'').decode('latin-1')
+        self.args = {k: v[0] for k, v in parse_qs(self.query, keep_blank_values=True).items()}
+        self.cabeceras = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+
+    @property
+    def full_path(self):
+        # Igual que request.full_path de Flask, para que el ETag coincida
+        return f"{self.path}?{self.query}"
+
+    @property
+    def cookies(self):
+        return parse_cookie(self.cabeceras.get('cookie'))
+
+    @property
+    def accept(self):
+        return parse_accept_header(self.cabeceras.get('accept'), MIMEAccept).best or ''
+
+
+class DashboardAsincrono:
+    def __init__(self, app, siguiente=None):
+        if create_async_engine is None:
+            raise RuntimeError("El dashboard asíncrono requiere greenlet y un driver asíncrono (asyncpg o aiosqlite)")
+        self.config = app.config
+        self.dumps = app.json.dumps
+        self.siguiente = siguiente  # app ASGI para el resto de las rutas (opcional)
+        self.ttl = app.config.get('DASHBOARD_CACHE_TTL', 30)
+        self.canal = app.extensions.get('eventos')
+        self.heartbeat = app.config.get('EVENTOS_HEARTBEAT', 15)
+        self.engines = {}
+        self._cache = {}      # clave → (expira, versiones, valor)
+        self._en_curso = {}   # (clave, versiones) → tarea
+        self.aciertos = 0
+        self.fallos = 0
+
+        # ruta → (tablas de las que depende, depende de "hoy", función)
+        self.rutas = {
+            '/dashboard': (('equipos', 'mantenimientos'), True, self.completo),
+            '/dashboard/equipos-resumen': (('equipos',), False, self.resumen_equipos),
+            '/dashboard/mantenimientos-resumen': (('mantenimientos',), True, self.resumen_mantenimientos),
+            '/dashboard/equipos-sin-mantenimiento': (('equipos', 'mantenimientos'), False, self.sin_mantenimiento),
+            '/dashboard/mantenimientos-historial': (('mantenimientos',), False, self.historial),
+            '/dashboard/proximos': (('equipos',), True, self.proximos),
+        }
+
+    # --------------------------------------------------------
+    # Base de datos
+    # --------------------------------------------------------
+    def _uris(self):
+        uris = {'primaria': self.config.get('SQLALCHEMY_ASYNC_DATABASE_URI')
+                or uri_asincrona(self.config['SQLALCHEMY_DATABASE_URI'])}
+        if self.config.get('REPLICA_DATABASE_URI'):
+            uris['replica'] = uri_asincrona(self.config['REPLICA_DATABASE_URI'])
+        return uris
+
+    def _crear_engine(self, uri):
+        opciones = dict(self.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+        if make_url(uri).get_backend_name() == 'sqlite':
+            opciones = {k: v for k, v in opciones.items() if k in ('pool_pre_ping', 'pool_recycle')}
+        return create_async_engine(uri, **opciones)
+
+    def _engine(self):
+        if not self.engines:
+            self.engines = {nombre: self._crear_engine(uri) for nombre, uri in self._uris().items()}
+        return self.engines.get(_base.get()) or self.engines['primaria']
+
+    async def _filas(self, consulta):
+        async with self._engine().connect() as conexion:
+            return (await conexion.execute(consulta)).all()
+
+    async def _cacheado(self, clave, version, calcular):
+        """Valor de ``clave`` para ``version``; peticiones simultáneas comparten la consulta."""
+        entrada = self._cache.get(clave)
+        if entrada and entrada[0] > time.monotonic() and entrada[1] == version:
+            self.aciertos += 1
+            return entrada[2]
+
+        self.fallos += 1
+        tarea = self._en_curso.get((clave, version))
+        if tarea is None:
+            tarea = asyncio.ensure_future(calcular())
+            self._en_curso[(clave, version)] = tarea
+            tarea.add_done_callback(lambda _: self._en_curso.pop((clave, version), None))
+        valor = await asyncio.shield(tarea)
+
+        if len(self._cache) >= MAXIMO_ENTRADAS and clave not in self._cache:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[clave] = (time.monotonic() + self.ttl, version, valor)
+        return valor
+
+    # --------------------------------------------------------
+    # Endpoints (cada uno recibe los parámetros y las versiones)
+    # --------------------------------------------------------
+    async def resumen_equipos(self, args, version):
+        async def calcular():
+            return resumir_estados(await self._filas(consulta_estados_equipos()))
+        return await self._cacheado('equipos-resumen', version, calcular)
+
+    async def resumen_mantenimientos(self, args, version):
+        async def calcular():
+            filas = await self._filas(consulta_resumen_mantenimientos(datetime.now().date()))
+            return resumir_mantenimientos(filas[0])
+        return await self._cacheado('mantenimientos-resumen', version, calcular)
+
+    async def sin_mantenimiento(self, args, version):
+        async def calcular():
+            return listar_equipos_sin_mantenimiento(await self._filas(consulta_equipos_sin_mantenimiento()))
+        return await self._cacheado('equipos-sin-mantenimiento', version, calcular)
+
+    async def historial(self, args, version):
+        filtros = historial.leer_parametros(args)
+
+        async def calcular():
+            return listar_historial(await self._filas(historial.consulta_historial(*filtros)))
+        return await self._cacheado(('mantenimientos-historial',) + filtros, version, calcular)
+
+    async def proximos(self, args, version):
+        try:
+            dias = int(args.get('dias', 30))
+        except ValueError:
+            raise ValueError("El parámetro dias debe ser un número entero")
+        hoy = datetime.now().date()
+
+        async def calcular():
+            return listar_proximos(await self._filas(consulta_proximos(hoy + timedelta(days=dias))), hoy)
+        return await self._cacheado(('proximos', dias), version, calcular)
+
+    async def completo(self, args, version):
+        # Las cuatro consultas a la vez, cada una en su conexión
+        versiones = dict(zip(('equipos', 'mantenimientos'), version))
+        equipos, mantenimientos, sin_mantenimiento, meses = await asyncio.gather(
+            self.resumen_equipos(args, (versiones['equipos'],)),
+            self.resumen_mantenimientos(args, (versiones['mantenimientos'], version[-1])),
+            self.sin_mantenimiento(args, version[:2]),
+            self.historial({}, (versiones['mantenimientos'],)),
+        )
+        return {
+            "equipos": equipos,
+            "mantenimientos": mantenimientos,
+            "equipos_sin_mantenimiento": sin_mantenimiento,
+            "historial": meses,
+        }
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "entradas": len(self._cache),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else None,
+            "ttl": self.ttl,
+        }
+
+    # --------------------------------------------------------
+    # ASGI
+    # --------------------------------------------------------
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http' and scope['path'] == '/eventos' and self.canal is not None:
+            return await self._eventos(scope, receive, send)
+
+        ruta = self.rutas.get(scope.get('path', '').rstrip('/') or '/') if scope['type'] == 'http' else None
+        if ruta is None and scope.get('path') != '/dashboard/cache':
+            if self.siguiente is not None:
+                return await self.siguiente(scope, receive, send)
+            return await self._responder(send, 404, {"error": "No encontrado"})
+        if scope['method'] not in ('GET', 'HEAD'):
+            return await self._responder(send, 405, {"error": "Método no permitido"})
+        if ruta is None:
+            return await self._responder(send, 200, self.estadisticas())
+
+        peticion = _Peticion(scope)
+        _base.set('primaria' if pegado_a_primaria(peticion.cookies.get(COOKIE_PRIMARIA)) else 'replica')
+        tablas, diario, funcion = ruta
+        version = ordenar_versiones(tablas, await self._filas(consulta_versiones(tablas)))
+        if diario:
+            version.append(datetime.now().date().isoformat())
+        version = tuple(version)
+
+        etag = etag_de([peticion.full_path, peticion.accept, *version])
+        cabeceras = [
+            (b'etag', f'W/"{etag}"'.encode()),
+            (b'cache-control', cache_control(self.config.get('HTTP_MAX_AGE', 0)).encode()),
+            (b'vary', b'Accept'),
+        ]
+        if parse_etags(peticion.cabeceras.get('if-none-match')).contains_weak(etag):
+            return await self._responder(send, 304, None, cabeceras)
+
+        try:
+            datos = await funcion(peticion.args, version)
+        except ValueError as e:
+            return await self._responder(send, 400, {"error": str(e)})
+        await self._responder(send, 200, datos, cabeceras, cuerpo=scope['method'] != 'HEAD')
+
+    async def _eventos(self, scope, receive, send):
+        peticion = _Peticion(scope)
+        loop = asyncio.get_running_loop()
+        aviso = asyncio.Event()
+        suscripcion = self.canal.suscribir(
+            peticion.cabeceras.get('last-event-id') or peticion.args.get('ultimo'),
+            avisar=lambda: loop.call_soon_threadsafe(aviso.set)
+        )
+
+        async def esperar_desconexion():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+        desconexion = asyncio.ensure_future(esperar_desconexion())
+
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+            await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+            while not desconexion.done():
+                aviso.clear()
+                mensajes = suscripcion.tomar()
+                if suscripcion.desbordada:
+                    break
+                if mensajes:
+                    await send({'type': 'http.response.body', 'body': ''.join(mensajes).encode(), 'more_body': True})
+                    continue
+                espera = asyncio.ensure_future(aviso.wait())
+                await asyncio.wait([espera, desconexion], timeout=self.heartbeat,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                espera.cancel()
+                if not aviso.is_set() and not desconexion.done():
+                    await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+            if not desconexion.done():
+                await send({'type': 'http.response.body', 'body': b''})
+        except OSError:
+            pass  # el cliente se fue mientras se escribía
+        finally:
+            desconexion.cancel()
+            suscripcion.cerrar()
+
+    async def _responder(self, send, status, datos, cabeceras=(), cuerpo=True):
+        contenido = b'' if datos is None else self.dumps(datos).encode()
+        cabeceras = list(cabeceras)
+        if datos is not None:
+            cabeceras += [(b'content-type', b'application/json'),
+                          (b'content-length', str(len(contenido)).encode())]
+        await send({'type': 'http.response.start', 'status': status, 'headers': cabeceras})
+        await send({'type': 'http.response.body', 'body': contenido if cuerpo else b''})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                self._engine()
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                for engine in self.engines.values():
+                    await engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
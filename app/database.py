@@ -1,3 +1,38 @@
+import sqlite3
+
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.dml import UpdateBase
+
+class SesionEnrutada(Session):
+    """Sesión que manda las lecturas a la réplica si la petición lo permite.
+
+    app/replicas.py marca ``info['lectura']`` en las peticiones GET. Todo
+    INSERT / UPDATE / DELETE (y cualquier flush) va a la primaria, y desde
+    ese momento la sesión deja de leer de la réplica para ver lo que escribió.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('lectura'):
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info['lectura'] = False
+            else:
+                replica = current_app.extensions.get('replica')
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": SesionEnrutada})
+
 
-db = SQLAlchemy()
+@event.listens_for(Engine, 'connect')
+def _activar_claves_foraneas(conexion, registro):
+    # SQLite no aplica las claves foráneas (ni ON DELETE CASCADE) si no se pide
+    if isinstance(conexion, sqlite3.Connection):
+        cursor = conexion.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+# ============================================================
+# 🔎 Diagnóstico: conteo de sentencias SQL
+# ============================================================
+
+class ContadorConsultas:
+    def __init__(self):
+        self.sentencias = []
+
+    @property
+    def total(self):
+        return len(self.sentencias)
+
+
+@contextmanager
+def contar_consultas(engine):
+    """Cuenta las sentencias que se ejecutan sobre ``engine`` dentro del bloque.
+
+    Sirve para detectar N+1: el número de consultas de un endpoint no debe
+    crecer con el número de filas que devuelve.
+    """
+    contador = ContadorConsultas()
+
+    def antes_de_ejecutar(conn, cursor, sentencia, parametros, contexto, executemany):
+        contador.sentencias.append(sentencia)
+
+    event.listen(engine, 'before_cursor_execute', antes_de_ejecutar)
+    try:
+        yield contador
+    finally:
+        event.remove(engine, 'before_cursor_execute', antes_de_ejecutar)
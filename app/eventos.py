@@ -0,0 +1,258 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime
+
+from flask import current_app, has_app_context
+
+from app.cambios import al_confirmar
+from app.consultas import (
+    consulta_estados_equipos, consulta_resumen_mantenimientos,
+    resumir_estados, resumir_mantenimientos
+)
+from app.database import db
+from app.versiones import leer_versiones
+
+# ============================================================
+# 📡 Flujo de cambios (Server-Sent Events en /eventos)
+# ============================================================
+# Cada commit con cambios marcados (app/cambios.py) se publica como un
+# evento compacto ("equipos" / "mantenimientos" con la acción y los ids)
+# y se reparte a todos los clientes conectados a este proceso. Cada
+# evento se serializa una sola vez y cada cliente tiene una cola acotada:
+# si no la vacía a tiempo se le corta la conexión y, al reconectar con
+# Last-Event-ID, recibe lo que se perdió desde el historial.
+#
+# Un hilo vigía (uno por proceso, solo mientras haya clientes) revisa las
+# versiones por tabla cada EVENTOS_INTERVALO segundos o tras un commit
+# local. Si cambiaron publica los contadores del dashboard (una consulta
+# por ráfaga de escrituras, no por cliente) y, si el cambio vino de otro
+# proceso (otro worker de gunicorn), un evento "cambios" con las tablas.
+
+logger = logging.getLogger(__name__)
+
+TABLAS = ('equipos', 'mantenimientos')
+MAXIMO_IDS = 100
+# Tras un commit local el vigía espera un poco más: una ráfaga de
+# escrituras produce un solo evento de contadores
+DEMORA_CONTADORES = 0.25
+
+
+class Suscripcion:
+    def __init__(self, canal, maximo, avisar=None):
+        self.canal = canal
+        self.maximo = maximo
+        self.desbordada = False
+        self._cola = deque()
+        self._condicion = threading.Condition()
+        self._avisar = avisar  # asyncio: despierta al lector desde otro hilo
+
+    def _entregar(self, mensaje):
+        with self._condicion:
+            if self.desbordada:
+                return
+            if len(self._cola) >= self.maximo:
+                # Cliente lento: se descarta lo pendiente y se le corta
+                self.desbordada = True
+                self._cola.clear()
+            else:
+                self._cola.append(mensaje)
+            self._condicion.notify()
+        if self._avisar is not None:
+            self._avisar()
+
+    def tomar(self, espera=None):
+        """Mensajes pendientes; si no hay, espera hasta ``espera`` segundos."""
+        with self._condicion:
+            if not self._cola and not self.desbordada and espera:
+                self._condicion.wait(espera)
+            mensajes = list(self._cola)
+            self._cola.clear()
+            return mensajes
+
+    def cerrar(self):
+        self.canal.desuscribir(self)
+
+
+class CanalEventos:
+    def __init__(self, app, historial=1000, cola=256, intervalo=2):
+        self.app = app
+        # Los ids llevan la instancia: un id de otro proceso (o de antes de
+        # reiniciar) no se puede reanudar y recibe "reset"
+        self.instancia = uuid.uuid4().hex[:8]
+        self.maximo_cola = cola
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._numero = 0
+        self._historial = deque(maxlen=historial)   # (número, mensaje)
+        self._suscripciones = set()
+        self._locales = defaultdict(int)            # commits propios por tabla
+        self._versiones = None
+        self._despertar = threading.Event()
+        self._vigia = None
+        self.publicados = 0
+        self.desbordes = 0
+
+    # --------------------------------------------------------
+    # Publicar
+    # --------------------------------------------------------
+    def _mensaje(self, nombre, cuerpo):
+        return f"id: {self.instancia}-{self._numero}\nevent: {nombre}\ndata: {cuerpo}\n\n"
+
+    def publicar(self, nombre, datos):
+        cuerpo = json.dumps(datos, separators=(',', ':'), ensure_ascii=False, default=str)
+        with self._lock:
+            # Numerar y repartir bajo el mismo lock: todos ven el mismo orden
+            self._numero += 1
+            mensaje = self._mensaje(nombre, cuerpo)
+            self._historial.append((self._numero, mensaje))
+            self.publicados += 1
+            for suscripcion in self._suscripciones:
+                suscripcion._entregar(mensaje)
+
+    def publicar_cambios(self, cambios):
+        agrupados = {}
+        for cambio in cambios:
+            clave = (cambio.tabla, cambio.accion)
+            ids = agrupados.setdefault(clave, set())
+            if cambio.id is None or ids is None or len(ids) >= MAXIMO_IDS:
+                # Cambio masivo (o sin id): "ids": null, el cliente relee
+                agrupados[clave] = None
+            else:
+                ids.add(cambio.id)
+        for (tabla, accion), ids in agrupados.items():
+            self.publicar(tabla, {"accion": accion, "ids": sorted(ids) if ids is not None else None})
+
+        with self._lock:
+            for tabla in {c.tabla for c in cambios}:
+                self._locales[tabla] += 1
+        self._despertar.set()
+
+    # --------------------------------------------------------
+    # Suscribirse
+    # --------------------------------------------------------
+    def suscribir(self, ultimo_id=None, avisar=None):
+        suscripcion = Suscripcion(self, self.maximo_cola, avisar)
+        with self._lock:
+            suscripcion._cola.extend(self._perdidos(ultimo_id))
+            self._suscripciones.add(suscripcion)
+            iniciar = self._vigia is None
+            if iniciar:
+                self._vigia = threading.Thread(target=self._vigilar, name='eventos', daemon=True)
+        if iniciar:
+            self._vigia.start()
+        return suscripcion
+
+    def desuscribir(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+            if suscripcion.desbordada:
+                self.desbordes += 1
+
+    def _perdidos(self, ultimo_id):
+        if not ultimo_id:
+            return []
+        instancia, _, numero = ultimo_id.partition('-')
+        primero = self._historial[0][0] if self._historial else self._numero + 1
+        try:
+            numero = int(numero)
+        except ValueError:
+            numero = -1
+        if instancia != self.instancia or not primero - 1 <= numero <= self._numero:
+            # No se puede reanudar: el cliente debe releer todo
+            return [self._mensaje('reset', '{}')]
+        return [mensaje for n, mensaje in self._historial if n > numero]
+
+    # --------------------------------------------------------
+    # Hilo vigía: contadores del dashboard y cambios de otros procesos
+    # --------------------------------------------------------
+    def _vigilar(self):
+        self._revisar()  # versiones de partida
+        while True:
+            if self._despertar.wait(self.intervalo):
+                time.sleep(DEMORA_CONTADORES)
+            self._despertar.clear()
+            with self._lock:
+                if not self._suscripciones:
+                    self._vigia = None
+                    self._versiones = None
+                    return
+            self._revisar()
+
+    def _revisar(self):
+        try:
+            with self.app.app_context():
+                self._publicar_contadores()
+        except Exception:
+            logger.exception("Error revisando cambios para /eventos")
+
+    def _publicar_contadores(self):
+        versiones = dict(zip(TABLAS, leer_versiones(TABLAS)))
+        anteriores, self._versiones = self._versiones, versiones
+        with self._lock:
+            locales, self._locales = self._locales, defaultdict(int)
+        if anteriores is None or anteriores == versiones:
+            return
+
+        # Cada commit propio sube una vez la versión de cada tabla tocada;
+        # si subió más, escribió otro proceso
+        ajenas = [t for t in TABLAS if versiones[t] - anteriores[t] > locales[t]]
+        if ajenas:
+            self.publicar('cambios', {"tablas": ajenas})
+        self.publicar('dashboard', contadores_dashboard())
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "clientes": len(self._suscripciones),
+                "publicados": self.publicados,
+                "historial": len(self._historial),
+                "desbordes": self.desbordes,
+            }
+
+
+def contadores_dashboard():
+    return {
+        "equipos": resumir_estados(db.session.execute(consulta_estados_equipos())),
+        "mantenimientos": resumir_mantenimientos(
+            db.session.execute(consulta_resumen_mantenimientos(datetime.now().date())).one()
+        ),
+    }
+
+
+def flujo(suscripcion, heartbeat):
+    """Generador del cuerpo text/event-stream para una suscripción."""
+    try:
+        yield "retry: 3000\n\n"
+        while not suscripcion.desbordada:
+            mensajes = suscripcion.tomar(heartbeat)
+            if mensajes:
+                yield ''.join(mensajes)
+            elif not suscripcion.desbordada:
+                # Comentario: mantiene viva la conexión y detecta clientes caídos
+                yield ": ping\n\n"
+    finally:
+        suscripcion.cerrar()
+
+
+@al_confirmar
+def _publicar(cambios):
+    canal = current_app.extensions.get('eventos') if has_app_context() else None
+    if canal is not None:
+        canal.publicar_cambios(cambios)
+
+
+def init_app(app):
+    app.extensions['eventos'] = CanalEventos(
+        app,
+        historial=app.config.get('EVENTOS_HISTORIAL', 1000),
+        cola=app.config.get('EVENTOS_COLA', 256),
+        intervalo=app.config.get('EVENTOS_INTERVALO', 2),
+    )
+
+
+def obtener_canal():
+    return current_app.extensions['eventos']
@@ -0,0 +1,306 @@
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from flask import Response, stream_with_context
+
+from app.database import db
+from app.filtros import filtros_equipos, orden_equipos
+from app.listados import FILAS_POR_LOTE, OrdenKeyset
+from app.models import Mantenimiento, MantenimientoArchivado
+from app.serializadores import ESQUEMA_EQUIPO, ESQUEMA_MANTENIMIENTO, ESQUEMA_MANTENIMIENTO_ARCHIVADO
+
+# ============================================================
+# 📤 Exportación completa de equipos y mantenimientos (CSV / XLSX)
+# ============================================================
+# Las filas salen del cursor del servidor de a FILAS_POR_LOTE y se
+# escriben en trozos a medida que llegan: la memoria no depende del tamaño
+# de la exportación. El CSV se comprime al vuelo con gzip si el cliente lo
+# acepta (app/compresion.py); el XLSX ya es un zip.
+#
+# Acepta los mismos parámetros que el listado (filtros, orden y fields),
+# sin limit ni cursor. ?archivados=1 agrega los mantenimientos archivados
+# (app/archivo.py) al final: son todos más viejos, así que el orden por
+# fecha descendente se mantiene.
+
+FORMATOS_EXPORTACION = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+VERDADEROS = ('1', 'true', 'si', 'sí')
+
+
+def leer_formato(args):
+    formato = (args.get('formato') or 'csv').lower()
+    if formato not in FORMATOS_EXPORTACION:
+        raise ValueError(f"Formato no soportado: {formato} (use {', '.join(FORMATOS_EXPORTACION)})")
+    return formato
+
+
+def _campos(esquema, args):
+    fields = args.get('fields')
+    if not fields:
+        return list(esquema.campos)
+    campos = [c.strip() for c in fields.split(',') if c.strip()]
+    esquema.validar(campos)
+    return campos
+
+
+def consultas_equipos(args):
+    """(campos, [consultas]) para exportar equipos con los filtros del listado."""
+    campos = _campos(ESQUEMA_EQUIPO, args)
+    consulta = (
+        ESQUEMA_EQUIPO.consulta(campos)
+        .where(*filtros_equipos(args))
+        .order_by(*orden_equipos(args).order_by())
+    )
+    return campos, [consulta]
+
+
+def consultas_mantenimientos(args):
+    """(campos, [consultas]) para exportar mantenimientos (y, si se pide, el archivo)."""
+    campos = _campos(ESQUEMA_MANTENIMIENTO, args)
+    equipo_id = args.get('equipo_id')
+    if equipo_id:
+        try:
+            equipo_id = int(equipo_id)
+        except ValueError:
+            raise ValueError("El parámetro equipo_id debe ser un número entero")
+
+    consultas = []
+    tablas = [(ESQUEMA_MANTENIMIENTO, Mantenimiento)]
+    if (args.get('archivados') or '').lower() in VERDADEROS:
+        tablas.append((ESQUEMA_MANTENIMIENTO_ARCHIVADO, MantenimientoArchivado))
+    for esquema, modelo in tablas:
+        # Mismo orden que el listado: fecha desc, id desc
+        orden = OrdenKeyset(modelo.fecha, modelo.id, descendente=True)
+        consulta = esquema.consulta(campos).order_by(*orden.order_by())
+        if equipo_id:
+            consulta = consulta.where(modelo.equipo_id == equipo_id)
+        consultas.append(consulta)
+    return campos, consultas
+
+
+CONSULTAS_EXPORTACION = {
+    'equipos': consultas_equipos,
+    'mantenimientos': consultas_mantenimientos,
+}
+
+
+def ejecutar(consultas):
+    # Una consulta a la vez, cada una con su cursor del servidor
+    for consulta in consultas:
+        yield from db.session.execute(consulta.execution_options(yield_per=FILAS_POR_LOTE))
+
+
+# ============================================================
+# 🧾 CSV
+# ============================================================
+# Un texto que empieza así se abre como fórmula en Excel / LibreOffice
+# (inyección de fórmulas): se antepone ' para que quede como texto. En el
+# XLSX no hace falta, las celdas de texto nunca se evalúan.
+INICIOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, date):
+        return valor.isoformat()
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+    if isinstance(valor, str) and valor.startswith(INICIOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def generar_csv(campos, filas):
+    """Trozos de texto CSV (encabezado + una línea por fila)."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(campos)
+    cantidad = len(campos)
+    for numero, fila in enumerate(filas, start=1):
+        escritor.writerow([_valor_csv(v) for v in fila[:cantidad]])
+        if numero % FILAS_POR_LOTE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+# ============================================================
+# 📗 XLSX
+# ============================================================
+# Un XLSX es un zip con XML. zipfile puede escribir en un destino sin
+# seek (usa descriptores de datos), así que las hojas se escriben fila a
+# fila y los bytes comprimidos se entregan a medida que salen. Los textos
+# van en línea (inlineStr) y no en la tabla compartida, que obligaría a
+# tener todos los textos en memoria hasta el final.
+
+FILAS_POR_HOJA = 1048576  # límite de Excel, encabezado incluido
+_EPOCA_EXCEL = date(1899, 12, 30)
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_ESTILOS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_RELACIONES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships/officeDocument" Target="xl/workbook.xml"/></Relationships>'
+)
+_INICIO_HOJA = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_FIN_HOJA = '</sheetData></worksheet>'
+
+
+def _texto_xlsx(valor, estilo=''):
+    texto = escape(_CARACTERES_INVALIDOS.sub('', valor))
+    return f'<c t="inlineStr"{estilo}><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _celda_xlsx(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, bool):
+        return _texto_xlsx(str(valor))
+    if isinstance(valor, (int, float)):
+        return f'<c><v>{valor}</v></c>'
+    if isinstance(valor, datetime):
+        valor = valor.date()
+    if isinstance(valor, date):
+        return f'<c s="1"><v>{(valor - _EPOCA_EXCEL).days}</v></c>'
+    if isinstance(valor, (dict, list)):
+        valor = json.dumps(valor, ensure_ascii=False, separators=(',', ':'))
+    return _texto_xlsx(str(valor))
+
+
+def _libro(hojas):
+    # Se escribe al final, cuando ya se sabe cuántas hojas hubo
+    tipos = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/'
+        f'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, len(hojas) + 1)
+    )
+    hojas_libro = ''.join(
+        f'<sheet name="{escape(nombre)}" sheetId="{i}" r:id="rId{i}"/>' for i, nombre in enumerate(hojas, start=1)
+    )
+    relaciones = ''.join(
+        f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        f'relationships/worksheet" Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(hojas) + 1)
+    )
+    estilos = len(hojas) + 1
+    return {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{tipos}</Types>'
+        ),
+        '_rels/.rels': _RELACIONES,
+        'xl/workbook.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{hojas_libro}</sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relaciones}<Relationship Id="rId{estilos}" Type="http://schemas.openxmlformats.org/'
+            'officeDocument/2006/relationships/styles" Target="styles.xml"/></Relationships>'
+        ),
+        'xl/styles.xml': _ESTILOS,
+    }
+
+
+class _Salida(io.RawIOBase):
+    """Destino del zip: junta los bytes escritos hasta que se retiran (sin seek ni tell)."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def retirar(self):
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def generar_xlsx(campos, filas, nombre_hoja='datos'):
+    """Trozos de bytes de un XLSX; pasado el límite de filas de Excel sigue en otra hoja."""
+    salida = _Salida()
+    cantidad = len(campos)
+    encabezado = '<row>' + ''.join(_texto_xlsx(c, ' s="2"') for c in campos) + '</row>'
+    hojas = []
+    filas = iter(filas)
+
+    with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as libro:
+        fila = next(filas, None)
+        while fila is not None or not hojas:
+            hojas.append(nombre_hoja if not hojas else f"{nombre_hoja} ({len(hojas) + 1})")
+            with libro.open(f'xl/worksheets/sheet{len(hojas)}.xml', 'w') as hoja:
+                hoja.write((_INICIO_HOJA + encabezado).encode())
+                escritas, lote = 1, []
+                while fila is not None and escritas < FILAS_POR_HOJA:
+                    lote.append('<row>' + ''.join(_celda_xlsx(v) for v in fila[:cantidad]) + '</row>')
+                    escritas += 1
+                    if len(lote) == FILAS_POR_LOTE:
+                        hoja.write(''.join(lote).encode())
+                        lote.clear()
+                        yield salida.retirar()
+                    fila = next(filas, None)
+                hoja.write((''.join(lote) + _FIN_HOJA).encode())
+            yield salida.retirar()
+
+        for nombre, contenido in _libro(hojas).items():
+            libro.writestr(nombre, contenido)
+    yield salida.retirar()
+
+
+def generar(formato, campos, filas, nombre):
+    if formato == 'xlsx':
+        return generar_xlsx(campos, filas, nombre)
+    return generar_csv(campos, filas)
+
+
+def respuesta_exportacion(tabla, formato, campos, consultas):
+    nombre = f"{tabla}-{date.today().isoformat()}.{formato}"
+    respuesta = Response(
+        stream_with_context(generar(formato, campos, ejecutar(consultas), tabla)),
+        mimetype=FORMATOS_EXPORTACION[formato],
+    )
+    respuesta.headers['Content-Disposition'] = f'attachment; filename="{nombre}"'
+    return respuesta
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app.busqueda import condicion_texto
+from app.listados import OrdenKeyset
+from app.models import Equipo
+
+# ============================================================
+# 🧰 Filtros y orden del listado de equipos
+# ============================================================
+# ?estado=Activo&estado=Inactivo   igualdad (se puede repetir → IN)
+# ?marca=...&modelo=...            igualdad exacta
+# ?fecha_compra_desde=YYYY-MM-DD   rangos inclusivos (_desde / _hasta)
+# ?q=texto                         búsqueda en nombre, marca y modelo
+# ?orden=nombre | -nombre          orden (con "-" descendente)
+
+COLUMNAS_ORDEN = {
+    "id": Equipo.id,
+    "codigo": Equipo.codigo,
+    "nombre": Equipo.nombre,
+    "marca": Equipo.marca,
+    "modelo": Equipo.modelo,
+    "estado": Equipo.estado,
+    "fecha_compra": Equipo.fecha_compra,
+    "proximo_mantenimiento": Equipo.proximo_mantenimiento,
+    "ultimo_mantenimiento": Equipo.ultimo_mantenimiento,
+}
+
+RANGOS_FECHA = {
+    "fecha_compra": Equipo.fecha_compra,
+    "proximo_mantenimiento": Equipo.proximo_mantenimiento,
+}
+
+LARGO_MAXIMO_TEXTO = 100
+
+
+def _fecha(args, parametro):
+    valor = args.get(parametro)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"Formato de fecha inválido en {parametro} (use YYYY-MM-DD)")
+
+
+def filtros_equipos(args):
+    """Lista de condiciones WHERE a partir de los parámetros de la URL."""
+    condiciones = []
+
+    estados = [e.lower() for e in args.getlist('estado') if e]
+    if estados:
+        # lower(estado) usa el índice ix_equipos_estado_lower
+        condiciones.append(func.lower(Equipo.estado).in_(estados))
+
+    for campo, columna in (("marca", Equipo.marca), ("modelo", Equipo.modelo)):
+        valores = [v for v in args.getlist(campo) if v]
+        if valores:
+            condiciones.append(columna.in_(valores))
+
+    for campo, columna in RANGOS_FECHA.items():
+        desde = _fecha(args, f"{campo}_desde")
+        hasta = _fecha(args, f"{campo}_hasta")
+        if desde:
+            condiciones.append(columna >= desde)
+        if hasta:
+            condiciones.append(columna <= hasta)
+
+    texto = (args.get('q') or '').strip()
+    if texto:
+        if len(texto) > LARGO_MAXIMO_TEXTO:
+            raise ValueError(f"El parámetro q admite hasta {LARGO_MAXIMO_TEXTO} caracteres")
+        condiciones.append(condicion_texto(texto))
+
+    return condiciones
+
+
+def orden_equipos(args):
+    valor = args.get('orden') or 'id'
+    descendente = valor.startswith('-')
+    nombre = valor[1:] if descendente else valor
+    if nombre not in COLUMNAS_ORDEN:
+        raise ValueError(f"No se puede ordenar por {nombre} (use {', '.join(COLUMNAS_ORDEN)})")
+    return OrdenKeyset(COLUMNAS_ORDEN[nombre], Equipo.id, descendente)
@@ -0,0 +1,167 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import and_, delete, extract, func, or_, select, union_all, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import db
+from app.models import Mantenimiento, MantenimientoArchivado, MantenimientoMensual
+
+# ============================================================
+# 📈 Historial mensual de mantenimientos (tabla resumen)
+# ============================================================
+# mantenimientos_mensuales guarda cuántos mantenimientos hay por mes,
+# equipo y tipo. Cada escritura ajusta solo las filas que toca, así que el
+# endpoint del historial nunca recorre la tabla de mantenimientos.
+
+LOTE_RECONSTRUCCION = 5000
+# Claves (mes, equipo_id, tipo) por DELETE al limpiar filas en cero
+LOTE_CLAVES = 500
+
+
+def clave_mes(fecha):
+    return f"{fecha.year:04d}-{fecha.month:02d}"
+
+
+def ajustar(filas, signo=1):
+    """Suma ``signo`` por cada (fecha, equipo_id, tipo) de ``filas``.
+
+    Se agrupan primero, así una importación de miles de filas termina en
+    unas pocas sentencias. No hace commit.
+    """
+    ajustar_meses(((clave_mes(fecha), equipo_id, tipo), signo) for fecha, equipo_id, tipo in filas)
+
+
+def ajustar_meses(cambios):
+    """Suma cada ``delta`` de los pares ((mes, equipo_id, tipo), delta)."""
+    deltas = Counter()
+    for clave, delta in cambios:
+        deltas[clave] += delta
+    deltas = {clave: delta for clave, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    valores = [
+        {"mes": mes, "equipo_id": equipo_id, "tipo": tipo, "cantidad": delta}
+        for (mes, equipo_id, tipo), delta in deltas.items()
+    ]
+    dialecto = db.session.get_bind().dialect.name
+    if dialecto in ('postgresql', 'sqlite'):
+        insertar = (postgresql if dialecto == 'postgresql' else sqlite).insert(MantenimientoMensual)
+        db.session.execute(insertar.on_conflict_do_update(
+            index_elements=['mes', 'equipo_id', 'tipo'],
+            set_={"cantidad": MantenimientoMensual.cantidad + insertar.excluded.cantidad}
+        ), valores)
+    else:
+        for fila in valores:
+            resultado = db.session.execute(
+                update(MantenimientoMensual)
+                .where(MantenimientoMensual.mes == fila["mes"],
+                       MantenimientoMensual.equipo_id == fila["equipo_id"],
+                       MantenimientoMensual.tipo == fila["tipo"])
+                .values(cantidad=MantenimientoMensual.cantidad + fila["cantidad"])
+            )
+            if resultado.rowcount == 0:
+                db.session.add(MantenimientoMensual(**fila))
+        db.session.flush()
+
+    restadas = [clave for clave, delta in deltas.items() if delta < 0]
+    for inicio in range(0, len(restadas), LOTE_CLAVES):
+        db.session.execute(borrado_en_cero(restadas[inicio:inicio + LOTE_CLAVES]))
+
+
+def borrado_en_cero(claves):
+    """DELETE de las filas de ``claves`` (mes, equipo_id, tipo) que quedaron en cero.
+
+    Solo pueden quedar en cero las claves que se acaban de restar: se
+    buscan por la clave primaria, sin recorrer la tabla. Va como OR de
+    igualdades porque SQLite no usa índices con (a, b, c) IN (...).
+    """
+    return delete(MantenimientoMensual).where(
+        or_(*(
+            and_(MantenimientoMensual.mes == mes, MantenimientoMensual.equipo_id == equipo_id,
+                 MantenimientoMensual.tipo == tipo)
+            for mes, equipo_id, tipo in claves
+        )),
+        MantenimientoMensual.cantidad <= 0,
+    )
+
+
+def quitar_equipo(equipo_id):
+    quitar_equipos([equipo_id])
+
+
+def quitar_equipos(equipo_ids):
+    # equipo_ids puede ser una lista o un SELECT de ids (borrado por filtro)
+    db.session.execute(delete(MantenimientoMensual).where(MantenimientoMensual.equipo_id.in_(equipo_ids)))
+
+
+def leer_parametros(args):
+    """(desde, hasta, equipo_id, tipo) a partir de los parámetros de la URL.
+
+    desde/hasta llegan como YYYY-MM y se normalizan (2024-3 → 2024-03).
+    """
+    try:
+        desde, hasta = (
+            clave_mes(datetime.strptime(valor, "%Y-%m")) if valor else None
+            for valor in (args.get('desde'), args.get('hasta'))
+        )
+    except ValueError:
+        raise ValueError("Formato de mes inválido (use YYYY-MM)")
+    equipo_id = args.get('equipo_id')
+    try:
+        equipo_id = int(equipo_id) if equipo_id else None
+    except ValueError:
+        equipo_id = None  # igual que request.args.get(..., type=int)
+    return desde, hasta, equipo_id, args.get('tipo') or None
+
+
+def consulta_historial(desde=None, hasta=None, equipo_id=None, tipo=None):
+    consulta = select(
+        MantenimientoMensual.mes,
+        func.sum(MantenimientoMensual.cantidad).label('cantidad')
+    ).group_by(MantenimientoMensual.mes).order_by(MantenimientoMensual.mes)
+
+    if desde:
+        consulta = consulta.where(MantenimientoMensual.mes >= desde)
+    if hasta:
+        consulta = consulta.where(MantenimientoMensual.mes <= hasta)
+    if equipo_id is not None:
+        consulta = consulta.where(MantenimientoMensual.equipo_id == equipo_id)
+    if tipo:
+        consulta = consulta.where(MantenimientoMensual.tipo == tipo)
+    return consulta
+
+
+def reconstruir():
+    """Vuelve a calcular toda la tabla resumen desde mantenimientos (y el archivo)."""
+    db.session.execute(delete(MantenimientoMensual))
+
+    todos = union_all(*(
+        select(modelo.fecha, modelo.equipo_id, modelo.tipo)
+        for modelo in (Mantenimiento, MantenimientoArchivado)
+    )).subquery()
+    anio = extract('year', todos.c.fecha).label('anio')
+    mes = extract('month', todos.c.fecha).label('mes')
+    filas = db.session.execute(
+        select(anio, mes, todos.c.equipo_id, todos.c.tipo, func.count().label('cantidad'))
+        .group_by(anio, mes, todos.c.equipo_id, todos.c.tipo)
+        .execution_options(yield_per=LOTE_RECONSTRUCCION)
+    )
+
+    total, lote = 0, []
+    for fila in filas:
+        lote.append({
+            "mes": f"{int(fila.anio):04d}-{int(fila.mes):02d}",
+            "equipo_id": fila.equipo_id,
+            "tipo": fila.tipo,
+            "cantidad": fila.cantidad,
+        })
+        if len(lote) >= LOTE_RECONSTRUCCION:
+            db.session.execute(MantenimientoMensual.__table__.insert(), lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        db.session.execute(MantenimientoMensual.__table__.insert(), lote)
+        total += len(lote)
+    return total
@@ -0,0 +1,190 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from sqlalchemy import update
+
+from app.cambios import marcar_cambio
+from app.database import db
+from app.models import Equipo
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # dependencia opcional: sin Pillow solo se guarda el original
+    Image = None
+
+# ============================================================
+# 🖼️ Imágenes de equipos: subida, almacenamiento y variantes
+# ============================================================
+# El cuerpo se copia al disco por bloques (nunca entero en memoria) y el
+# archivo se nombra con el hash de su contenido: una URL nunca cambia de
+# contenido, así que se sirve con caché de un año. La carpeta puede ser
+# un bucket montado y IMAGENES_URL la URL pública (CDN) equivalente.
+#
+# Las variantes (miniatura, mediana...) se generan con Pillow en un pool
+# de hilos y se guardan en equipos.imagen_variantes cuando están listas.
+
+logger = logging.getLogger(__name__)
+
+TAMANO_BLOQUE = 64 * 1024
+
+FIRMAS = [
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+
+class ImagenInvalida(ValueError):
+    def __init__(self, mensaje, status=400):
+        super().__init__(mensaje)
+        self.status = status
+
+
+def detectar_extension(cabecera):
+    for firma, extension in FIRMAS:
+        if cabecera.startswith(firma):
+            return extension
+    if cabecera[:4] == b'RIFF' and cabecera[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def guardar_original(stream, carpeta, limite):
+    """Copia ``stream`` a ``carpeta`` por bloques y devuelve el nombre final.
+
+    Se escribe en un temporal de la misma carpeta y se renombra al final
+    (os.replace es atómico): nunca se sirve un archivo a medio escribir.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    resumen = hashlib.sha256()
+    total = 0
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.parcial')
+    try:
+        with os.fdopen(descriptor, 'wb') as destino:
+            while True:
+                bloque = stream.read(TAMANO_BLOQUE)
+                if not bloque:
+                    break
+                total += len(bloque)
+                if total > limite:
+                    raise ImagenInvalida(f"La imagen supera el máximo de {limite} bytes", 413)
+                resumen.update(bloque)
+                destino.write(bloque)
+
+        with open(temporal, 'rb') as origen:
+            extension = detectar_extension(origen.read(16))
+        if extension is None:
+            raise ImagenInvalida("Formato no soportado (use JPEG, PNG, WebP o GIF)", 415)
+
+        nombre = f"{resumen.hexdigest()[:32]}.{extension}"
+        os.replace(temporal, os.path.join(carpeta, nombre))
+        return nombre
+    except BaseException:
+        if os.path.exists(temporal):
+            os.unlink(temporal)
+        raise
+
+
+def _formato_variantes():
+    return ('webp', 'WEBP') if features.check('webp') else ('jpg', 'JPEG')
+
+
+def generar_variantes(carpeta, nombre, tamanos):
+    """Crea una variante por tamaño (lado mayor en píxeles); devuelve nombre → archivo.
+
+    Las variantes ya generadas (misma imagen subida otra vez) se reutilizan.
+    Se reducen de mayor a menor partiendo cada una de la anterior, y los
+    JPEG se decodifican directamente a escala reducida (draft).
+    """
+    base = nombre.rsplit('.', 1)[0]
+    extension, formato = _formato_variantes()
+    archivos = {variante: f"{base}-{lado}.{extension}" for variante, lado in tamanos.items()}
+    faltan = {v: lado for v, lado in tamanos.items() if not os.path.exists(os.path.join(carpeta, archivos[v]))}
+    if not faltan:
+        return archivos
+
+    with Image.open(os.path.join(carpeta, nombre)) as original:
+        original.draft('RGB', (max(faltan.values()),) * 2)
+        imagen = ImageOps.exif_transpose(original)
+        imagen = imagen.convert('RGBA' if 'A' in imagen.getbands() or 'transparency' in imagen.info else 'RGB')
+        if formato == 'JPEG':
+            imagen = imagen.convert('RGB')
+
+        for variante, lado in sorted(faltan.items(), key=lambda v: -v[1]):
+            imagen.thumbnail((lado, lado), Image.LANCZOS)
+            descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.parcial')
+            with os.fdopen(descriptor, 'wb') as destino:
+                imagen.save(destino, formato, quality=82)
+            os.replace(temporal, os.path.join(carpeta, archivos[variante]))
+    return archivos
+
+
+class ProcesadorImagenes:
+    def __init__(self, app):
+        self.carpeta = app.config['IMAGENES_DIR']
+        self.url_base = app.config.get('IMAGENES_URL', '/imagenes').rstrip('/')
+        self.limite = app.config.get('IMAGENES_TAMANO_MAXIMO', 20 * 1024 * 1024)
+        self.tamanos = app.config.get('IMAGENES_VARIANTES', {})
+        self.hilos = app.config.get('IMAGENES_HILOS', 2)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def url(self, nombre):
+        return f"{self.url_base}/{nombre}"
+
+    def guardar(self, stream):
+        return guardar_original(stream, self.carpeta, self.limite)
+
+    def encolar(self, equipo_id, nombre):
+        """Genera las variantes en segundo plano; devuelve False si no hay nada que hacer."""
+        if Image is None or not self.tamanos:
+            return False
+        app = current_app._get_current_object()
+        if self.hilos <= 0:
+            self._procesar(app, equipo_id, nombre)
+            return True
+        with self._lock:
+            # El pool se crea con la primera subida (no en comandos de consola)
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.hilos, thread_name_prefix='imagenes')
+        self._pool.submit(self._procesar, app, equipo_id, nombre)
+        return True
+
+    def _procesar(self, app, equipo_id, nombre):
+        try:
+            archivos = generar_variantes(self.carpeta, nombre, self.tamanos)
+        except Exception:
+            logger.exception("No se pudieron generar las variantes de %s", nombre)
+            return
+
+        with app.app_context():
+            # Solo si el equipo sigue con esta imagen (pudo cambiarse mientras tanto)
+            resultado = db.session.execute(
+                update(Equipo)
+                .where(Equipo.id == equipo_id, Equipo.imagen_url == self.url(nombre))
+                .values(imagen_variantes={v: self.url(a) for v, a in archivos.items()})
+            )
+            if resultado.rowcount:
+                marcar_cambio('equipos', 'actualizado', equipo_id)
+            db.session.commit()
+
+    def esperar(self):
+        """Espera a que terminen las variantes en curso (benchmarks y pruebas)."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+def init_app(app):
+    app.extensions['imagenes'] = ProcesadorImagenes(app)
+
+
+def obtener_procesador():
+    return current_app.extensions['imagenes']
@@ -0,0 +1,337 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from app import historial
+from app.cambios import marcar_cambio
+from app.codigos import generador_codigos
+from app.database import db
+from app.models import Equipo, Mantenimiento
+from app.servicios import estimar_proximo, recalcular_fechas_de
+
+# ============================================================
+# 📥 Importación masiva de equipos y mantenimientos (CSV / NDJSON)
+# ============================================================
+# Las filas se leen del flujo de a una, se validan por lotes y cada lote
+# se inserta con un executemany en su propia transacción. Una fila inválida
+# no detiene la carga: se anota en el reporte con su número de fila.
+
+TAMANO_LOTE = 1000
+FORMATOS = ('csv', 'ndjson')
+
+
+class ErrorFila(ValueError):
+    pass
+
+
+def detectar_formato(content_type, formato=None):
+    if formato:
+        return formato if formato in FORMATOS else None
+    content_type = (content_type or '').split(';')[0].strip()
+    if content_type in ('text/csv', 'application/csv'):
+        return 'csv'
+    if content_type in ('application/x-ndjson', 'application/jsonl', 'application/ndjson'):
+        return 'ndjson'
+    return None
+
+
+def leer_filas(flujo, formato):
+    """Genera (numero_de_fila, dict | ErrorFila) a partir de un flujo binario."""
+    texto = io.TextIOWrapper(flujo, encoding='utf-8-sig', newline='')
+    if formato == 'csv':
+        for numero, fila in enumerate(csv.DictReader(texto), start=1):
+            yield numero, {k.strip(): (v.strip() if isinstance(v, str) else v)
+                           for k, v in fila.items() if k}
+        return
+
+    for numero, linea in enumerate(texto, start=1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError:
+            yield numero, ErrorFila("JSON inválido")
+            continue
+        if not isinstance(fila, dict):
+            yield numero, ErrorFila("Cada línea debe ser un objeto JSON")
+            continue
+        yield numero, fila
+
+
+def _fecha(valor, campo, requerida=True):
+    if valor in (None, ''):
+        if requerida:
+            raise ErrorFila(f"Falta el campo requerido o está vacío: {campo}")
+        return None
+    try:
+        return datetime.strptime(str(valor), "%Y-%m-%d").date()
+    except ValueError:
+        raise ErrorFila(f"Formato de fecha inválido en {campo} (use YYYY-MM-DD)")
+
+
+# Largo máximo de los campos de texto (el de la columna)
+LARGOS_EQUIPO = {
+    campo: Equipo.__table__.c[campo].type.length
+    for campo in ('codigo', 'nombre', 'marca', 'modelo', 'estado', 'imagen_url')
+}
+LARGOS_MANTENIMIENTO = {
+    campo: Mantenimiento.__table__.c[campo].type.length for campo in ('tipo', 'agente', 'descripcion')
+}
+
+
+def _texto(valor, campo, largos=LARGOS_MANTENIMIENTO):
+    if valor in (None, ''):
+        return None
+    largo = largos[campo]
+    if not isinstance(valor, str):
+        raise ErrorFila(f"{campo} debe ser texto")
+    if len(valor) > largo:
+        raise ErrorFila(f"{campo} admite hasta {largo} caracteres")
+    return valor
+
+
+def _validar_equipo(fila):
+    for campo in ['nombre', 'marca', 'modelo', 'fecha_compra', 'periodo_mantenimiento', 'estado']:
+        if fila.get(campo) in (None, ''):
+            raise ErrorFila(f"Falta el campo requerido o está vacío: {campo}")
+
+    try:
+        periodo = int(fila['periodo_mantenimiento'])
+    except (TypeError, ValueError):
+        raise ErrorFila("periodo_mantenimiento debe ser un número entero de meses")
+
+    codigo = fila.get('codigo')
+    if isinstance(codigo, int) and not isinstance(codigo, bool):
+        codigo = str(codigo)  # NDJSON: {"codigo": 120}
+    fecha_compra = _fecha(fila['fecha_compra'], 'fecha_compra')
+    return {
+        "codigo": _texto(codigo, 'codigo', LARGOS_EQUIPO),
+        "nombre": _texto(fila['nombre'], 'nombre', LARGOS_EQUIPO),
+        "marca": _texto(fila['marca'], 'marca', LARGOS_EQUIPO),
+        "modelo": _texto(fila['modelo'], 'modelo', LARGOS_EQUIPO),
+        "fecha_compra": fecha_compra,
+        "periodo_mantenimiento": periodo,
+        "estado": _texto(fila['estado'], 'estado', LARGOS_EQUIPO),
+        "imagen_url": _texto(fila.get('imagen_url'), 'imagen_url', LARGOS_EQUIPO),
+        "proximo_mantenimiento": (_fecha(fila.get('proximo_mantenimiento'), 'proximo_mantenimiento', False)
+                                  or estimar_proximo(fecha_compra, periodo)),
+        "ultimo_mantenimiento": fecha_compra,
+    }
+
+
+def _validar_mantenimiento(fila):
+    for campo in ['equipo_id', 'tipo', 'fecha']:
+        if fila.get(campo) in (None, ''):
+            raise ErrorFila(f"Falta campo requerido: {campo}")
+    try:
+        equipo_id = int(fila['equipo_id'])
+    except (TypeError, ValueError):
+        raise ErrorFila("equipo_id debe ser un número entero")
+
+    return {
+        "tipo": _texto(fila['tipo'], 'tipo'),
+        "fecha": _fecha(fila['fecha'], 'fecha'),
+        "agente": _texto(fila.get('agente'), 'agente'),
+        "descripcion": _texto(fila.get('descripcion'), 'descripcion'),
+        "equipo_id": equipo_id,
+    }
+
+
+def _lotes(filas, tamano):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class _Reporte:
+    def __init__(self):
+        self.filas = 0
+        self.insertados = 0
+        self.errores = []
+
+    def error(self, numero, mensaje):
+        self.errores.append({"fila": numero, "error": str(mensaje)})
+
+    def como_dict(self):
+        return {"filas": self.filas, "insertados": self.insertados, "errores": self.errores}
+
+
+def _insertar(modelo, reporte, validos):
+    """Inserta el lote con un executemany; si falla, reintenta fila por fila.
+
+    Cada intento va en un SAVEPOINT, así una fila conflictiva solo descarta
+    su propia inserción. Cualquier error de la base (integridad, tipo o
+    largo que la validación no atajó) queda en el reporte de su fila. El
+    commit lo hace el llamador.
+    """
+    if not validos:
+        return []
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(modelo), [valores for _, valores in validos])
+        insertados = validos
+    except DBAPIError:
+        insertados = []
+        for numero, valores in validos:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(modelo), [valores])
+                insertados.append((numero, valores))
+            except IntegrityError as e:
+                reporte.error(numero, f"Violación de integridad: {e.orig}")
+            except DBAPIError as e:
+                reporte.error(numero, f"Valor rechazado por la base: {e.orig}")
+
+    reporte.insertados += len(insertados)
+    return insertados
+
+
+def importar_equipos(filas, tamano_lote=TAMANO_LOTE):
+    reporte = _Reporte()
+
+    for lote in _lotes(filas, tamano_lote):
+        validos = []
+        for numero, fila in lote:
+            reporte.filas += 1
+            try:
+                if isinstance(fila, ErrorFila):
+                    raise fila
+                validos.append((numero, _validar_equipo(fila)))
+            except ErrorFila as e:
+                reporte.error(numero, e)
+
+        # Códigos repetidos (dentro del lote o ya existentes)
+        pedidos = [v["codigo"] for _, v in validos if v["codigo"]]
+        existentes = set()
+        if pedidos:
+            existentes = set(db.session.execute(
+                select(Equipo.codigo).where(Equipo.codigo.in_(pedidos))
+            ).scalars())
+        vistos, filtrados = set(), []
+        for numero, valores in validos:
+            codigo = valores["codigo"]
+            if codigo and (codigo in existentes or codigo in vistos):
+                reporte.error(numero, f"El código {codigo} ya existe")
+                continue
+            if codigo:
+                vistos.add(codigo)
+            filtrados.append((numero, valores))
+
+        # Códigos nuevos reservados en bloque para todo el lote
+        sin_codigo = [valores for _, valores in filtrados if not valores["codigo"]]
+        if sin_codigo:
+            for valores, codigo in zip(sin_codigo, generador_codigos.reservar(len(sin_codigo))):
+                valores["codigo"] = codigo
+
+        if _insertar(Equipo, reporte, filtrados):
+            marcar_cambio('equipos', 'creado')
+        db.session.commit()
+
+    return reporte.como_dict()
+
+
+def importar_mantenimientos(filas, tamano_lote=TAMANO_LOTE):
+    reporte = _Reporte()
+
+    for lote in _lotes(filas, tamano_lote):
+        validos = []
+        for numero, fila in lote:
+            reporte.filas += 1
+            try:
+                if isinstance(fila, ErrorFila):
+                    raise fila
+                validos.append((numero, _validar_mantenimiento(fila)))
+            except ErrorFila as e:
+                reporte.error(numero, e)
+
+        ids = {v["equipo_id"] for _, v in validos}
+        existentes = set(db.session.execute(
+            select(Equipo.id).where(Equipo.id.in_(ids))
+        ).scalars()) if ids else set()
+
+        filtrados = []
+        for numero, valores in validos:
+            if valores["equipo_id"] not in existentes:
+                reporte.error(numero, "Equipo no encontrado")
+            else:
+                filtrados.append((numero, valores))
+
+        insertados = _insertar(Mantenimiento, reporte, filtrados)
+        if insertados:
+            # Una recomputación agrupada por lote, no una por fila
+            recalcular_fechas_de(v["equipo_id"] for _, v in insertados)
+            historial.ajustar((v["fecha"], v["equipo_id"], v["tipo"]) for _, v in insertados)
+            marcar_cambio('mantenimientos', 'creado')
+            marcar_cambio('equipos', 'actualizado')
+        db.session.commit()
+
+    return reporte.como_dict()
+
+
+def registrar_lote(items, hoy=None):
+    """Registra una lista de mantenimientos (JSON) en una sola transacción.
+
+    Devuelve un resultado por ítem, en el mismo orden: {"indice", "id"} si
+    se insertó o {"indice", "error"} si no. Las fechas de cada equipo
+    afectado se recalculan una vez, con un único agregado agrupado.
+    """
+    resultados = [None] * len(items)
+    validos = []
+    for indice, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ErrorFila("Cada mantenimiento debe ser un objeto JSON")
+            validos.append((indice, _validar_mantenimiento(item)))
+        except ErrorFila as e:
+            resultados[indice] = {"indice": indice, "error": str(e)}
+
+    ids = {v["equipo_id"] for _, v in validos}
+    existentes = set(db.session.execute(
+        select(Equipo.id).where(Equipo.id.in_(ids))
+    ).scalars()) if ids else set()
+
+    filtrados = []
+    for indice, valores in validos:
+        if valores["equipo_id"] in existentes:
+            filtrados.append((indice, valores))
+        else:
+            resultados[indice] = {"indice": indice, "error": "Equipo no encontrado"}
+
+    if filtrados:
+        # Un INSERT de varias filas con RETURNING; los ids se asignan por
+        # posición. Donde se puede sin partir el INSERT (PostgreSQL) se pide
+        # RETURNING en el orden de los parámetros. SQLite lo haría fila por
+        # fila, pero ahí la transacción es el único escritor y el rowid crece
+        # en el orden de VALUES: basta con ordenar los ids.
+        sqlite = db.session.get_bind().dialect.name == 'sqlite'
+        ids = list(db.session.execute(
+            insert(Mantenimiento).returning(Mantenimiento.id, sort_by_parameter_order=not sqlite),
+            [valores for _, valores in filtrados]
+        ).scalars())
+        if sqlite:
+            ids.sort()
+        for (indice, _), mantenimiento_id in zip(filtrados, ids):
+            resultados[indice] = {"indice": indice, "id": mantenimiento_id}
+
+        recalcular_fechas_de((v["equipo_id"] for _, v in filtrados), hoy)
+        historial.ajustar((v["fecha"], v["equipo_id"], v["tipo"]) for _, v in filtrados)
+        marcar_cambio('mantenimientos', 'creado')
+        for equipo_id in {v["equipo_id"] for _, v in filtrados}:
+            marcar_cambio('equipos', 'actualizado', equipo_id)
+
+    return resultados, len(filtrados)
+
+
+IMPORTADORES = {
+    'equipos': importar_equipos,
+    'mantenimientos': importar_mantenimientos,
+}
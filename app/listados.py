@@ -0,0 +1,177 @@
+import base64
+import json
+from datetime import date, datetime
+from urllib.parse import urlencode
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import Date, Integer, and_, or_, tuple_
+
+# ============================================================
+# 📄 Utilidades para listados paginados (cursor / keyset)
+# ============================================================
+
+LIMITE_MAXIMO = 1000
+FILAS_POR_LOTE = 500  # filas que se piden al cursor del servidor en modo streaming
+
+
+def valor_json(valor):
+    # Las fechas viajan siempre como YYYY-MM-DD
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def leer_limite():
+    limite = request.args.get('limit')
+    if limite is None or limite == '':
+        return None
+    try:
+        limite = int(limite)
+    except ValueError:
+        raise ValueError("El parámetro limit debe ser un número entero")
+    if limite < 1:
+        raise ValueError("El parámetro limit debe ser mayor que cero")
+    return min(limite, LIMITE_MAXIMO)
+
+
+def leer_campos(esquema):
+    # ?fields=id,nombre,estado → solo se cargan esas columnas
+    fields = request.args.get('fields')
+    if not fields:
+        return list(esquema.campos)
+
+    campos = [c.strip() for c in fields.split(',') if c.strip()]
+    esquema.validar(campos)
+    return campos
+
+
+def codificar_cursor(valores):
+    crudo = json.dumps([valor_json(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, cantidad):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except Exception:
+        raise ValueError("Cursor inválido")
+    if not isinstance(valores, list) or len(valores) != cantidad:
+        raise ValueError("Cursor inválido")
+    return valores
+
+
+class OrdenKeyset:
+    """Orden estable (columna, id) y el cursor que lo continúa.
+
+    El cursor guarda [valor, id] de la última fila (o solo [id] si se
+    ordena por id). La condición usa comparación de tuplas, que la base
+    resuelve como un rango sobre el índice (columna, id). Los NULL van
+    siempre después de cualquier valor (al final en ascendente, al
+    principio en descendente), igual que en PostgreSQL.
+    """
+
+    def __init__(self, columna, id_columna, descendente=False):
+        self.columna = columna
+        self.id = id_columna
+        self.descendente = descendente
+        self.solo_id = columna is id_columna
+        self.nulos = not self.solo_id and columna.nullable
+
+    def order_by(self):
+        if self.solo_id:
+            return [self.id.desc() if self.descendente else self.id.asc()]
+        if self.descendente:
+            columna = self.columna.desc().nulls_first() if self.nulos else self.columna.desc()
+            return [columna, self.id.desc()]
+        columna = self.columna.asc().nulls_last() if self.nulos else self.columna.asc()
+        return [columna, self.id.asc()]
+
+    def cursor(self, fila):
+        # La fila debe traer las columnas etiquetadas "orden" e "id"
+        if self.solo_id:
+            return codificar_cursor([fila.id])
+        return codificar_cursor([fila.orden, fila.id])
+
+    def columnas(self):
+        # Columnas extra que necesita el SELECT para armar el cursor
+        return [] if self.solo_id else [self.columna.label('orden')]
+
+    def despues_de(self, cursor):
+        """Condición WHERE para las filas que siguen al ``cursor``."""
+        if self.solo_id:
+            ultimo_id = _valor_cursor(decodificar_cursor(cursor, 1)[0], Integer())
+            return self.id < ultimo_id if self.descendente else self.id > ultimo_id
+
+        valor, ultimo_id = decodificar_cursor(cursor, 2)
+        ultimo_id = _valor_cursor(ultimo_id, Integer())
+        if valor is None:
+            if not self.nulos:
+                raise ValueError("Cursor inválido")
+            if self.descendente:
+                return or_(and_(self.columna.is_(None), self.id < ultimo_id), self.columna.isnot(None))
+            return and_(self.columna.is_(None), self.id > ultimo_id)
+
+        valor = _valor_cursor(valor, self.columna.type)
+        if self.descendente:
+            return tuple_(self.columna, self.id) < tuple_(valor, ultimo_id)
+        condicion = tuple_(self.columna, self.id) > tuple_(valor, ultimo_id)
+        return or_(condicion, self.columna.is_(None)) if self.nulos else condicion
+
+
+def _valor_cursor(valor, tipo):
+    try:
+        if isinstance(tipo, Date):
+            return datetime.strptime(valor, "%Y-%m-%d").date()
+        if isinstance(tipo, Integer):
+            if isinstance(valor, bool):
+                raise TypeError
+            return int(valor)
+        if not isinstance(valor, str):
+            raise TypeError
+        return valor
+    except (TypeError, ValueError):
+        raise ValueError("Cursor inválido")
+
+
+def quiere_ndjson():
+    if request.args.get('formato') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def respuesta_listado(filas, serializar, limite, cursor_de_fila, ndjson):
+    """Devuelve la lista (JSON o NDJSON) y, si hay más páginas, el cursor siguiente.
+
+    ``filas`` es un iterable de Row y ``serializar`` la función fila → dict
+    del esquema; en modo NDJSON sin límite las filas se consumen de a poco
+    desde el cursor del servidor, así que la memoria no depende del tamaño
+    de la tabla. Con límite la página (a lo sumo LIMITE_MAXIMO filas) se lee
+    antes de responder para mandar el cursor en las cabeceras, igual en
+    ambos formatos.
+    """
+    # Se pide una fila de más para saber si existe una página siguiente
+    siguiente = None
+    if limite is not None:
+        filas = list(filas)
+        if len(filas) > limite:
+            filas = filas[:limite]
+            siguiente = cursor_de_fila(filas[-1])
+
+    if ndjson:
+        dumps = current_app.json.dumps
+
+        def generar():
+            for fila in filas:
+                yield dumps(serializar(fila)) + '\n'
+
+        respuesta = Response(stream_with_context(generar()), mimetype='application/x-ndjson')
+    else:
+        respuesta = jsonify([serializar(fila) for fila in filas])
+
+    if siguiente:
+        respuesta.headers['X-Siguiente-Cursor'] = siguiente
+        args = request.args.to_dict()
+        args['cursor'] = siguiente
+        respuesta.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return respuesta
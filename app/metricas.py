@@ -0,0 +1,222 @@
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, deque
+
+from flask import Response, current_app, g, has_app_context, has_request_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.cache import cache_dashboard
+
+# ============================================================
+# ⏱️ Métricas por endpoint: latencia, SQL y consultas lentas
+# ============================================================
+# Por cada petición se mide la duración total y cuántas sentencias SQL
+# ejecutó (y cuánto tardaron), usando los eventos del Engine. Los datos se
+# agregan en histogramas de cubetas fijas (costo O(1) por petición) y se
+# exponen en /metrics con el formato de texto de Prometheus. Cada
+# respuesta lleva además una cabecera Server-Timing.
+#
+# /metrics y /metrics/consultas-lentas (que muestra SQL) solo existen si se
+# define METRICAS_TOKEN y piden "Authorization: Bearer <token>".
+#
+# En las respuestas en streaming (NDJSON, CSV) las consultas corren
+# mientras se envía el cuerpo: su SQL se suma al endpoint cuando se cierra
+# la respuesta, no al devolverla.
+
+CUBETAS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histograma:
+    __slots__ = ('cubetas', 'suma', 'cantidad')
+
+    def __init__(self):
+        self.cubetas = [0] * (len(CUBETAS) + 1)
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor):
+        self.cubetas[bisect_left(CUBETAS, valor)] += 1
+        self.suma += valor
+        self.cantidad += 1
+
+
+class Metricas:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(_Histograma)      # (endpoint, método) → histograma
+        self.respuestas = defaultdict(int)             # (endpoint, método, status) → total
+        self.sql_sentencias = defaultdict(int)         # endpoint → total
+        self.sql_segundos = defaultdict(float)         # endpoint → total
+        self.consultas_lentas = deque(maxlen=50)
+        self.umbral_lento = 0.2
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('METRICAS_ACTIVAS', True):
+            return
+        self.umbral_lento = app.config.get('METRICAS_CONSULTA_LENTA_MS', 200) / 1000
+        self.consultas_lentas = deque(maxlen=app.config.get('METRICAS_MUESTRAS_LENTAS', 50))
+        app.extensions['metricas'] = self
+        _escuchar_engine()
+
+        app.before_request(self._antes)
+        app.after_request(self._despues)
+        self.token = app.config.get('METRICAS_TOKEN')
+        if self.token:
+            app.add_url_rule('/metrics', 'metricas', self._protegida(self.exportar), methods=['GET'])
+            app.add_url_rule('/metrics/consultas-lentas', 'consultas_lentas',
+                             self._protegida(self.exportar_lentas), methods=['GET'])
+
+    def _protegida(self, vista):
+        def envoltura():
+            enviado = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(enviado.encode(), f'Bearer {self.token}'.encode()):
+                return jsonify({"error": "No autorizado"}), 401, {'WWW-Authenticate': 'Bearer'}
+            return vista()
+        return envoltura
+
+    # --------------------------------------------------------
+    # Ciclo de la petición
+    # --------------------------------------------------------
+    def _antes(self):
+        g._metricas_inicio = time.perf_counter()
+        g._metricas_sql = 0
+        g._metricas_sql_segundos = 0.0
+
+    def _despues(self, respuesta):
+        inicio = g.get('_metricas_inicio')
+        if inicio is None:
+            return respuesta
+        duracion = time.perf_counter() - inicio
+        endpoint = _endpoint()
+        sentencias = g.get('_metricas_sql', 0)
+        segundos_sql = g.get('_metricas_sql_segundos', 0.0)
+
+        with self._lock:
+            self.latencias[(endpoint, request.method)].observar(duracion)
+            self.respuestas[(endpoint, request.method, respuesta.status_code)] += 1
+        if respuesta.is_streamed:
+            # El SQL de generar el cuerpo aún no corrió: se cuenta todo al cerrar
+            contexto = g._get_current_object()
+            respuesta.call_on_close(lambda: self._sumar_sql(
+                endpoint, contexto.get('_metricas_sql', 0), contexto.get('_metricas_sql_segundos', 0.0)))
+        else:
+            self._sumar_sql(endpoint, sentencias, segundos_sql)
+
+        respuesta.headers.add(
+            'Server-Timing',
+            f'app;dur={duracion * 1000:.1f}, db;dur={segundos_sql * 1000:.1f};desc="{sentencias} consultas"'
+        )
+        return respuesta
+
+    def _sumar_sql(self, endpoint, sentencias, segundos):
+        with self._lock:
+            self.sql_sentencias[endpoint] += sentencias
+            self.sql_segundos[endpoint] += segundos
+
+    def _registrar_sql(self, sentencia, duracion):
+        if has_request_context():
+            g._metricas_sql = g.get('_metricas_sql', 0) + 1
+            g._metricas_sql_segundos = g.get('_metricas_sql_segundos', 0.0) + duracion
+        if duracion >= self.umbral_lento:
+            self.consultas_lentas.append({
+                "endpoint": _endpoint() if has_request_context() else None,
+                "ms": round(duracion * 1000, 1),
+                "sql": sentencia[:500],
+                "momento": time.time(),
+            })
+
+    # --------------------------------------------------------
+    # Exportación
+    # --------------------------------------------------------
+    def exportar(self):
+        lineas = []
+        with self._lock:
+            lineas += [
+                '# HELP buceo_http_request_duration_seconds Duración de las peticiones HTTP.',
+                '# TYPE buceo_http_request_duration_seconds histogram',
+            ]
+            for (endpoint, metodo), h in sorted(self.latencias.items()):
+                etiquetas = f'endpoint="{endpoint}",method="{metodo}"'
+                acumulado = 0
+                for limite, cantidad in zip(CUBETAS + (float('inf'),), h.cubetas):
+                    acumulado += cantidad
+                    le = '+Inf' if limite == float('inf') else repr(limite)
+                    lineas.append(f'buceo_http_request_duration_seconds_bucket{{{etiquetas},le="{le}"}} {acumulado}')
+                lineas.append(f'buceo_http_request_duration_seconds_sum{{{etiquetas}}} {h.suma:.6f}')
+                lineas.append(f'buceo_http_request_duration_seconds_count{{{etiquetas}}} {h.cantidad}')
+
+            lineas += [
+                '# HELP buceo_http_responses_total Respuestas HTTP por código de estado.',
+                '# TYPE buceo_http_responses_total counter',
+            ]
+            for (endpoint, metodo, status), total in sorted(self.respuestas.items()):
+                lineas.append(f'buceo_http_responses_total{{endpoint="{endpoint}",method="{metodo}",status="{status}"}} {total}')
+
+            lineas += [
+                '# HELP buceo_sql_statements_total Sentencias SQL ejecutadas por endpoint.',
+                '# TYPE buceo_sql_statements_total counter',
+            ]
+            for endpoint, total in sorted(self.sql_sentencias.items()):
+                lineas.append(f'buceo_sql_statements_total{{endpoint="{endpoint}"}} {total}')
+
+            lineas += [
+                '# HELP buceo_sql_duration_seconds_total Tiempo en SQL por endpoint.',
+                '# TYPE buceo_sql_duration_seconds_total counter',
+            ]
+            for endpoint, total in sorted(self.sql_segundos.items()):
+                lineas.append(f'buceo_sql_duration_seconds_total{{endpoint="{endpoint}"}} {total:.6f}')
+
+        cache = cache_dashboard.estadisticas()
+        lineas += [
+            '# HELP buceo_dashboard_cache_hits_total Resúmenes del dashboard servidos desde la caché.',
+            '# TYPE buceo_dashboard_cache_hits_total counter',
+            f'buceo_dashboard_cache_hits_total {cache["aciertos"]}',
+            '# HELP buceo_dashboard_cache_misses_total Resúmenes del dashboard calculados en la base.',
+            '# TYPE buceo_dashboard_cache_misses_total counter',
+            f'buceo_dashboard_cache_misses_total {cache["fallos"]}',
+        ]
+        return Response('\n'.join(lineas) + '\n', mimetype='text/plain; version=0.0.4')
+
+    def exportar_lentas(self):
+        return jsonify(list(self.consultas_lentas)), 200
+
+
+def _endpoint():
+    # La regla ("/equipos/<int:id>") mantiene acotado el número de etiquetas
+    return request.url_rule.rule if request.url_rule else 'desconocido'
+
+
+_escuchando = False
+
+
+def _escuchar_engine():
+    global _escuchando
+    if _escuchando:
+        return
+    _escuchando = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _antes_sql(conn, cursor, sentencia, parametros, contexto, executemany):
+        conn.info.setdefault('_metricas_inicio', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _despues_sql(conn, cursor, sentencia, parametros, contexto, executemany):
+        pila = conn.info.get('_metricas_inicio')
+        if not pila:
+            return
+        duracion = time.perf_counter() - pila.pop()
+        if has_app_context():
+            metricas = current_app.extensions.get('metricas')
+            if metricas is not None:
+                metricas._registrar_sql(sentencia, duracion)
+
+    @event.listens_for(Engine, 'handle_error')
+    def _error_sql(contexto):
+        conexion = contexto.connection
+        if conexion is not None and conexion.info.get('_metricas_inicio'):
+            conexion.info['_metricas_inicio'].pop()
@@ -11,14 +11,46 @@ class Equipo(db.Model):
     fecha_compra = db.Column(db.Date)
     periodo_mantenimiento = db.Column(db.Integer)  # se cambia a entero
     imagen_url = db.Column(db.String(255))
+    # Variantes redimensionadas de la imagen subida: {"miniatura": url, ...}
+    imagen_variantes = db.Column(db.JSON)
     estado = db.Column(db.String(50))
     proximo_mantenimiento = db.Column(db.Date)
     ultimo_mantenimiento = db.Column(db.Date)
 
+    __table_args__ = (
+        db.Index('ix_equipos_estado_lower', db.func.lower(estado)),
+        db.Index('ix_equipos_proximo_mantenimiento', 'proximo_mantenimiento', 'id'),
+        # Filtros y orden del listado (cursor sobre columna, id): uno por
+        # cada columna de COLUMNAS_ORDEN en app/filtros.py
+        db.Index('ix_equipos_codigo_id', 'codigo', 'id'),
+        db.Index('ix_equipos_nombre_id', 'nombre', 'id'),
+        db.Index('ix_equipos_marca_id', 'marca', 'id'),
+        db.Index('ix_equipos_modelo_id', 'modelo', 'id'),
+        db.Index('ix_equipos_estado_id', 'estado', 'id'),
+        db.Index('ix_equipos_fecha_compra_id', 'fecha_compra', 'id'),
+        db.Index('ix_equipos_ultimo_mantenimiento_id', 'ultimo_mantenimiento', 'id'),
+    )
+
     def __repr__(self):
         return f'<Equipo {self.nombre}>'
 
+# Secuencia de códigos de equipo (solo se usa en PostgreSQL)
+equipos_codigo_seq = db.Sequence('equipos_codigo_seq', metadata=db.metadata)
+
+
+class Contador(db.Model):
+    # Contadores para motores sin secuencias (SQLite en pruebas)
+    __tablename__ = 'contadores'
+
+    nombre = db.Column(db.String(50), primary_key=True)
+    valor = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<Contador {self.nombre}={self.valor}>'
+
 class Mantenimiento(db.Model):
+    # En PostgreSQL la tabla está particionada por año de fecha (la PK real
+    # es (id, fecha)); eso lo crea la migración y el ORM sigue usando el id
     __tablename__ = 'mantenimientos'
 
     id = db.Column(db.Integer, primary_key=True)
@@ -26,9 +58,56 @@ class Mantenimiento(db.Model):
     fecha = db.Column(db.Date, nullable=False)
     agente = db.Column(db.String(100))
     descripcion = db.Column(db.String(200))
-    equipo_id = db.Column(db.Integer, db.ForeignKey('equipos.id'), nullable=False)
+    # Al borrar un equipo la base borra sus mantenimientos (ON DELETE CASCADE);
+    # passive_deletes evita que el ORM los cargue para borrarlos uno a uno
+    equipo_id = db.Column(db.Integer, db.ForeignKey('equipos.id', ondelete='CASCADE'), nullable=False)
+
+    equipo = db.relationship('Equipo', backref=db.backref(
+        'mantenimientos', lazy=True, cascade='all, delete', passive_deletes=True
+    ))
 
-    equipo = db.relationship('Equipo', backref=db.backref('mantenimientos', lazy=True))
+    __table_args__ = (
+        # Recalcular fechas de un equipo: MIN/MAX por (equipo_id, fecha)
+        db.Index('ix_mantenimientos_equipo_fecha', 'equipo_id', 'fecha'),
+        # Listado por fecha (cursor fecha, id) y filtros del dashboard
+        db.Index('ix_mantenimientos_fecha_id', 'fecha', 'id'),
+        # SQLite reutiliza el mayor rowid si se borra: tras archivar, un
+        # mantenimiento nuevo podría tomar el id de uno archivado
+        {'sqlite_autoincrement': True},
+    )
 
     def __repr__(self):
         return f'<Mantenimiento {self.tipo} - Equipo {self.equipo_id}>'
+
+
+class MantenimientoArchivado(db.Model):
+    # Años viejos movidos por "flask archivar-mantenimientos" (app/archivo.py).
+    # Solo lectura: detalle por id y fechas de equipos sin mantenimientos recientes
+    __tablename__ = 'mantenimientos_archivo'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    tipo = db.Column(db.String(100), nullable=False)
+    fecha = db.Column(db.Date, nullable=False)
+    agente = db.Column(db.String(100))
+    descripcion = db.Column(db.String(200))
+    equipo_id = db.Column(db.Integer, db.ForeignKey('equipos.id', ondelete='CASCADE'), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_mantenimientos_archivo_equipo_fecha', 'equipo_id', 'fecha'),
+    )
+
+    def __repr__(self):
+        return f'<MantenimientoArchivado {self.tipo} - Equipo {self.equipo_id}>'
+
+
+class MantenimientoMensual(db.Model):
+    # Resumen por mes (YYYY-MM), equipo y tipo; lo mantienen las rutas de escritura
+    __tablename__ = 'mantenimientos_mensuales'
+
+    mes = db.Column(db.String(7), primary_key=True)
+    equipo_id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(100), primary_key=True)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<MantenimientoMensual {self.mes} equipo={self.equipo_id} {self.tipo}: {self.cantidad}>'
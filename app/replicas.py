@@ -0,0 +1,58 @@
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import create_engine
+
+from app.cambios import al_confirmar
+from app.database import db
+
+# ============================================================
+# 🪞 Lecturas en la réplica, escrituras en la primaria
+# ============================================================
+# Con REPLICA_DATABASE_URI configurada, las peticiones GET / HEAD leen de
+# la réplica y todo lo demás usa la primaria. Las escrituras siempre van
+# a la primaria (ver SesionEnrutada en app/database.py).
+#
+# Leer lo propio: tras confirmar una escritura se envía la cookie
+# COOKIE_PRIMARIA con el instante hasta el que ese cliente sigue leyendo
+# de la primaria (REPLICA_PEGAJOSA_SEGUNDOS), tiempo suficiente para que
+# la réplica alcance a la primaria.
+
+METODOS_LECTURA = ('GET', 'HEAD')
+COOKIE_PRIMARIA = 'leer_primaria'
+
+
+def pegado_a_primaria(valor):
+    """True si la cookie indica que el cliente escribió hace poco."""
+    try:
+        return float(valor) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+
+@al_confirmar
+def _recordar_escritura(cambios):
+    if has_request_context():
+        g._escritura_confirmada = True
+
+
+def init_app(app):
+    uri = app.config.get('REPLICA_DATABASE_URI')
+    if not uri:
+        return
+    # Engine propio (no un bind de Flask-SQLAlchemy): ningún modelo vive solo
+    # en la réplica, es la misma base con otro pool
+    app.extensions['replica'] = create_engine(uri, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    segundos = app.config.get('REPLICA_PEGAJOSA_SEGUNDOS', 5)
+
+    @app.before_request
+    def _elegir_base():
+        if request.method in METODOS_LECTURA and not pegado_a_primaria(request.cookies.get(COOKIE_PRIMARIA)):
+            db.session.info['lectura'] = True
+
+    @app.after_request
+    def _pegar_a_primaria(respuesta):
+        if g.get('_escritura_confirmada'):
+            respuesta.set_cookie(COOKIE_PRIMARIA, f"{time.time() + segundos:.3f}",
+                                 max_age=segundos, httponly=True, samesite='Lax')
+        return respuesta
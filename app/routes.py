@@ -1,9 +1,32 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, g, request, jsonify, send_from_directory
 from app.database import db
-from app.models import Equipo, Mantenimiento
-from datetime import datetime
+from app.models import Equipo, Mantenimiento, MantenimientoArchivado
+from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import func 
+from sqlalchemy.exc import IntegrityError
+from app.codigos import generador_codigos
+from app.cache import cache_dashboard
+from app.cache_equipos import obtener_cache_equipos
+from app import archivo, borrado, historial
+from app.agenda import obtener_agenda
+from app.cambios import al_confirmar, marcar_cambio
+from app.versiones import condicional
+from app.consultas import (
+    consulta_equipos_sin_mantenimiento, consulta_estados_equipos,
+    consulta_resumen_mantenimientos, listar_equipos_sin_mantenimiento,
+    listar_historial, listar_proximos, resumir_estados, resumir_mantenimientos
+)
+from app.eventos import flujo, obtener_canal
+from app.imagenes import ImagenInvalida, obtener_procesador
+from app.importacion import IMPORTADORES, TAMANO_LOTE, detectar_formato, leer_filas, registrar_lote
+from app.servicios import estimar_proximo, recalcular_fechas, registrar_mantenimiento
+from app.filtros import filtros_equipos, orden_equipos
+from app.listados import (
+    FILAS_POR_LOTE, OrdenKeyset, leer_campos, leer_limite, quiere_ndjson,
+    respuesta_listado
+)
+from app.serializadores import ESQUEMA_EQUIPO, ESQUEMA_MANTENIMIENTO, ESQUEMA_MANTENIMIENTO_ARCHIVADO
+from app.exportacion import CONSULTAS_EXPORTACION, leer_formato, respuesta_exportacion
 
 
 routes = Blueprint('routes', __name__)
@@ -30,9 +53,8 @@ def agregar_equipo():
     except Exception:
         return jsonify({"error": "Formato de fecha inválido (use YYYY-MM-DD)"}), 400
 
-    # 🧮 Generar código automáticamente (siguiente número disponible)
-    ultimo_equipo = Equipo.query.order_by(Equipo.id.desc()).first()
-    nuevo_codigo = str(int(ultimo_equipo.codigo) + 1) if ultimo_equipo and ultimo_equipo.codigo.isdigit() else "1"
+    # 🧮 Código: el enviado por el cliente o el siguiente de la secuencia
+    nuevo_codigo = data.get('codigo') or generador_codigos.siguiente()
 
     # 🧭 Calcular próximo mantenimiento
     periodo = data['periodo_mantenimiento'].lower()
@@ -44,8 +66,12 @@ def agregar_equipo():
         # si el frontend envía algo inválido, lo ignoramos (no abortamos)
             proximo_mantenimiento = None
 
+    # Sin fecha enviada: se estima desde la compra, igual que recalcular_fechas
+    if proximo_mantenimiento is None:
+        proximo_mantenimiento = estimar_proximo(fecha_compra, data['periodo_mantenimiento'])
+
     nuevo_equipo = Equipo(
-    codigo=data['codigo'],
+    codigo=str(nuevo_codigo),
     nombre=data['nombre'],
     marca=data['marca'],
     modelo=data['modelo'],
@@ -58,6 +84,12 @@ def agregar_equipo():
 )
 
     db.session.add(nuevo_equipo)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": f"El código {nuevo_codigo} ya existe"}), 409
+    marcar_cambio('equipos', 'creado', nuevo_equipo.id)
     db.session.commit()
 
     return jsonify({"mensaje": "✅ Equipo agregado correctamente", "codigo": nuevo_equipo.codigo}), 201
@@ -86,19 +118,22 @@ def editar_equipo(id):
         except Exception:
             return jsonify({"error": "Formato de fecha inválido (use YYYY-MM-DD)"}), 400
     if "periodo_mantenimiento" in data:
-        equipo.periodo_mantenimiento = data["periodo_mantenimiento"]
+        try:
+            equipo.periodo_mantenimiento = int(data["periodo_mantenimiento"])
+        except (TypeError, ValueError):
+            return jsonify({"error": "periodo_mantenimiento debe ser un número entero de meses"}), 400
     if "estado" in data:
         equipo.estado = data["estado"]
     if "imagen_url" in data:  
+        if data["imagen_url"] != equipo.imagen_url:
+            equipo.imagen_variantes = None  # las variantes eran de la imagen anterior
         equipo.imagen_url = data["imagen_url"]
-    try:
-        from dateutil.relativedelta import relativedelta
-        if equipo.fecha_compra and equipo.periodo_mantenimiento:
-            meses = int(equipo.periodo_mantenimiento)
-            equipo.proximo_mantenimiento = equipo.fecha_compra + relativedelta(months=meses)
-    except ValueError:
-        equipo.proximo_mantenimiento = None
 
+    # 🔁 Fechas con la regla común (historial + periodo), no solo desde la compra
+    if "fecha_compra" in data or "periodo_mantenimiento" in data:
+        recalcular_fechas(equipo)
+
+    marcar_cambio('equipos', 'actualizado', equipo.id)
     db.session.commit()
     return jsonify({"mensaje": "✅ Equipo actualizado correctamente"})
 
@@ -110,57 +145,188 @@ def eliminar_equipo(id):
     if not equipo:
         return jsonify({"error": "Equipo no encontrado"}), 404
 
-    # Eliminar mantenimientos asociados para evitar error de clave foránea
-    for m in equipo.mantenimientos:
-        db.session.delete(m)
-
+    # Los mantenimientos asociados los borra la base (ON DELETE CASCADE)
+    historial.quitar_equipo(equipo.id)
     db.session.delete(equipo)
+    marcar_cambio('equipos', 'eliminado', id)
+    marcar_cambio('mantenimientos', 'eliminado')
     db.session.commit()
     return jsonify({"mensaje": "🗑️ Equipo y mantenimientos asociados eliminados correctamente"}), 200
 
 
+# Eliminar varios equipos: {"ids": [...]} o un filtro {"estado": "..."}
+@routes.route('/equipos/eliminar', methods=['POST'])
+def eliminar_equipos():
+    try:
+        datos = request.get_json() or {}
+        condiciones = borrado.condiciones_equipos(datos)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    eliminados, ids = borrado.eliminar_equipos(condiciones, 'ids' in datos)
+    db.session.commit()
+    respuesta = {"mensaje": "🗑️ Equipos eliminados", "eliminados": eliminados}
+    if ids is not None:
+        respuesta["ids"] = ids
+    return jsonify(respuesta), 200
+
+
 # Obtener detalle de un equipo
 @routes.route('/equipos/<int:id>', methods=['GET'])
+@condicional('equipos')
 def detalle_equipo(id):
-    e = Equipo.query.get(id)
-    if not e:
+    # JSON ya serializado desde la caché de detalle (app/cache_equipos.py)
+    cache = obtener_cache_equipos()
+    cuerpo, generacion = cache.obtener(id)
+    if cuerpo is None:
+        fila = db.session.execute(ESQUEMA_EQUIPO.consulta().where(Equipo.id == id)).first()
+        if not fila:
+            return jsonify({"error": "Equipo no encontrado"}), 404
+        cuerpo = current_app.json.dumps(ESQUEMA_EQUIPO.serializador()(fila)).encode()
+        cache.guardar(id, cuerpo, generacion)
+
+    return current_app.response_class(cuerpo, mimetype='application/json')
+
+
+# Aciertos, fallos y desalojos de la caché de detalle
+@routes.route('/equipos/cache', methods=['GET'])
+def equipos_cache():
+    return jsonify(obtener_cache_equipos().estadisticas()), 200
+
+
+# ============================================================
+# 🖼️ Imagen de un equipo (subida en streaming + variantes)
+# ============================================================
+# Cuerpo crudo (Content-Type: image/jpeg ...) o multipart con el campo
+# "imagen". Las variantes se generan en segundo plano: la respuesta es
+# 202 y aparecen en imagen_variantes cuando están listas.
+@routes.route('/equipos/<int:id>/imagen', methods=['PUT', 'POST'])
+def subir_imagen(id):
+    equipo = db.session.get(Equipo, id)
+    if not equipo:
         return jsonify({"error": "Equipo no encontrado"}), 404
 
+    procesador = obtener_procesador()
+    if request.mimetype == 'multipart/form-data':
+        parte = request.files.get('imagen')
+        if parte is None:
+            return jsonify({"error": "Falta el archivo en el campo imagen"}), 400
+        stream = parte.stream
+    else:
+        if request.content_length and request.content_length > procesador.limite:
+            return jsonify({"error": f"La imagen supera el máximo de {procesador.limite} bytes"}), 413
+        stream = request.stream
+
+    try:
+        nombre = procesador.guardar(stream)
+    except ImagenInvalida as e:
+        return jsonify({"error": str(e)}), e.status
+
+    equipo.imagen_url = procesador.url(nombre)
+    equipo.imagen_variantes = None
+    marcar_cambio('equipos', 'actualizado', equipo.id)
+    db.session.commit()
+
+    pendiente = procesador.encolar(equipo.id, nombre)
+    db.session.refresh(equipo)
     return jsonify({
-        "id": e.id,
-        "codigo": e.codigo,
-        "nombre": e.nombre,
-        "marca": e.marca,
-        "modelo": e.modelo,
-        "fecha_compra": str(e.fecha_compra) if e.fecha_compra else None,
-        "periodo_mantenimiento": e.periodo_mantenimiento,
-        "estado": e.estado,
-        "imagen_url": e.imagen_url,
-        "proximo_mantenimiento": str(e.proximo_mantenimiento) if e.proximo_mantenimiento else None,
-        "ultimo_mantenimiento": str(e.ultimo_mantenimiento) if e.ultimo_mantenimiento else None
-    })
-
-
-# Listar todos los equipos
+        "mensaje": "✅ Imagen guardada",
+        "imagen_url": equipo.imagen_url,
+        "imagen_variantes": equipo.imagen_variantes,
+    }), 202 if pendiente and equipo.imagen_variantes is None else 201
+
+
+@routes.route('/imagenes/<path:nombre>', methods=['GET'])
+def servir_imagen(nombre):
+    # El nombre es el hash del contenido: caché de un año e "immutable".
+    # conditional=True responde 304 (ETag / If-Modified-Since) y 206 (Range).
+    respuesta = send_from_directory(
+        current_app.config['IMAGENES_DIR'], nombre,
+        max_age=current_app.config.get('IMAGENES_MAX_AGE', 0), conditional=True
+    )
+    respuesta.cache_control.immutable = True
+    return respuesta
+
+
+# Listar equipos: filtros, búsqueda (?q=), orden y paginado por cursor
 @routes.route('/equipos', methods=['GET'])
+@condicional('equipos')
 def obtener_equipos():
-    equipos = Equipo.query.all()
-    resultado = []
-    for e in equipos:
-        resultado.append({
-            "id": e.id,
-            "codigo": e.codigo,
-            "nombre": e.nombre,
-            "marca": e.marca,
-            "modelo": e.modelo,
-            "fecha_compra": str(e.fecha_compra),
-            "periodo_mantenimiento": e.periodo_mantenimiento,
-            "estado": e.estado,
-            "imagen_url": e.imagen_url,
-            "proximo_mantenimiento": str(e.proximo_mantenimiento) if e.proximo_mantenimiento else None,
-            "ultimo_mantenimiento": str(e.ultimo_mantenimiento) if e.ultimo_mantenimiento else None
-        })
-    return jsonify(resultado)
+    try:
+        campos = leer_campos(ESQUEMA_EQUIPO)
+        limite = leer_limite()
+        condiciones = filtros_equipos(request.args)
+        orden = orden_equipos(request.args)
+        cursor = request.args.get('cursor')
+        if cursor:
+            condiciones.append(orden.despues_de(cursor))
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Solo se cargan las columnas pedidas (+ id y la columna de orden para el cursor)
+    consulta = (
+        ESQUEMA_EQUIPO.consulta(campos, extra=("id",))
+        .add_columns(*orden.columnas())
+        .where(*condiciones)
+        .order_by(*orden.order_by())
+    )
+
+    ndjson = quiere_ndjson()
+    if limite is not None:
+        consulta = consulta.limit(limite + 1)
+    elif ndjson:
+        consulta = consulta.execution_options(yield_per=FILAS_POR_LOTE)
+
+    filas = db.session.execute(consulta)
+    serializar = ESQUEMA_EQUIPO.serializador(campos)
+    return respuesta_listado(filas, serializar, limite, orden.cursor, ndjson)
+
+
+# Exportación completa (CSV o XLSX en streaming, mismos filtros que el listado)
+@routes.route('/equipos/exportar', methods=['GET'])
+@condicional('equipos')
+def exportar_equipos():
+    return _exportar('equipos')
+
+
+@routes.route('/mantenimientos/exportar', methods=['GET'])
+@condicional('mantenimientos', 'equipos')
+def exportar_mantenimientos():
+    return _exportar('mantenimientos')
+
+
+def _exportar(tabla):
+    try:
+        formato = leer_formato(request.args)
+        campos, consultas = CONSULTAS_EXPORTACION[tabla](request.args)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return respuesta_exportacion(tabla, formato, campos, consultas)
+
+
+# Importación masiva (CSV o NDJSON en el cuerpo, leído en streaming)
+@routes.route('/equipos/importar', methods=['POST'])
+def importar_equipos():
+    return _importar('equipos')
+
+
+@routes.route('/mantenimientos/importar', methods=['POST'])
+def importar_mantenimientos():
+    return _importar('mantenimientos')
+
+
+def _importar(tabla):
+    formato = detectar_formato(request.content_type, request.args.get('formato'))
+    if not formato:
+        return jsonify({"error": "Formato no soportado (use text/csv o application/x-ndjson)"}), 400
+
+    try:
+        tamano_lote = int(request.args.get('lote', TAMANO_LOTE))
+    except ValueError:
+        return jsonify({"error": "El parámetro lote debe ser un número entero"}), 400
+
+    reporte = IMPORTADORES[tabla](leer_filas(request.stream, formato), max(tamano_lote, 1))
+    return jsonify(reporte), 200
 
 
 # ============================================================
@@ -203,87 +369,101 @@ def agregar_mantenimiento():
     )
 
     db.session.add(nuevo)
-    db.session.commit()  # Guardar primero el mantenimiento
-
-    # 🔁 Recalcular las fechas del equipo según TODOS los mantenimientos
-    mantenimientos = Mantenimiento.query.filter_by(equipo_id=equipo.id).all()
-    today = datetime.now().date()
-    pasados, futuros = [], []
-
-    for m in mantenimientos:
-        if isinstance(m.fecha, str):
-            try:
-                f = datetime.strptime(m.fecha, "%Y-%m-%d").date()
-            except Exception:
-                continue
-        else:
-            f = m.fecha
-
-        if f <= today:
-            pasados.append(f)
-        else:
-            futuros.append(f)
-
-    equipo.ultimo_mantenimiento = max(pasados) if pasados else None
-    equipo.proximo_mantenimiento = min(futuros) if futuros else None
-
-    # Si no hay futuros → estimar siguiente preventivo desde el último
-    if equipo.proximo_mantenimiento is None and equipo.ultimo_mantenimiento and equipo.periodo_mantenimiento:
-        try:
-            meses = int(equipo.periodo_mantenimiento)
-            equipo.proximo_mantenimiento = equipo.ultimo_mantenimiento + relativedelta(months=meses)
-        except Exception:
-            pass
+    db.session.flush()
+
+    # 🔁 Actualizar fechas del equipo (incremental, misma transacción)
+    registrar_mantenimiento(equipo, fecha_obj)
+    historial.ajustar([(nuevo.fecha, nuevo.equipo_id, nuevo.tipo)])
 
+    marcar_cambio('mantenimientos', 'creado', nuevo.id)
+    marcar_cambio('equipos', 'actualizado', equipo.id)
     db.session.commit()
     return jsonify({"mensaje": "✅ Mantenimiento registrado correctamente", "id": nuevo.id}), 201
 
 
+# ============================================================
+# 📦 Registrar varios mantenimientos de una vez (una transacción)
+# ============================================================
+@routes.route('/mantenimientos/lote', methods=['POST'])
+def agregar_mantenimientos_lote():
+    data = request.get_json(silent=True)
+    items = data.get('mantenimientos') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Envíe una lista de mantenimientos (o {\"mantenimientos\": [...]})"}), 400
+    if len(items) > TAMANO_LOTE:
+        return jsonify({"error": f"Se pueden registrar como máximo {TAMANO_LOTE} mantenimientos por petición"}), 400
+
+    resultados, insertados = registrar_lote(items)
+    if not insertados:
+        db.session.rollback()
+        return jsonify({"error": "Ningún mantenimiento es válido", "resultados": resultados}), 400
+
+    db.session.commit()
+    return jsonify({
+        "mensaje": "✅ Mantenimientos registrados correctamente",
+        "insertados": insertados,
+        "errores": len(resultados) - insertados,
+        "resultados": resultados
+    }), 201
+
+
 # ============================================================
 # 📋 Listar mantenimientos (con opción de filtrar por equipo)
 # ============================================================
 @routes.route('/mantenimientos', methods=['GET'])
+@condicional('mantenimientos', 'equipos')
 def listar_mantenimientos():
     equipo_id = request.args.get('equipo_id')
-    query = Mantenimiento.query
+    # Orden estable (fecha desc, id desc) → el cursor es la pareja (fecha, id)
+    orden = OrdenKeyset(Mantenimiento.fecha, Mantenimiento.id, descendente=True)
+    try:
+        campos = leer_campos(ESQUEMA_MANTENIMIENTO)
+        limite = leer_limite()
+        cursor = request.args.get('cursor')
+        despues = orden.despues_de(cursor) if cursor else None
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    consulta = ESQUEMA_MANTENIMIENTO.consulta(campos, extra=("id",)).add_columns(*orden.columnas())
 
     if equipo_id:
-        query = query.filter_by(equipo_id=equipo_id)
+        consulta = consulta.where(Mantenimiento.equipo_id == equipo_id)
+
+    if despues is not None:
+        consulta = consulta.where(despues)
+
+    consulta = consulta.order_by(*orden.order_by())
 
-    mantenimientos = query.order_by(Mantenimiento.fecha.desc()).all()
-    resultado = []
-    for m in mantenimientos:
-        resultado.append({
-            "id": m.id,
-            "tipo": m.tipo,
-            "fecha": str(m.fecha),
-            "agente": m.agente,
-            "descripcion": m.descripcion,
-            "equipo_id": m.equipo_id,
-            "equipo_nombre": m.equipo.nombre if m.equipo else None
-        })
+    ndjson = quiere_ndjson()
+    if limite is not None:
+        consulta = consulta.limit(limite + 1)
+    elif ndjson:
+        consulta = consulta.execution_options(yield_per=FILAS_POR_LOTE)
 
-    return jsonify(resultado)
+    filas = db.session.execute(consulta)
+    serializar = ESQUEMA_MANTENIMIENTO.serializador(campos)
+    return respuesta_listado(filas, serializar, limite, orden.cursor, ndjson)
 
 
 # ============================================================
 # 🔍 Detalle de mantenimiento
 # ============================================================
 @routes.route('/mantenimientos/<int:id>', methods=['GET'])
+@condicional('mantenimientos', 'equipos')
 def detalle_mantenimiento(id):
-    m = Mantenimiento.query.get(id)
-    if not m:
+    # Una sola consulta: el nombre del equipo viene en el mismo JOIN
+    fila = db.session.execute(ESQUEMA_MANTENIMIENTO.consulta().where(Mantenimiento.id == id)).first()
+    if fila:
+        return jsonify(ESQUEMA_MANTENIMIENTO.serializador()(fila))
+
+    # Años archivados (flask archivar-mantenimientos): solo lectura
+    fila = db.session.execute(
+        ESQUEMA_MANTENIMIENTO_ARCHIVADO.consulta().where(MantenimientoArchivado.id == id)
+    ).first()
+    if not fila:
         return jsonify({"error": "Mantenimiento no encontrado"}), 404
 
-    return jsonify({
-        "id": m.id,
-        "tipo": m.tipo,
-        "fecha": str(m.fecha),
-        "agente": m.agente,
-        "descripcion": m.descripcion,
-        "equipo_id": m.equipo_id,
-        "equipo_nombre": m.equipo.nombre if m.equipo else None
-    })
+    return jsonify({**ESQUEMA_MANTENIMIENTO_ARCHIVADO.serializador()(fila), "archivado": True})
 
 
 # ============================================================
@@ -295,9 +475,12 @@ def editar_mantenimiento(id):
     mantenimiento = Mantenimiento.query.get(id)
 
     if not mantenimiento:
+        if archivo.esta_archivado(id):
+            return jsonify({"error": "El mantenimiento está archivado y no se puede modificar"}), 409
         return jsonify({"error": "Mantenimiento no encontrado"}), 404
 
     equipo = mantenimiento.equipo
+    antes = (mantenimiento.fecha, mantenimiento.equipo_id, mantenimiento.tipo)
 
     # Actualizar campos
     if "tipo" in data:
@@ -315,30 +498,29 @@ def editar_mantenimiento(id):
     if "descripcion" in data:
         mantenimiento.descripcion = data["descripcion"]
 
+    equipo_anterior = None
     if "equipo_id" in data and data["equipo_id"] != mantenimiento.equipo_id:
         nuevo_equipo = Equipo.query.get(data["equipo_id"])
         if not nuevo_equipo:
             return jsonify({"error": "Nuevo equipo no encontrado"}), 404
         mantenimiento.equipo_id = nuevo_equipo.id
-        equipo = nuevo_equipo
+        equipo_anterior, equipo = equipo, nuevo_equipo
 
-    db.session.commit()
-
-    # 🔁 Recalcular lógica general
-    mantenimientos = Mantenimiento.query.filter_by(equipo_id=equipo.id).all()
-    today = datetime.now().date()
-    pasados, futuros = [], []
+    db.session.flush()
 
-    for m in mantenimientos:
-        f = m.fecha if not isinstance(m.fecha, str) else datetime.strptime(m.fecha, "%Y-%m-%d").date()
-        if f <= today:
-            pasados.append(f)
-        else:
-            futuros.append(f)
+    despues = (mantenimiento.fecha, mantenimiento.equipo_id, mantenimiento.tipo)
+    if despues != antes:
+        historial.ajustar([antes], -1)
+        historial.ajustar([despues])
 
-    equipo.ultimo_mantenimiento = max(pasados) if pasados else None
-    equipo.proximo_mantenimiento = min(futuros) if futuros else None
+    # 🔁 Recalcular fechas (también del equipo anterior si se reasignó)
+    recalcular_fechas(equipo)
+    if equipo_anterior is not None:
+        recalcular_fechas(equipo_anterior)
+        marcar_cambio('equipos', 'actualizado', equipo_anterior.id)
 
+    marcar_cambio('mantenimientos', 'actualizado', mantenimiento.id)
+    marcar_cambio('equipos', 'actualizado', equipo.id)
     db.session.commit()
     return jsonify({"mensaje": "✅ Mantenimiento actualizado y sincronizado"}), 200
 
@@ -350,105 +532,186 @@ def editar_mantenimiento(id):
 def eliminar_mantenimiento(id):
     m = Mantenimiento.query.get(id)
     if not m:
+        if archivo.esta_archivado(id):
+            return jsonify({"error": "El mantenimiento está archivado y no se puede eliminar"}), 409
         return jsonify({"error": "Mantenimiento no encontrado"}), 404
 
     equipo = m.equipo
+    historial.ajustar([(m.fecha, m.equipo_id, m.tipo)], -1)
     db.session.delete(m)
-    db.session.commit()
+    db.session.flush()
 
     # 🔁 Recalcular fechas restantes
-    restantes = Mantenimiento.query.filter_by(equipo_id=equipo.id).all()
-    if restantes:
-        today = datetime.now().date()
-        pasados, futuros = [], []
-
-        for r in restantes:
-            f = r.fecha if not isinstance(r.fecha, str) else datetime.strptime(r.fecha, "%Y-%m-%d").date()
-            if f <= today:
-                pasados.append(f)
-            else:
-                futuros.append(f)
-
-        equipo.ultimo_mantenimiento = max(pasados) if pasados else None
-        equipo.proximo_mantenimiento = min(futuros) if futuros else None
-    else:
-        equipo.ultimo_mantenimiento = None
-        equipo.proximo_mantenimiento = None
+    recalcular_fechas(equipo)
 
+    marcar_cambio('mantenimientos', 'eliminado', id)
+    marcar_cambio('equipos', 'actualizado', equipo.id)
     db.session.commit()
     return jsonify({"mensaje": "🗑️ Mantenimiento eliminado y equipo actualizado"}), 200
 
+
+# ============================================================
+# 🗑️ Eliminar varios mantenimientos (por ids o por filtro)
+# ============================================================
+@routes.route('/mantenimientos/eliminar', methods=['POST'])
+def eliminar_mantenimientos():
+    # {"ids": [...]} o filtros {"equipo_id", "tipo", "desde", "hasta"}
+    try:
+        datos = request.get_json() or {}
+        condiciones = borrado.condiciones_mantenimientos(datos)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    eliminados = borrado.eliminar_mantenimientos(condiciones, 'ids' in datos)
+    db.session.commit()
+    return jsonify({"mensaje": "🗑️ Mantenimientos eliminados y equipos actualizados", "eliminados": eliminados}), 200
+
 # ============================
 # 📊 ENDPOINTS PARA DASHBOARD
 # ============================
 
 
 
+# Cada resumen se guarda en caché y se invalida cuando se confirma un
+# cambio en las tablas de las que depende.
+DEPENDENCIAS_DASHBOARD = {
+    'equipos-resumen': {'equipos'},
+    'mantenimientos-resumen': {'mantenimientos'},
+    'equipos-sin-mantenimiento': {'equipos', 'mantenimientos'},
+    'mantenimientos-historial': {'mantenimientos'},
+}
+
+
+@al_confirmar
+def invalidar_dashboard(cambios):
+    tablas = {c.tabla for c in cambios}
+    claves = [k for k, deps in DEPENDENCIAS_DASHBOARD.items() if deps & tablas]
+    if claves:
+        cache_dashboard.invalidar(*claves)
+
+
+def _del_dashboard(clave, calcular):
+    """Valor cacheado de ``clave`` válido para las versiones que leyó @condicional.
+
+    Las escrituras de otros workers no invalidan esta caché, pero sí suben
+    la versión en la base: con la versión en la entrada, el cuerpo siempre
+    corresponde al ETag que se envía. Va también el día (atrasados, este mes).
+
+    Lo leído de la réplica va en entradas aparte que duran como mucho
+    REPLICA_PEGAJOSA_SEGUNDOS y nunca se sirven a quien lee de la primaria
+    (igual que en app/cache_equipos.py).
+    """
+    grupo = clave[0] if isinstance(clave, tuple) else clave
+    versiones = g.get('versiones', {})
+    version = (datetime.now().date(),) + tuple(versiones.get(t) for t in sorted(DEPENDENCIAS_DASHBOARD[grupo]))
+    ttl = None
+    if db.session.info.get('lectura'):
+        clave = (clave if isinstance(clave, tuple) else (clave,)) + ('replica',)
+        ttl = min(cache_dashboard.ttl, current_app.config.get('REPLICA_PEGAJOSA_SEGUNDOS', 5))
+    return cache_dashboard.obtener(clave, calcular, version, ttl)
+
+
 # Total de equipos, activos y en mantenimiento
-@routes.route('/dashboard/equipos-resumen', methods=['GET'])
-def dashboard_equipos_resumen():
-    total = Equipo.query.count()
-    activos = Equipo.query.filter_by(estado="Activo").count()
-    inactivos = Equipo.query.filter_by(estado="Inactivo").count()
-    equipos_en_mantenimiento = Equipo.query.filter(
-        Equipo.estado.ilike("en mantenimiento")
-    ).count()
+def _resumen_equipos():
+    return resumir_estados(db.session.execute(consulta_estados_equipos()))
 
 
+@routes.route('/dashboard/equipos-resumen', methods=['GET'])
+@condicional(*DEPENDENCIAS_DASHBOARD['equipos-resumen'])
+def dashboard_equipos_resumen():
+    return jsonify(_del_dashboard('equipos-resumen', _resumen_equipos)), 200
 
-    return jsonify({
-        "total": total,
-        "activos": activos,
-        "inactivos": inactivos,
-        "equipos_en_mantenimiento": equipos_en_mantenimiento
 
-    }), 200
+def _resumen_mantenimientos():
+    return resumir_mantenimientos(db.session.execute(consulta_resumen_mantenimientos(datetime.now().date())).one())
 
 
 @routes.route('/dashboard/mantenimientos-resumen', methods=['GET'])
+@condicional(*DEPENDENCIAS_DASHBOARD['mantenimientos-resumen'], diario=True)
 def dashboard_mantenimientos_resumen():
-    total = db.session.query(Mantenimiento).count()
+    return jsonify(_del_dashboard('mantenimientos-resumen', _resumen_mantenimientos)), 200
 
-    este_mes = db.session.query(Mantenimiento).filter(
-        db.extract('month', Mantenimiento.fecha) == datetime.now().month,
-        db.extract('year', Mantenimiento.fecha) == datetime.now().year
-    ).count()
 
-    atrasados = db.session.query(Mantenimiento).filter(
-        Mantenimiento.fecha < datetime.now().date()
-    ).count()
+def _equipos_sin_mantenimiento():
+    return listar_equipos_sin_mantenimiento(db.session.execute(consulta_equipos_sin_mantenimiento()))
 
-    return jsonify({
-        "total": total,
-        "este_mes": este_mes,
-        "atrasados": atrasados
-    }), 200
 
 @routes.route('/dashboard/equipos-sin-mantenimiento', methods=['GET'])
+@condicional(*DEPENDENCIAS_DASHBOARD['equipos-sin-mantenimiento'])
 def equipos_sin_mantenimiento():
-    equipos = Equipo.query.outerjoin(Mantenimiento).filter(
-        Mantenimiento.id == None
-    ).all()
+    return jsonify(_del_dashboard('equipos-sin-mantenimiento', _equipos_sin_mantenimiento)), 200
+
 
-    resultado = [
-        {"id": e.id, "nombre": e.nombre, "codigo": e.codigo}
-        for e in equipos
-    ]
+def _historial(filtros):
+    def calcular():
+        return listar_historial(db.session.execute(historial.consulta_historial(*filtros)))
 
-    return jsonify(resultado), 200
+    return _del_dashboard(('mantenimientos-historial',) + filtros, calcular)
 
-from sqlalchemy import func
 
 @routes.route('/dashboard/mantenimientos-historial', methods=['GET'])
+@condicional(*DEPENDENCIAS_DASHBOARD['mantenimientos-historial'])
 def dashboard_mantenimientos_historial():
-    data = db.session.query(
-        func.to_char(Mantenimiento.fecha, 'YYYY-MM').label("mes"),
-        func.count(Mantenimiento.id)
-    ).group_by("mes").order_by("mes").all()
+    # Filtros opcionales: desde/hasta (YYYY-MM), equipo_id, tipo
+    try:
+        filtros = historial.leer_parametros(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(_historial(filtros)), 200
 
-    historial = [
-        {"mes": fila[0], "cantidad": fila[1]}
-        for fila in data
-    ]
 
-    return jsonify(historial), 200
+# Todo el dashboard en una sola petición
+@routes.route('/dashboard', methods=['GET'])
+@condicional('equipos', 'mantenimientos', diario=True)
+def dashboard_completo():
+    return jsonify({
+        "equipos": _del_dashboard('equipos-resumen', _resumen_equipos),
+        "mantenimientos": _del_dashboard('mantenimientos-resumen', _resumen_mantenimientos),
+        "equipos_sin_mantenimiento": _del_dashboard('equipos-sin-mantenimiento', _equipos_sin_mantenimiento),
+        "historial": _historial((None, None, None, None)),
+    }), 200
+
+
+# Equipos que vencen en los próximos N días (incluye los atrasados)
+@routes.route('/dashboard/proximos', methods=['GET'])
+@condicional('equipos', diario=True)
+def dashboard_proximos():
+    try:
+        dias = int(request.args.get('dias', 30))
+    except ValueError:
+        return jsonify({"error": "El parámetro dias debe ser un número entero"}), 400
+
+    hoy = datetime.now().date()
+    return jsonify(listar_proximos(obtener_agenda().hasta(hoy + timedelta(days=dias), g.versiones.get('equipos')), hoy)), 200
+
+
+# ============================================================
+# 📡 Flujo de cambios (Server-Sent Events)
+# ============================================================
+# Reemplaza el sondeo: eventos "equipos" / "mantenimientos" con la acción
+# y los ids, "dashboard" con los contadores nuevos, "cambios" si escribió
+# otro proceso y "reset" si no se puede reanudar desde Last-Event-ID.
+# Cada conexión ocupa un hilo: con muchos clientes conviene servirlo
+# desde asgi.py (uvicorn), donde cada conexión es una corrutina.
+@routes.route('/eventos', methods=['GET'])
+def flujo_eventos():
+    canal = obtener_canal()
+    ultimo = request.headers.get('Last-Event-ID') or request.args.get('ultimo')
+    suscripcion = canal.suscribir(ultimo)
+    respuesta = Response(flujo(suscripcion, current_app.config.get('EVENTOS_HEARTBEAT', 15)),
+                         mimetype='text/event-stream')
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    respuesta.headers['X-Accel-Buffering'] = 'no'  # nginx: no acumular el flujo
+    return respuesta
+
+
+@routes.route('/eventos/estadisticas', methods=['GET'])
+def eventos_estadisticas():
+    return jsonify(obtener_canal().estadisticas()), 200
+
+
+# Aciertos / fallos de la caché del dashboard
+@routes.route('/dashboard/cache', methods=['GET'])
+def dashboard_cache():
+    return jsonify(cache_dashboard.estadisticas()), 200
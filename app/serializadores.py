@@ -0,0 +1,146 @@
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Date, select
+
+from app.models import Equipo, Mantenimiento, MantenimientoArchivado
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+# ============================================================
+# 🧱 Serialización de equipos y mantenimientos
+# ============================================================
+# Un esquema por modelo describe qué campos se exponen y de qué columna
+# salen. Con él se arma el SELECT (solo las columnas pedidas, sin
+# hidratar objetos del ORM) y se convierten las filas (tuplas) a dicts.
+
+
+class Esquema:
+    def __init__(self, modelo, campos, uniones=None):
+        # campos: nombre → columna; uniones: nombre → (tabla, condición del JOIN)
+        self.modelo = modelo
+        self.campos = campos
+        self.uniones = uniones or {}
+        self._fechas = {
+            nombre for nombre, columna in campos.items()
+            if isinstance(columna.type, Date)
+        }
+
+    def validar(self, nombres):
+        desconocidos = [n for n in nombres if n not in self.campos]
+        if desconocidos:
+            raise ValueError(f"Campos desconocidos en fields: {', '.join(desconocidos)}")
+
+    def consulta(self, nombres=None, extra=()):
+        """SELECT de ``nombres`` (+ ``extra``) con los JOIN que hagan falta.
+
+        Las columnas salen en ese orden: primero ``nombres`` y después las
+        de ``extra`` que no estuvieran ya, así ``serializador(nombres)``
+        puede leer cada fila por posición.
+        """
+        nombres = list(nombres or self.campos)
+        todos = nombres + [n for n in extra if n not in nombres]
+        consulta = select(*[self.campos[n].label(n) for n in todos]).select_from(self.modelo)
+        for nombre in todos:
+            if nombre in self.uniones:
+                consulta = consulta.outerjoin(*self.uniones[nombre])
+        return consulta
+
+    def serializador(self, nombres=None):
+        """Devuelve una función fila → dict para las primeras columnas de la fila."""
+        nombres = tuple(nombres or self.campos)
+        fechas = [(i, n) for i, n in enumerate(nombres) if n in self._fechas]
+
+        if not fechas:
+            def convertir(fila):
+                return dict(zip(nombres, fila))
+        else:
+            def convertir(fila):
+                datos = dict(zip(nombres, fila))
+                for _, nombre in fechas:
+                    valor = datos[nombre]
+                    if valor is not None:
+                        datos[nombre] = valor.isoformat()
+                return datos
+        return convertir
+
+
+ESQUEMA_EQUIPO = Esquema(Equipo, {
+    "id": Equipo.id,
+    "codigo": Equipo.codigo,
+    "nombre": Equipo.nombre,
+    "marca": Equipo.marca,
+    "modelo": Equipo.modelo,
+    "fecha_compra": Equipo.fecha_compra,
+    "periodo_mantenimiento": Equipo.periodo_mantenimiento,
+    "estado": Equipo.estado,
+    "imagen_url": Equipo.imagen_url,
+    "imagen_variantes": Equipo.imagen_variantes,
+    "proximo_mantenimiento": Equipo.proximo_mantenimiento,
+    "ultimo_mantenimiento": Equipo.ultimo_mantenimiento,
+})
+
+ESQUEMA_MANTENIMIENTO = Esquema(Mantenimiento, {
+    "id": Mantenimiento.id,
+    "tipo": Mantenimiento.tipo,
+    "fecha": Mantenimiento.fecha,
+    "agente": Mantenimiento.agente,
+    "descripcion": Mantenimiento.descripcion,
+    "equipo_id": Mantenimiento.equipo_id,
+    "equipo_nombre": Equipo.nombre,
+}, uniones={
+    # El nombre del equipo viene en el mismo SELECT (sin N+1)
+    "equipo_nombre": (Equipo, Mantenimiento.equipo_id == Equipo.id),
+})
+
+# Mismos campos para el detalle de un mantenimiento archivado
+ESQUEMA_MANTENIMIENTO_ARCHIVADO = Esquema(MantenimientoArchivado, {
+    "id": MantenimientoArchivado.id,
+    "tipo": MantenimientoArchivado.tipo,
+    "fecha": MantenimientoArchivado.fecha,
+    "agente": MantenimientoArchivado.agente,
+    "descripcion": MantenimientoArchivado.descripcion,
+    "equipo_id": MantenimientoArchivado.equipo_id,
+    "equipo_nombre": Equipo.nombre,
+}, uniones={
+    "equipo_nombre": (Equipo, MantenimientoArchivado.equipo_id == Equipo.id),
+})
+
+
+# ============================================================
+# ⚡ Proveedor JSON rápido (orjson si está instalado)
+# ============================================================
+class ProveedorJSONRapido(DefaultJSONProvider):
+    """Usa orjson para serializar; sin orjson se comporta como el de Flask.
+
+    Las fechas sueltas salen en ISO (YYYY-MM-DD) en ambos casos.
+    """
+
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault('default', self.default)
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        cuerpo = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(cuerpo, mimetype=self.mimetype)
@@ -0,0 +1,224 @@
+from collections import namedtuple
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import Date, case, cast, func, or_, select, update
+
+from app.consultas import consulta_fechas_equipo, subconsulta_ultimo_archivado, subconsultas_fechas
+from app.database import db
+from app.models import Equipo, Mantenimiento, MantenimientoArchivado
+
+# ============================================================
+# 🔁 Fechas de mantenimiento de un equipo
+# ============================================================
+# Regla única para todas las rutas:
+#   - ultimo_mantenimiento  = mantenimiento más reciente con fecha <= hoy
+#     (sin historial: la fecha de compra, como al dar de alta el equipo)
+#   - proximo_mantenimiento = mantenimiento programado más cercano (> hoy);
+#     si no hay ninguno, se estima sumando el periodo al último.
+
+
+def estimar_proximo(ultimo, periodo):
+    if not ultimo or not periodo:
+        return None
+    try:
+        return ultimo + relativedelta(months=int(periodo))
+    except (TypeError, ValueError):
+        return None
+
+
+def fechas_esperadas(ultimo, proximo_programado, fecha_compra, periodo):
+    """(ultimo, proximo) que corresponden según la regla de arriba."""
+    ultimo = ultimo or fecha_compra
+    return ultimo, proximo_programado or estimar_proximo(ultimo, periodo)
+
+
+def _aplicar(equipo, ultimo, proximo_programado):
+    equipo.ultimo_mantenimiento, equipo.proximo_mantenimiento = fechas_esperadas(
+        ultimo, proximo_programado, equipo.fecha_compra, equipo.periodo_mantenimiento
+    )
+
+
+def recalcular_fechas(equipo, hoy=None):
+    """Recalcula las fechas del equipo con una sola consulta MIN/MAX.
+
+    Con el índice (equipo_id, fecha) cada agregado es una búsqueda en el
+    índice, así que el costo no depende del largo del historial. No hace
+    commit: el llamador confirma todo en una única transacción.
+    """
+    hoy = hoy or datetime.now().date()
+    fila = db.session.execute(consulta_fechas_equipo(equipo.id, hoy)).one()
+    _aplicar(equipo, fila.ultimo, fila.proximo)
+
+
+def registrar_mantenimiento(equipo, fecha, hoy=None):
+    """Actualiza las fechas del equipo tras insertar un mantenimiento en ``fecha``.
+
+    Un alta solo puede adelantar el último o acercar el próximo, así que se
+    resuelve en O(1) con los valores guardados. Si el próximo guardado es
+    una estimación por periodo (o las fechas guardadas ya quedaron viejas),
+    no se puede saber si existen otros programados y se recurre al
+    agregado de ``recalcular_fechas``. Lo mismo si el último coincide con la
+    fecha de compra (valor inicial de un equipo sin historial).
+    """
+    hoy = hoy or datetime.now().date()
+    ultimo = equipo.ultimo_mantenimiento
+    proximo = equipo.proximo_mantenimiento
+
+    vigente = (ultimo is None or ultimo <= hoy) and (proximo is None or proximo > hoy)
+    estimado = proximo is not None and proximo == estimar_proximo(ultimo, equipo.periodo_mantenimiento)
+    inicial = ultimo is not None and ultimo == equipo.fecha_compra
+    if not vigente or estimado or inicial:
+        recalcular_fechas(equipo, hoy)
+        return
+
+    if fecha <= hoy:
+        if ultimo is not None and fecha <= ultimo:
+            return
+        # proximo es None o un mantenimiento programado real: no cambia
+        _aplicar(equipo, fecha, proximo)
+    else:
+        _aplicar(equipo, ultimo, min(proximo, fecha) if proximo else fecha)
+
+
+def recalcular_fechas_de(equipo_ids, hoy=None):
+    """Recalcula las fechas de varios equipos con un único agregado agrupado.
+
+    Pensado para cargas masivas: una consulta GROUP BY equipo_id en lugar
+    de una por equipo. No hace commit.
+    """
+    equipo_ids = list(set(equipo_ids))
+    if not equipo_ids:
+        return
+    hoy = hoy or datetime.now().date()
+
+    filas = db.session.execute(
+        select(
+            Mantenimiento.equipo_id,
+            func.max(case((Mantenimiento.fecha <= hoy, Mantenimiento.fecha))).label('ultimo'),
+            func.min(case((Mantenimiento.fecha > hoy, Mantenimiento.fecha))).label('proximo'),
+        )
+        .where(Mantenimiento.equipo_id.in_(equipo_ids))
+        .group_by(Mantenimiento.equipo_id)
+    ).all()
+    fechas = {f.equipo_id: (f.ultimo, f.proximo) for f in filas}
+
+    # Sin mantenimientos pasados recientes, el último puede estar archivado:
+    # viene junto con cada equipo, sin otra ida a la base
+    equipos = db.session.execute(
+        select(Equipo, subconsulta_ultimo_archivado(Equipo.id)).where(Equipo.id.in_(equipo_ids))
+    )
+    for equipo, ultimo_archivado in equipos:
+        ultimo, proximo = fechas.get(equipo.id, (None, None))
+        _aplicar(equipo, ultimo or ultimo_archivado, proximo)
+
+
+# ============================================================
+# 🧹 Recalcular toda la flota (comando "flask recalcular-fechas")
+# ============================================================
+Diferencia = namedtuple('Diferencia', ['id', 'ultimo_antes', 'ultimo', 'proximo_antes', 'proximo'])
+
+TAMANO_LOTE_FECHAS = 5000
+
+
+def recalcular_lote(desde_id, hoy, tamano_lote=TAMANO_LOTE_FECHAS, aplicar=True):
+    """Revisa hasta ``tamano_lote`` equipos con id > ``desde_id``.
+
+    Devuelve (último id revisado, revisados, diferencias); ``None`` como id
+    cuando no quedan equipos. No hace commit.
+
+    En PostgreSQL cada lote es un agregado GROUP BY equipo_id unido a un
+    UPDATE ... FROM que corrige solo las filas que cambian (RETURNING trae
+    las diferencias): dos sentencias por lote, cambien cuantas cambien. En
+    los demás motores un SELECT trae las fechas guardadas con los agregados
+    (subconsultas correlacionadas sobre el índice equipo_id, fecha), la
+    regla se aplica en Python y un UPDATE por lotes (executemany por clave
+    primaria) corrige lo que cambia.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return _recalcular_lote_agrupado(desde_id, hoy, tamano_lote, aplicar)
+
+    filas = db.session.execute(
+        select(
+            Equipo.id, Equipo.fecha_compra, Equipo.periodo_mantenimiento,
+            Equipo.ultimo_mantenimiento, Equipo.proximo_mantenimiento,
+            *subconsultas_fechas(Equipo.id, hoy)
+        )
+        .where(Equipo.id > desde_id)
+        .order_by(Equipo.id)
+        .limit(tamano_lote)
+    ).all()
+    if not filas:
+        return None, 0, []
+
+    diferencias = []
+    for f in filas:
+        ultimo, proximo = fechas_esperadas(f.ultimo, f.proximo, f.fecha_compra, f.periodo_mantenimiento)
+        if (ultimo, proximo) != (f.ultimo_mantenimiento, f.proximo_mantenimiento):
+            diferencias.append(Diferencia(f.id, f.ultimo_mantenimiento, ultimo, f.proximo_mantenimiento, proximo))
+
+    if aplicar and diferencias:
+        db.session.execute(update(Equipo), [
+            {"id": d.id, "ultimo_mantenimiento": d.ultimo, "proximo_mantenimiento": d.proximo}
+            for d in diferencias
+        ])
+    return filas[-1].id, len(filas), diferencias
+
+
+def _recalcular_lote_agrupado(desde_id, hoy, tamano_lote, aplicar):
+    ids = select(Equipo.id).where(Equipo.id > desde_id).order_by(Equipo.id).limit(tamano_lote).subquery()
+    hasta_id, revisados = db.session.execute(select(func.max(ids.c.id), func.count())).one()
+    if not revisados:
+        return None, 0, []
+
+    def en_lote(columna):
+        return columna.between(desde_id + 1, hasta_id)
+
+    agregado = (
+        select(
+            Mantenimiento.equipo_id,
+            func.max(case((Mantenimiento.fecha <= hoy, Mantenimiento.fecha))).label('ultimo'),
+            func.min(case((Mantenimiento.fecha > hoy, Mantenimiento.fecha))).label('proximo'),
+        )
+        .where(en_lote(Mantenimiento.equipo_id))
+        .group_by(Mantenimiento.equipo_id)
+        .subquery()
+    )
+    archivado = (
+        select(MantenimientoArchivado.equipo_id, func.max(MantenimientoArchivado.fecha).label('ultimo'))
+        .where(en_lote(MantenimientoArchivado.equipo_id))
+        .group_by(MantenimientoArchivado.equipo_id)
+        .subquery()
+    )
+    # La misma regla que fechas_esperadas; date + interval recorta a fin de
+    # mes igual que relativedelta (31/01 + 1 mes = 28/02)
+    ultimo = func.coalesce(agregado.c.ultimo, archivado.c.ultimo, Equipo.fecha_compra)
+    estimado = cast(ultimo + func.make_interval(0, Equipo.periodo_mantenimiento), Date)
+    proximo = func.coalesce(agregado.c.proximo, case((Equipo.periodo_mantenimiento != 0, estimado)))
+    esperado = (
+        select(
+            Equipo.id,
+            Equipo.ultimo_mantenimiento.label('ultimo_antes'), ultimo.label('ultimo'),
+            Equipo.proximo_mantenimiento.label('proximo_antes'), proximo.label('proximo'),
+        )
+        .outerjoin(agregado, agregado.c.equipo_id == Equipo.id)
+        .outerjoin(archivado, archivado.c.equipo_id == Equipo.id)
+        .where(en_lote(Equipo.id))
+        .subquery()
+    )
+    cambia = or_(esperado.c.ultimo.is_distinct_from(esperado.c.ultimo_antes),
+                 esperado.c.proximo.is_distinct_from(esperado.c.proximo_antes))
+    columnas = (esperado.c.ultimo_antes, esperado.c.ultimo, esperado.c.proximo_antes, esperado.c.proximo)
+
+    if aplicar:
+        sentencia = (
+            update(Equipo)
+            .where(Equipo.id == esperado.c.id, cambia)
+            .values(ultimo_mantenimiento=esperado.c.ultimo, proximo_mantenimiento=esperado.c.proximo)
+            .returning(Equipo.id, *columnas)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        sentencia = select(esperado.c.id, *columnas).where(cambia).order_by(esperado.c.id)
+    diferencias = [Diferencia(*fila) for fila in db.session.execute(sentencia)]
+    return hasta_id, revisados, sorted(diferencias)
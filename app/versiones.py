@@ -0,0 +1,142 @@
+import hashlib
+import random
+from collections import Counter
+from datetime import datetime
+from functools import wraps
+
+from flask import current_app, g, has_app_context, make_response, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import db
+from app.models import Contador
+
+# ============================================================
+# 🏷️ Versiones por tabla y peticiones condicionales (ETag)
+# ============================================================
+# Cada tabla tiene un contador "version:<tabla>" en la tabla contadores.
+# Al confirmar una transacción con cambios marcados (ver app/cambios.py)
+# se incrementa el contador de cada tabla tocada, dentro de la misma
+# transacción. Las rutas de lectura arman su ETag con esas versiones:
+# si el cliente ya tiene la representación vigente se responde 304 sin
+# consultar las filas.
+#
+# Una sola fila por tabla serializaría a todos los que escriben en ella
+# (el UPDATE la bloquea hasta el commit). El contador está repartido en
+# VERSIONES_FRAGMENTOS filas ("version:<tabla>", "version:<tabla>:1"...):
+# cada commit incrementa una al azar y la versión es la suma. Sigue
+# subiendo exactamente 1 por commit y, al ser parte de la transacción,
+# nunca se ve antes que los datos (una secuencia sí se vería).
+
+FRAGMENTOS = 16
+
+
+def nombre_version(tabla, fragmento=0):
+    return f'version:{tabla}:{fragmento}' if fragmento else f'version:{tabla}'
+
+
+def _fragmentos():
+    if has_app_context():
+        return max(current_app.config.get('VERSIONES_FRAGMENTOS', FRAGMENTOS), 1)
+    return FRAGMENTOS
+
+
+@event.listens_for(Session, 'before_commit')
+def _incrementar_versiones(session):
+    tablas = {c.tabla for c in session.info.get('cambios', ())}
+    fragmentos = _fragmentos()
+    # Orden fijo para que dos transacciones no se bloqueen en cruz
+    for tabla in sorted(tablas):
+        _incrementar(session, nombre_version(tabla, random.randrange(fragmentos)))
+
+
+def _incrementar(session, nombre):
+    # Upsert en una sola sentencia: la migración crea las filas, pero las
+    # bases creadas con create_all (benchmarks) arrancan sin ellas
+    dialecto = session.get_bind().dialect.name
+    if dialecto in ('postgresql', 'sqlite'):
+        insertar = (postgresql if dialecto == 'postgresql' else sqlite).insert(Contador)
+        session.execute(insertar.values(nombre=nombre, valor=1).on_conflict_do_update(
+            index_elements=['nombre'], set_={"valor": Contador.valor + 1}
+        ))
+        return
+
+    resultado = session.execute(
+        update(Contador).where(Contador.nombre == nombre).values(valor=Contador.valor + 1)
+    )
+    if not resultado.rowcount:
+        session.execute(insert(Contador).values(nombre=nombre, valor=1))
+
+
+def consulta_versiones(tablas):
+    # Todos los fragmentos de cada tabla, cualquiera sea VERSIONES_FRAGMENTOS:
+    # "version:<tabla>" y el rango "version:<tabla>:..." (';' sigue a ':')
+    return select(Contador.nombre, Contador.valor).where(or_(*(
+        or_(Contador.nombre == nombre_version(t),
+            Contador.nombre.between(f'{nombre_version(t)}:', f'{nombre_version(t)};'))
+        for t in tablas
+    )))
+
+
+def ordenar_versiones(tablas, filas):
+    valores = Counter()
+    for nombre, valor in filas:
+        valores[nombre.split(':')[1]] += valor
+    return [valores[t] for t in tablas]
+
+
+def leer_versiones(tablas):
+    return ordenar_versiones(tablas, db.session.execute(consulta_versiones(tablas)).all())
+
+
+def etag_de(partes):
+    return hashlib.blake2b('|'.join(str(p) for p in partes).encode(), digest_size=12).hexdigest()
+
+
+def calcular_etag(tablas, diario=False):
+    partes = [request.full_path, request.accept_mimetypes.best or '']
+    versiones = leer_versiones(tablas)
+    # La vista puede reutilizarlas (p. ej. app/cache_equipos.py) sin otra consulta
+    g.versiones = dict(zip(tablas, versiones))
+    partes += versiones
+    if diario:
+        # Resúmenes que dependen de "hoy" (atrasados, este mes...)
+        partes.append(datetime.now().date().isoformat())
+    return etag_de(partes)
+
+
+def cache_control(max_age=None):
+    if max_age is None:
+        max_age = current_app.config.get('HTTP_MAX_AGE', 0)
+    if max_age > 0:
+        return f'private, max-age={max_age}'
+    # El navegador guarda la respuesta pero revalida siempre con If-None-Match
+    return 'private, no-cache'
+
+
+def condicional(*tablas, diario=False):
+    """Decorador para rutas GET que dependen de ``tablas``.
+
+    Las versiones se leen antes que los datos: si una escritura se
+    confirma en medio, el ETag queda viejo (el cliente volverá a pedir) y
+    nunca al revés.
+    """
+    tablas = sorted(tablas)
+
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            etag = calcular_etag(tablas, diario)
+            if request.if_none_match.contains_weak(etag):
+                respuesta = current_app.response_class(status=304)
+            else:
+                respuesta = make_response(vista(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+            respuesta.set_etag(etag, weak=True)
+            respuesta.headers['Cache-Control'] = cache_control()
+            respuesta.vary.add('Accept')
+            return respuesta
+        return envoltura
+    return decorador
@@ -0,0 +1,17 @@
+from app import create_app
+from app.dashboard_asincrono import DashboardAsincrono
+
+# Punto de entrada ASGI para el dashboard asíncrono:
+#   uvicorn asgi:app --workers 2
+# Sirve /dashboard y /dashboard/*. El resto de las rutas se pasan a la app
+# Flask si asgiref está instalado; si no, conviene enrutar en el proxy
+# (/dashboard → uvicorn, lo demás → gunicorn wsgi:app).
+flask_app = create_app()
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+    resto = WsgiToAsgi(flask_app)
+except ImportError:  # dependencia opcional
+    resto = None
+
+app = DashboardAsincrono(flask_app, resto)
@@ -0,0 +1,83 @@
+"""Agenda de próximos mantenimientos: tiempos del heap contra un cálculo en SQL.
+
+Que ambos den lo mismo se comprueba con pytest en tests/test_agenda.py.
+
+Uso:  python -m benchmarks.agenda
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select, update
+
+from app.agenda import obtener_agenda
+from app.cambios import marcar_cambio
+from app.database import db
+from app.models import Equipo
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+EQUIPOS = 20000
+HOY = date(2024, 6, 15)
+
+
+def fuerza_bruta(limite):
+    return [
+        (f.proximo_mantenimiento, f.id)
+        for f in db.session.execute(
+            select(Equipo.id, Equipo.proximo_mantenimiento)
+            .where(Equipo.proximo_mantenimiento <= limite)
+            .order_by(Equipo.proximo_mantenimiento, Equipo.id)
+        )
+    ]
+
+
+def flota_con_fechas(azar, equipos):
+    """Equipos sin historial, con próximo mantenimiento al azar (requiere app context)."""
+    sembrar(equipos, 0)
+    db.session.execute(update(Equipo), [
+        {"id": i, "proximo_mantenimiento": HOY + timedelta(days=azar.randint(-60, 720))}
+        for i in range(1, equipos + 1)
+    ])
+    db.session.commit()
+
+
+def escrituras(azar, equipos, cantidad=20):
+    """Escrituras sueltas, como las harían las rutas, y un límite de consulta al azar."""
+    for equipo_id in azar.sample(range(1, equipos + 1), cantidad):
+        db.session.execute(update(Equipo).where(Equipo.id == equipo_id).values(
+            proximo_mantenimiento=HOY + timedelta(days=azar.randint(-60, 720))
+        ))
+        marcar_cambio('equipos', 'actualizado', equipo_id)
+    db.session.commit()
+    return HOY + timedelta(days=azar.choice([0, 7, 30, 90]))
+
+
+def main():
+    azar = random.Random(42)
+    app = crear_app_benchmark()
+    diferencias = 0
+    with app.app_context(), app.test_request_context():
+        flota_con_fechas(azar, EQUIPOS)
+        agenda = obtener_agenda()
+        agenda.cargar()
+
+        for ronda in range(50):
+            limite = escrituras(azar, EQUIPOS)
+            inicio = time.perf_counter()
+            heap = [(fecha, equipo_id) for fecha, equipo_id, _, _ in agenda.hasta(limite)]
+            t_heap = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            esperado = fuerza_bruta(limite)
+            t_sql = time.perf_counter() - inicio
+            diferencias += heap != esperado
+            if ronda % 10 == 0:
+                print(f"límite {limite}: {len(heap):5} equipos  heap {t_heap * 1000:7.2f} ms  "
+                      f"SQL {t_sql * 1000:7.2f} ms")
+
+    print("sin diferencias" if not diferencias else f"{diferencias} rondas con diferencias")
+    return 1 if diferencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Consultas frecuentes antes y después de archivar los años viejos.
+
+Flota con ~8 años de historial; se mide el dashboard (sin su caché), el
+listado de mantenimientos y el alta de un mantenimiento (recalcula las
+fechas del equipo), luego se corre "flask archivar-mantenimientos" y se
+vuelve a medir. El dashboard debe responder lo mismo antes y después de
+archivar.
+
+Uso:  python -m benchmarks.archivo [equipos] [mantenimientos_por_equipo]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+from app.cache import cache_dashboard
+from app.database import db
+from app.diagnostico import contar_consultas
+from app.models import Mantenimiento, MantenimientoArchivado
+from benchmarks.datos import crear_app_benchmark, generar_flota
+
+RUTAS = [
+    '/dashboard/mantenimientos-resumen',
+    '/dashboard/equipos-sin-mantenimiento',
+    '/dashboard/mantenimientos-historial',
+    '/mantenimientos?limit=50',
+]
+REPETICIONES = 20
+
+
+def medir(cliente, equipos):
+    resultados = {}
+    for ruta in RUTAS:
+        inicio = time.perf_counter()
+        with contar_consultas(db.engine) as contador:
+            for _ in range(REPETICIONES):
+                cache_dashboard.invalidar()
+                respuesta = cliente.get(ruta)
+                assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+        resultados[ruta] = ((time.perf_counter() - inicio) / REPETICIONES * 1000, contador.total / REPETICIONES)
+
+    inicio = time.perf_counter()
+    for i in range(REPETICIONES):
+        respuesta = cliente.post('/mantenimientos', json={
+            "equipo_id": 1 + i * equipos // REPETICIONES, "tipo": "Preventivo", "fecha": date.today().isoformat()
+        })
+        assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+    resultados['POST /mantenimientos'] = ((time.perf_counter() - inicio) / REPETICIONES * 1000, None)
+    return resultados
+
+
+def dashboard(cliente):
+    cache_dashboard.invalidar()
+    return {ruta: cliente.get(ruta).get_json() for ruta in RUTAS[:3]}
+
+
+def main(equipos=5000, mantenimientos_por_equipo=16):
+    descriptor, ruta = tempfile.mkstemp(suffix='.db')
+    os.close(descriptor)
+    try:
+        app = crear_app_benchmark(f"sqlite:///{ruta}")
+        cliente = app.test_client()
+        with app.app_context():
+            generar_flota(equipos, mantenimientos_por_equipo)
+            antes = medir(cliente, equipos)
+
+            previo = dashboard(cliente)
+            inicio = time.perf_counter()
+            salida = app.test_cli_runner().invoke(args=['archivar-mantenimientos'])
+            assert salida.exit_code == 0, salida.output
+            duracion = time.perf_counter() - inicio
+            activos = db.session.query(Mantenimiento).count()
+            archivados = db.session.query(MantenimientoArchivado).count()
+            assert dashboard(cliente) == previo, "el dashboard cambió al archivar"
+            print(f"archivados {archivados} mantenimientos en {duracion:.2f} s; quedan {activos} en la tabla de trabajo\n")
+
+            despues = medir(cliente, equipos)
+            db.engine.dispose()
+    finally:
+        os.unlink(ruta)
+
+    print(f"{'consulta':40} {'antes ms':>9} {'después ms':>11} {'consultas':>10}")
+    for nombre in antes:
+        (ms_antes, consultas), (ms_despues, _) = antes[nombre], despues[nombre]
+        print(f"{nombre:40} {ms_antes:>9.2f} {ms_despues:>11.2f} {'' if consultas is None else f'{consultas:.1f}':>10}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,43 @@
+"""Borrar un equipo con historial largo: uno por uno (antes) vs. ON DELETE CASCADE.
+
+Uso:  python -m benchmarks.borrado [mantenimientos]
+"""
+import sys
+import time
+
+from app.database import db
+from app.diagnostico import contar_consultas
+from app.models import Equipo, Mantenimiento
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def antes(equipo_id):
+    # Como lo hacía eliminar_equipo: cargar la colección y un DELETE por fila
+    equipo = db.session.get(Equipo, equipo_id)
+    for m in db.session.execute(db.select(Mantenimiento).filter_by(equipo_id=equipo_id)).scalars():
+        db.session.delete(m)
+    db.session.flush()
+    db.session.delete(equipo)
+    db.session.commit()
+
+
+def despues(equipo_id, cliente):
+    assert cliente.delete(f'/equipos/{equipo_id}').status_code == 200
+
+
+def main(mantenimientos=20000):
+    app = crear_app_benchmark()
+    cliente = app.test_client()
+    with app.app_context():
+        sembrar(2, mantenimientos)
+        for nombre, funcion in (("antes", lambda: antes(1)), ("después", lambda: despues(2, cliente))):
+            with contar_consultas(db.engine) as contador:
+                inicio = time.perf_counter()
+                funcion()
+                duracion = time.perf_counter() - inicio
+            print(f"{nombre:8} {duracion * 1000:9.1f} ms  {contador.total:6} sentencias")
+        assert db.session.scalar(db.select(db.func.count()).select_from(Mantenimiento)) == 0
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,78 @@
+"""Latencia del listado de equipos con filtros, orden y búsqueda de texto.
+
+Uso:  python -m benchmarks.busqueda [equipos]     (por defecto 1.000.000)
+"""
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from app.database import db
+from app.models import Equipo
+from benchmarks.datos import ESTADOS, crear_app_benchmark
+
+MARCAS = ["Apeks", "Scubapro", "Mares", "Aqualung", "Cressi", "Suunto", "Shearwater", "Oceanic"]
+TIPOS = ["Regulador", "Chaleco", "Tanque", "Ordenador", "Traje", "Aleta", "Máscara", "Linterna"]
+LOTE = 20000
+
+URLS = [
+    '/equipos?limit=50',
+    '/equipos?limit=50&orden=nombre',
+    '/equipos?limit=50&orden=-fecha_compra',
+    '/equipos?limit=50&estado=Inactivo',
+    '/equipos?limit=50&marca=Shearwater&orden=nombre',
+    '/equipos?limit=50&fecha_compra_desde=2023-01-01&fecha_compra_hasta=2023-01-31',
+    '/equipos?limit=50&q=shearw',
+    '/equipos?limit=50&q=regulador 12345',
+    '/equipos?limit=50&q=zz-no-existe',
+]
+
+
+def sembrar_variado(cantidad):
+    rnd = random.Random(7)
+    for inicio in range(1, cantidad + 1, LOTE):
+        db.session.execute(Equipo.__table__.insert(), [
+            {
+                "id": i,
+                "codigo": str(i),
+                "nombre": f"{rnd.choice(TIPOS)} {i}",
+                "marca": rnd.choice(MARCAS),
+                "modelo": f"M{rnd.randint(1, 500)}",
+                "fecha_compra": date(2018, 1, 1) + timedelta(days=rnd.randint(0, 2500)),
+                "periodo_mantenimiento": 6,
+                "estado": ESTADOS[i % len(ESTADOS)],
+            }
+            for i in range(inicio, min(inicio + LOTE, cantidad + 1))
+        ])
+    db.session.commit()
+
+
+def main(equipos=1_000_000):
+    app = crear_app_benchmark()
+    cliente = app.test_client()
+    with app.app_context():
+        inicio = time.perf_counter()
+        sembrar_variado(equipos)
+        db.session.execute(db.text("ANALYZE"))
+        print(f"{equipos} equipos sembrados en {time.perf_counter() - inicio:.1f} s")
+
+        for url in URLS:
+            tiempos = []
+            for _ in range(5):
+                inicio = time.perf_counter()
+                respuesta = cliente.get(url)
+                tiempos.append(time.perf_counter() - inicio)
+            assert respuesta.status_code == 200, (url, respuesta.get_json())
+            # Segunda página: el cursor no debe costar más que la primera
+            cursor = respuesta.headers.get('X-Siguiente-Cursor')
+            segunda = ''
+            if cursor:
+                inicio = time.perf_counter()
+                assert cliente.get(f"{url}&cursor={cursor}").status_code == 200
+                segunda = f"  2ª página {(time.perf_counter() - inicio) * 1000:7.1f} ms"
+            print(f"{url:75} {statistics.median(tiempos) * 1000:7.1f} ms  ({len(respuesta.get_json())} filas){segunda}")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,138 @@
+"""Detalle de equipos con y sin la caché LRU (app/cache_equipos.py).
+
+Tráfico con equipos "calientes": el 80 % de las lecturas va al 5 % de la
+flota y un 5 % de las peticiones son ediciones (invalidan su entrada).
+
+Un acierto ahorra una consulta por clave primaria. Con SQLite en el mismo
+proceso esa consulta cuesta poco y la diferencia es chica (y ruidosa en
+una sola corrida); con la base en otro equipo cada consulta suma una ida
+y vuelta por la red. Por eso se mide también con una latencia simulada
+por sentencia, y cada configuración se corre RONDAS veces, alternadas,
+sobre la misma flota (se informa la mediana).
+
+Una caché más chica que el conjunto caliente (aquí ~1.000 equipos) casi
+no acierta: el tamaño por defecto (EQUIPOS_CACHE_TAMANO = 10.000) debe
+cubrirlo.
+
+Uso:  python -m benchmarks.cache_equipos [equipos] [peticiones]
+"""
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import create_app
+from app.cache import cache_dashboard
+from app.database import db
+from app.diagnostico import contar_consultas
+from benchmarks.datos import ConfigBenchmark, crear_app_benchmark, generar_flota
+
+CONFIGURACIONES = [
+    ("sin caché", 0),
+    ("LRU 500 entradas", 500),
+    ("LRU 10.000 entradas", 10000),
+]
+# Milisegundos agregados a cada sentencia: base local / base en la red
+LATENCIAS_MS = (0, 0.5)
+RONDAS = 3
+
+
+def trafico(equipos, peticiones, semilla=5):
+    azar = random.Random(semilla)
+    calientes = max(1, equipos // 20)
+    for _ in range(peticiones):
+        equipo_id = azar.randint(1, calientes) if azar.random() < 0.8 else azar.randint(1, equipos)
+        yield ('PUT' if azar.random() < 0.05 else 'GET'), equipo_id
+
+
+@contextmanager
+def latencia_simulada(engine, milisegundos):
+    if not milisegundos:
+        yield
+        return
+
+    def esperar(*_):
+        time.sleep(milisegundos / 1000)
+
+    event.listen(engine, 'before_cursor_execute', esperar)
+    try:
+        yield
+    finally:
+        event.remove(engine, 'before_cursor_execute', esperar)
+
+
+def crear_flota(ruta, equipos):
+    app = crear_app_benchmark(f"sqlite:///{ruta}")
+    with app.app_context():
+        generar_flota(equipos, 4)
+        db.engine.dispose()
+
+
+def correr(plantilla, tamano, equipos, peticiones, latencia):
+    descriptor, ruta = tempfile.mkstemp(suffix='.db')
+    os.close(descriptor)
+    try:
+        shutil.copyfile(plantilla, ruta)
+        # Sin crear_app_benchmark: no debe borrar la flota copiada
+        config = type("ConfigCache", (ConfigBenchmark,), {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{ruta}", "EQUIPOS_CACHE_TAMANO": tamano,
+        })
+        app = create_app(config)
+        cache_dashboard.invalidar()
+        cliente = app.test_client()
+        with app.app_context():
+            lecturas, tiempo_lecturas = 0, 0.0
+            with contar_consultas(db.engine) as contador, latencia_simulada(db.engine, latencia):
+                for metodo, equipo_id in trafico(equipos, peticiones):
+                    if metodo == 'PUT':
+                        cliente.put(f'/equipos/{equipo_id}', json={"estado": "Activo"})
+                        continue
+                    inicio = time.perf_counter()
+                    respuesta = cliente.get(f'/equipos/{equipo_id}')
+                    tiempo_lecturas += time.perf_counter() - inicio
+                    assert respuesta.status_code == 200
+                    lecturas += 1
+            estadisticas = cliente.get('/equipos/cache').get_json()
+            db.engine.dispose()
+        return tiempo_lecturas / lecturas * 1000, contador.total / peticiones, estadisticas
+    finally:
+        os.unlink(ruta)
+
+
+def main(equipos=20000, peticiones=10000):
+    descriptor, plantilla = tempfile.mkstemp(suffix='.db')
+    os.close(descriptor)
+    try:
+        crear_flota(plantilla, equipos)
+        for latencia in LATENCIAS_MS:
+            print(f"latencia simulada {latencia} ms por sentencia")
+            tiempos = {nombre: [] for nombre, _ in CONFIGURACIONES}
+            resultados = {}
+            for _ in range(RONDAS):
+                for nombre, tamano in CONFIGURACIONES:
+                    ms, consultas, estadisticas = correr(plantilla, tamano, equipos, peticiones, latencia)
+                    tiempos[nombre].append(ms)
+                    resultados[nombre] = (consultas, estadisticas)
+
+            base = statistics.median(tiempos[CONFIGURACIONES[0][0]])
+            for nombre, _ in CONFIGURACIONES:
+                ms = statistics.median(tiempos[nombre])
+                consultas, estadisticas = resultados[nombre]
+                detalle = ""
+                if estadisticas.get("backend"):
+                    detalle = (f" | aciertos {estadisticas['tasa_aciertos']:.1%}, "
+                               f"desalojos {estadisticas['desalojos']}, entradas {estadisticas['entradas']}")
+                print(f"  {nombre:22} GET {ms:6.3f} ms ({ms / base - 1:+6.1%})  "
+                      f"{consultas:5.2f} consultas/petición{detalle}")
+    finally:
+        os.unlink(plantilla)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
@@ -0,0 +1,148 @@
+"""Prueba de carga: rendimiento y latencias p50/p99 por configuración del pool.
+
+Levanta la app en un servidor WSGI con hilos dentro del proceso, la
+siembra con datos sintéticos y la ataca con varios clientes concurrentes
+usando una mezcla de lecturas y escrituras de las rutas existentes.
+
+Uso:
+    python -m benchmarks.carga --uri postgresql+psycopg2://... \\
+        --pools 5:5,10:10,20:0 --clientes 32 --duracion 15
+
+Sin --uri se usa un SQLite temporal en archivo.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from werkzeug.serving import make_server
+
+from app.database import db
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+# (peso, nombre, método, ruta) — {e} se reemplaza por un id de equipo al azar
+MEZCLA = [
+    (20, 'listar equipos', 'GET', '/equipos?limit=50'),
+    (15, 'detalle equipo', 'GET', '/equipos/{e}'),
+    (15, 'listar mantenimientos', 'GET', '/mantenimientos?limit=50'),
+    (10, 'mantenimientos de un equipo', 'GET', '/mantenimientos?equipo_id={e}'),
+    (8, 'dashboard equipos', 'GET', '/dashboard/equipos-resumen'),
+    (8, 'dashboard mantenimientos', 'GET', '/dashboard/mantenimientos-resumen'),
+    (4, 'dashboard historial', 'GET', '/dashboard/mantenimientos-historial'),
+    (4, 'dashboard próximos', 'GET', '/dashboard/proximos?dias=30'),
+    (10, 'registrar mantenimiento', 'POST', '/mantenimientos'),
+    (6, 'editar equipo', 'PUT', '/equipos/{e}'),
+]
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+
+def cuerpo(metodo, azar, equipo_id):
+    if metodo == 'POST':
+        return {"equipo_id": equipo_id, "tipo": "Preventivo",
+                "fecha": f"2024-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}"}
+    if metodo == 'PUT':
+        return {"estado": azar.choice(["Activo", "Inactivo", "En mantenimiento"])}
+    return None
+
+
+def atacar(puerto, equipos, clientes, duracion, semilla=0):
+    latencias = defaultdict(list)
+    errores = defaultdict(int)
+    fin = time.perf_counter() + duracion
+    pesos = [m[0] for m in MEZCLA]
+
+    def cliente(n):
+        azar = random.Random(semilla * 1000 + n)
+        conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+        propias = defaultdict(list)
+        while time.perf_counter() < fin:
+            _, nombre, metodo, ruta = azar.choices(MEZCLA, weights=pesos)[0]
+            equipo_id = azar.randint(1, equipos)
+            datos = cuerpo(metodo, azar, equipo_id)
+            inicio = time.perf_counter()
+            try:
+                conexion.request(metodo, ruta.format(e=equipo_id),
+                                 body=json.dumps(datos) if datos else None,
+                                 headers={"Content-Type": "application/json"})
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                if respuesta.status >= 400:
+                    errores[nombre] += 1
+            except (OSError, http.client.HTTPException):
+                errores[nombre] += 1
+                conexion.close()
+                conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=30)
+                continue
+            propias[nombre].append(time.perf_counter() - inicio)
+        conexion.close()
+        for nombre, valores in propias.items():
+            latencias[nombre].extend(valores)
+
+    hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(clientes)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return latencias, errores
+
+
+def medir(uri, pool_size, max_overflow, args):
+    opciones = {"pool_size": pool_size, "max_overflow": max_overflow,
+                "pool_timeout": 30, "pool_pre_ping": True, "pool_recycle": 1800}
+    app = crear_app_benchmark(uri, SQLALCHEMY_ENGINE_OPTIONS=opciones)
+    with app.app_context():
+        sembrar(args.equipos, args.mantenimientos)
+
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    try:
+        latencias, errores = atacar(servidor.server_port, args.equipos, args.clientes, args.duracion)
+    finally:
+        servidor.shutdown()
+        with app.app_context():
+            db.engine.dispose()
+
+    todas = [v for valores in latencias.values() for v in valores]
+    print(f"\npool_size={pool_size} max_overflow={max_overflow}: "
+          f"{len(todas) / args.duracion:.1f} req/s, "
+          f"p50 {percentil(todas, 50) * 1000:.1f} ms, p99 {percentil(todas, 99) * 1000:.1f} ms, "
+          f"{sum(errores.values())} errores")
+    for nombre in sorted(latencias):
+        valores = latencias[nombre]
+        print(f"    {nombre:30} {len(valores):6} req  p50 {percentil(valores, 50) * 1000:7.1f} ms  "
+              f"p99 {percentil(valores, 99) * 1000:7.1f} ms  errores {errores.get(nombre, 0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uri', default=os.environ.get('BENCH_DATABASE_URL'))
+    parser.add_argument('--pools', default='2:0,5:5,10:10', help='pool_size:max_overflow separados por coma')
+    parser.add_argument('--clientes', type=int, default=16)
+    parser.add_argument('--duracion', type=float, default=10)
+    parser.add_argument('--equipos', type=int, default=500)
+    parser.add_argument('--mantenimientos', type=int, default=10, help='por equipo')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        uri = args.uri or f"sqlite:///{os.path.join(carpeta, 'carga.db')}"
+        for pool in args.pools.split(','):
+            pool_size, max_overflow = (int(x) for x in pool.split(':'))
+            medir(uri, pool_size, max_overflow, args)
+
+
+if __name__ == '__main__':
+    main()
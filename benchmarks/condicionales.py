@@ -0,0 +1,40 @@
+"""Costo de un sondeo con y sin If-None-Match (200 completo vs. 304).
+
+Uso:  python -m benchmarks.condicionales [equipos]
+"""
+import sys
+import time
+
+from app.database import db
+from app.diagnostico import contar_consultas
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+URLS = ['/equipos', '/mantenimientos', '/dashboard/equipos-sin-mantenimiento']
+REPETICIONES = 20
+
+
+def medir(cliente, url, cabeceras):
+    with contar_consultas(db.engine) as contador:
+        inicio = time.perf_counter()
+        for _ in range(REPETICIONES):
+            respuesta = cliente.get(url, headers=cabeceras)
+        duracion = (time.perf_counter() - inicio) / REPETICIONES
+    return respuesta, duracion, contador.total // REPETICIONES
+
+
+def main(equipos=5000):
+    app = crear_app_benchmark(DASHBOARD_CACHE_TTL=0)
+    cliente = app.test_client()
+    with app.app_context():
+        sembrar(equipos, 5)
+        for url in URLS:
+            completa, t_completa, q_completa = medir(cliente, url, {})
+            etag = completa.headers['ETag']
+            condicional, t_cond, q_cond = medir(cliente, url, {'If-None-Match': etag})
+            assert condicional.status_code == 304, (url, condicional.status_code)
+            print(f"{url:40} 200: {t_completa * 1000:8.2f} ms {q_completa} consultas {len(completa.data):>9} B"
+                  f" | 304: {t_cond * 1000:6.2f} ms {q_cond} consultas")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
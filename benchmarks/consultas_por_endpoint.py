@@ -0,0 +1,56 @@
+"""Consultas SQL por endpoint con dos tamaños de base: no deben crecer.
+
+La misma comprobación corre con pytest en tests/test_consultas_por_endpoint.py.
+
+Uso:  python -m benchmarks.consultas_por_endpoint
+"""
+import sys
+
+from app.database import db
+from app.diagnostico import contar_consultas
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+ENDPOINTS = [
+    '/equipos',
+    '/equipos?limit=50',
+    '/equipos/1',
+    '/mantenimientos',
+    '/mantenimientos?limit=50',
+    '/mantenimientos?equipo_id=1',
+    '/mantenimientos/1',
+    '/dashboard/equipos-resumen',
+    '/dashboard/mantenimientos-resumen',
+    '/dashboard/equipos-sin-mantenimiento',
+    '/dashboard/mantenimientos-historial',
+]
+
+TAMANOS = [(10, 2), (200, 10)]
+
+
+def contar(tamano):
+    app = crear_app_benchmark()
+    cliente = app.test_client()
+    conteos = {}
+    with app.app_context():
+        sembrar(*tamano)
+        for url in ENDPOINTS:
+            with contar_consultas(db.engine) as contador:
+                respuesta = cliente.get(url)
+            assert respuesta.status_code == 200, (url, respuesta.status_code)
+            conteos[url] = contador.total
+    return conteos
+
+
+def main():
+    resultados = [contar(tamano) for tamano in TAMANOS]
+    fallos = 0
+    for url in ENDPOINTS:
+        conteos = [r[url] for r in resultados]
+        estado = "OK" if len(set(conteos)) == 1 else "CRECE"
+        fallos += estado != "OK"
+        print(f"{estado:6} {url:45} {conteos}")
+    return 1 if fallos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
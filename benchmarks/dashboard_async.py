@@ -0,0 +1,173 @@
+"""Dashboard síncrono (Flask, hilos fijos) vs. asíncrono (ASGI + AsyncEngine) bajo carga.
+
+Levanta cada servidor en un subproceso contra la misma base local y lanza
+N clientes concurrentes. La caché del dashboard se desactiva (TTL 0) para
+que cada petición llegue a la base.
+
+Uso:  python -m benchmarks.dashboard_async [--clientes 64] [--peticiones 20]
+                                           [--hilos 4] [--uri postgresql://...]
+Requiere uvicorn, greenlet y aiosqlite (o asyncpg para PostgreSQL).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RUTAS = [
+    '/dashboard',
+    '/dashboard/equipos-resumen',
+    '/dashboard/mantenimientos-resumen',
+    '/dashboard/equipos-sin-mantenimiento',
+    '/dashboard/mantenimientos-historial',
+]
+
+
+# ------------------------------------------------------------
+# Servidores (se ejecutan en subprocesos)
+# ------------------------------------------------------------
+def _app_flask(uri):
+    from benchmarks.datos import ConfigBenchmark
+    from app import create_app
+    config = type("ConfigCarga", (ConfigBenchmark,), {
+        "SQLALCHEMY_DATABASE_URI": uri,
+        "DASHBOARD_CACHE_TTL": 0,
+        "METRICAS_ACTIVAS": False,
+    })
+    return create_app(config)
+
+
+def servir_sync(uri, puerto, hilos):
+    # Como un worker gthread de gunicorn: un número fijo de hilos
+    from werkzeug.serving import BaseWSGIServer
+
+    class ServidorHilos(BaseWSGIServer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._hilos = ThreadPoolExecutor(hilos)
+
+        def process_request(self, request, client_address):
+            self._hilos.submit(self._atender, request, client_address)
+
+        def _atender(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    import logging
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    ServidorHilos('127.0.0.1', puerto, _app_flask(uri)).serve_forever()
+
+
+def servir_async(uri, puerto):
+    import uvicorn
+    from app.dashboard_asincrono import DashboardAsincrono
+    uvicorn.run(DashboardAsincrono(_app_flask(uri)), host='127.0.0.1', port=puerto,
+                log_level='warning', lifespan='on')
+
+
+# ------------------------------------------------------------
+# Generador de carga (HTTP/1.0 sobre asyncio, sin dependencias)
+# ------------------------------------------------------------
+async def _get(puerto, ruta):
+    lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+    escritor.write(f"GET {ruta} HTTP/1.0\r\nHost: localhost\r\n\r\n".encode())
+    await escritor.drain()
+    respuesta = await lector.read()
+    escritor.close()
+    return int(respuesta.split(b' ', 2)[1])
+
+
+async def _carga(puerto, clientes, peticiones):
+    latencias, errores = [], 0
+
+    async def cliente(n):
+        nonlocal errores
+        for i in range(peticiones):
+            inicio = time.perf_counter()
+            try:
+                status = await _get(puerto, RUTAS[(n + i) % len(RUTAS)])
+            except OSError:
+                status = None
+            latencias.append(time.perf_counter() - inicio)
+            errores += status != 200
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(n) for n in range(clientes)))
+    return time.perf_counter() - inicio, latencias, errores
+
+
+async def _esperar(puerto, limite=30):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            if await _get(puerto, '/dashboard/equipos-resumen') == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"El servidor en el puerto {puerto} no respondió")
+
+
+def medir(nombre, comando, puerto, clientes, peticiones):
+    proceso = subprocess.Popen([sys.executable, '-m', 'benchmarks.dashboard_async', *comando])
+    try:
+        asyncio.run(_esperar(puerto))
+        asyncio.run(_carga(puerto, 4, 5))  # calentamiento
+        duracion, latencias, errores = asyncio.run(_carga(puerto, clientes, peticiones))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95) - 1]
+    print(f"{nombre:22} {len(latencias) / duracion:8.1f} pet/s   p50 {statistics.median(latencias) * 1000:7.1f} ms"
+          f"   p95 {p95 * 1000:7.1f} ms   errores {errores}")
+
+
+def preparar(uri, equipos, mantenimientos):
+    from app.database import db
+    from benchmarks.datos import sembrar
+    app = _app_flask(uri)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        sembrar(equipos, mantenimientos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clientes', type=int, default=64)
+    parser.add_argument('--peticiones', type=int, default=20)
+    parser.add_argument('--hilos', type=int, default=4)
+    parser.add_argument('--equipos', type=int, default=5000)
+    parser.add_argument('--mantenimientos', type=int, default=20)
+    parser.add_argument('--uri')
+    parser.add_argument('--servir', choices=['sync', 'async'])
+    parser.add_argument('--puerto', type=int, default=8101)
+    args = parser.parse_args()
+
+    if args.servir == 'sync':
+        return servir_sync(args.uri, args.puerto, args.hilos)
+    if args.servir == 'async':
+        return servir_async(args.uri, args.puerto)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        uri = args.uri or f"sqlite:///{os.path.join(carpeta, 'dashboard.db')}"
+        preparar(uri, args.equipos, args.mantenimientos)
+        print(f"{args.clientes} clientes × {args.peticiones} peticiones, "
+              f"{args.equipos} equipos × {args.mantenimientos} mantenimientos")
+        medir(f"sync ({args.hilos} hilos)", ['--servir', 'sync', '--uri', uri, '--puerto', '8101', '--hilos', str(args.hilos)],
+              8101, args.clientes, args.peticiones)
+        medir("async (1 proceso)", ['--servir', 'async', '--uri', uri, '--puerto', '8102'],
+              8102, args.clientes, args.peticiones)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import random
+from datetime import date, timedelta
+
+from config import Config
+from app import create_app
+from app import historial
+from app.cache import cache_dashboard
+from app.database import db
+from app.models import Equipo, Mantenimiento
+from app.servicios import recalcular_lote
+
+# ============================================================
+# 🧪 Utilidades comunes para los scripts de benchmarks
+# ============================================================
+
+class ConfigBenchmark(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    AGENDA_INTERVALO = 0
+
+
+def crear_app_benchmark(uri="sqlite://", **opciones):
+    config = type("ConfigBenchmark", (ConfigBenchmark,), {"SQLALCHEMY_DATABASE_URI": uri, **opciones})
+    app = create_app(config)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    # Las cachés son por proceso: no deben arrastrar datos de otra corrida
+    cache_dashboard.invalidar()
+    return app
+
+
+# 8 de cada 10 activos, el resto repartido
+ESTADOS = ["Activo"] * 8 + ["Inactivo", "En mantenimiento"]
+
+
+def sembrar(equipos, mantenimientos_por_equipo):
+    """Inserta una flota sintética con inserts masivos (requiere app context)."""
+    db.session.execute(Equipo.__table__.insert(), [
+        {
+            "id": i,
+            "codigo": str(i),
+            "nombre": f"Equipo {i}",
+            "marca": "Marca",
+            "modelo": "Modelo",
+            "fecha_compra": date(2020, 1, 1),
+            "periodo_mantenimiento": 6,
+            "estado": ESTADOS[i % len(ESTADOS)],
+        }
+        for i in range(1, equipos + 1)
+    ])
+    if mantenimientos_por_equipo:
+        db.session.execute(Mantenimiento.__table__.insert(), [
+            {
+                "tipo": "Preventivo",
+                "fecha": date(2020, 1, 1) + timedelta(days=30 * j),
+                "equipo_id": i,
+            }
+            for i in range(1, equipos + 1)
+            for j in range(mantenimientos_por_equipo)
+        ])
+        historial.reconstruir()
+    db.session.commit()
+
+
+# ============================================================
+# 🌊 Flota sintética realista y reproducible
+# ============================================================
+# Las fechas se generan como desplazamientos desde ``hoy``: con la misma
+# semilla la flota es idéntica y, corrida en otro día, conserva la misma
+# proporción de equipos al día, atrasados y con mantenimiento programado.
+
+TIPOS_EQUIPO = ["Regulador", "Chaleco BCD", "Tanque", "Computador de buceo", "Traje seco", "Compresor", "Linterna"]
+MARCAS = ["Scubapro", "Aqualung", "Mares", "Cressi", "Suunto", "Apeks", "Shearwater"]
+PERIODOS = [3, 6, 6, 12, 12, 12, 24]
+TIPOS_MANTENIMIENTO = ["Preventivo"] * 7 + ["Correctivo"] * 2 + ["Calibración"]
+AGENTES = [f"Técnico {n}" for n in range(1, 13)] + [None]
+LOTE_FLOTA = 20000
+
+
+def _fechas_mantenimiento(azar, compra, periodo, cantidad, hoy):
+    """Fechas de un equipo: cada ``periodo`` meses desde la compra, con atrasos.
+
+    Un 30 % de los equipos tiene además el siguiente ya programado.
+    """
+    dias_periodo = periodo * 30
+    antiguedad = (hoy - compra).days
+    # Si el historial no alcanza a periodo completo, se acortan los intervalos
+    paso = min(dias_periodo, antiguedad // (cantidad + 1)) if cantidad else 0
+    fechas = []
+    fecha = compra
+    for _ in range(cantidad):
+        fecha = min(hoy, fecha + timedelta(days=max(1, paso + int(azar.gauss(0, paso / 8 + 1)))))
+        fechas.append(fecha)
+    if azar.random() < 0.3:
+        fechas.append(hoy + timedelta(days=azar.randint(1, dias_periodo)))
+    return fechas
+
+
+def generar_flota(equipos, mantenimientos_por_equipo, semilla=0, hoy=None, lote=LOTE_FLOTA):
+    """Inserta ``equipos`` equipos con ~``mantenimientos_por_equipo`` mantenimientos cada uno.
+
+    Determinista para una misma semilla y ``hoy``. Los ids son 1..N en ambas
+    tablas; deja el historial mensual y las fechas de los equipos
+    consistentes (requiere app context, hace commit).
+    """
+    azar = random.Random(semilla)
+    hoy = hoy or date.today()
+    siguiente_mantenimiento = 1
+    for inicio in range(1, equipos + 1, lote):
+        filas_equipos, filas_mantenimientos = [], []
+        for i in range(inicio, min(inicio + lote, equipos + 1)):
+            tipo, marca = azar.choice(TIPOS_EQUIPO), azar.choice(MARCAS)
+            compra = hoy - timedelta(days=azar.randint(60, 8 * 365))
+            periodo = azar.choice(PERIODOS)
+            filas_equipos.append({
+                "id": i,
+                "codigo": str(i),
+                "nombre": f"{tipo} {marca} {i}",
+                "marca": marca,
+                "modelo": f"{marca[:3].upper()}-{azar.randint(100, 999)}",
+                "fecha_compra": compra,
+                "periodo_mantenimiento": periodo,
+                "estado": azar.choice(ESTADOS),
+            })
+            cantidad = azar.randint(0, 2 * mantenimientos_por_equipo)
+            for fecha in _fechas_mantenimiento(azar, compra, periodo, cantidad, hoy):
+                filas_mantenimientos.append({
+                    "id": siguiente_mantenimiento,
+                    "equipo_id": i,
+                    "tipo": azar.choice(TIPOS_MANTENIMIENTO),
+                    "fecha": fecha,
+                    "agente": azar.choice(AGENTES),
+                    "descripcion": f"Revisión {tipo.lower()}",
+                })
+                siguiente_mantenimiento += 1
+        db.session.execute(Equipo.__table__.insert(), filas_equipos)
+        if filas_mantenimientos:
+            db.session.execute(Mantenimiento.__table__.insert(), filas_mantenimientos)
+
+    historial.reconstruir()
+    desde = 0
+    while desde is not None:
+        desde, _, _ = recalcular_lote(desde, hoy)
+    db.session.commit()
+    return siguiente_mantenimiento - 1
@@ -0,0 +1,68 @@
+"""Creación concurrente de equipos: ningún código repetido ni reintentos.
+
+Que no haya fallos ni códigos repetidos se comprueba con pytest en
+tests/test_codigos.py; aquí se mide el ritmo de altas.
+
+Uso:  python -m benchmarks.estres_codigos [hilos] [equipos_por_hilo]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from app.database import db
+from app.models import Equipo
+from benchmarks.datos import crear_app_benchmark
+
+EQUIPO = {"nombre": "Regulador", "marca": "Marca", "modelo": "Modelo",
+          "fecha_compra": "2024-01-01", "periodo_mantenimiento": "6", "estado": "Activo"}
+
+
+def altas_concurrentes(apps, hilos, por_hilo):
+    """``hilos`` hilos por app dan de alta ``por_hilo`` equipos cada uno.
+
+    Varias apps sobre la misma base hacen de procesos distintos (cada una
+    con su engine). Devuelve (respuestas que no fueron 201, códigos en la base).
+    """
+    fallos = []
+
+    def crear(app):
+        cliente = app.test_client()
+        for _ in range(por_hilo):
+            respuesta = cliente.post('/equipos', json=EQUIPO)
+            if respuesta.status_code != 201:
+                fallos.append((respuesta.status_code, respuesta.get_data(as_text=True)))
+
+    trabajadores = [threading.Thread(target=crear, args=(app,)) for app in apps for _ in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+
+    with apps[0].app_context():
+        codigos = db.session.execute(db.select(Equipo.codigo)).scalars().all()
+    for app in apps:
+        with app.app_context():
+            db.engine.dispose()
+    return fallos, codigos
+
+
+def main(hilos=8, por_hilo=50):
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Base en archivo: los hilos usan conexiones distintas, como en producción
+        app = crear_app_benchmark(f"sqlite:///{os.path.join(carpeta, 'estres.db')}")
+        inicio = time.perf_counter()
+        fallos, codigos = altas_concurrentes([app], hilos, por_hilo)
+        duracion = time.perf_counter() - inicio
+
+    total = hilos * por_hilo
+    print(f"{total} altas en {duracion:.2f}s ({total / duracion:.0f}/s), "
+          f"{len(fallos)} fallidas, {len(codigos) - len(set(codigos))} códigos repetidos")
+    for fallo in fallos[:5]:
+        print("  ", fallo)
+    return 1 if fallos or len(codigos) != total or len(set(codigos)) != total else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*map(int, sys.argv[1:3])))
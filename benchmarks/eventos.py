@@ -0,0 +1,123 @@
+"""/eventos (Server-Sent Events) con muchos clientes conectados.
+
+1. Reparto en el proceso: costo de publicar un evento con N suscriptores.
+2. Por HTTP: N clientes SSE contra uvicorn (asgi); este proceso escribe en
+   la base (como otro worker) y se mide cuánto tarda el evento "dashboard"
+   en llegar a todos. Se compara con lo que costaría sondear.
+
+Uso:  python -m benchmarks.eventos [--clientes 500] [--escrituras 5]
+Requiere uvicorn, greenlet y aiosqlite.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.cambios import marcar_cambio
+from app.database import db
+from app.eventos import CanalEventos
+from app.models import Equipo
+from benchmarks.dashboard_async import _app_flask, preparar
+
+PUERTO = 8103
+INTERVALO_SONDEO = 5     # segundos, como el dashboard actual
+INTERVALO_VIGIA = 0.5    # EVENTOS_INTERVALO del servidor
+
+
+def reparto(clientes, eventos=1000):
+    canal = CanalEventos(None, cola=eventos + 1)
+    canal._vigia = object()  # sin hilo vigía: solo se mide el reparto
+    suscripciones = [canal.suscribir() for _ in range(clientes)]
+    inicio = time.perf_counter()
+    for i in range(eventos):
+        canal.publicar('equipos', {"accion": "actualizado", "ids": [i]})
+    duracion = time.perf_counter() - inicio
+    assert all(len(s.tomar()) == eventos for s in suscripciones)
+    print(f"reparto en proceso: {clientes} suscriptores, {duracion / eventos * 1e6:8.1f} µs por evento")
+
+
+def servir(uri):
+    import uvicorn
+    from app.dashboard_asincrono import DashboardAsincrono
+    app = _app_flask(uri)
+    app.extensions['eventos'].intervalo = INTERVALO_VIGIA
+    uvicorn.run(DashboardAsincrono(app), host='127.0.0.1', port=PUERTO, log_level='warning')
+
+
+async def _cliente(recibidos, listos):
+    lector, escritor = await asyncio.open_connection('127.0.0.1', PUERTO)
+    escritor.write(b"GET /eventos HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+    await escritor.drain()
+    await lector.readuntil(b"retry: 3000\n\n")
+    listos.append(1)
+    try:
+        while True:
+            linea = await lector.readline()
+            if not linea:
+                return
+            if linea.startswith(b"event: dashboard"):
+                recibidos.append(time.perf_counter())
+    finally:
+        escritor.close()
+
+
+async def _carga(app, clientes, escrituras):
+    recibidos, listos = [], []
+    tareas = [asyncio.ensure_future(_cliente(recibidos, listos)) for _ in range(clientes)]
+    while len(listos) < clientes:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(1)  # el vigía toma las versiones de partida
+
+    latencias = []
+    for i in range(escrituras):
+        recibidos.clear()
+        with app.app_context():
+            db.session.get(Equipo, 1).estado = "Inactivo" if i % 2 else "Activo"
+            marcar_cambio('equipos', 'actualizado', 1)
+            db.session.commit()
+        inicio = time.perf_counter()
+        while len(recibidos) < clientes:
+            await asyncio.sleep(0.01)
+        latencias.append((max(recibidos) - inicio, statistics.median(recibidos) - inicio))
+    for tarea in tareas:
+        tarea.cancel()
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clientes', type=int, default=500)
+    parser.add_argument('--escrituras', type=int, default=5)
+    parser.add_argument('--servir')
+    args = parser.parse_args()
+    if args.servir:
+        return servir(args.servir)
+
+    reparto(args.clientes)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        uri = f"sqlite:///{os.path.join(carpeta, 'eventos.db')}"
+        preparar(uri, 200, 5)
+        proceso = subprocess.Popen([sys.executable, '-m', 'benchmarks.eventos', '--servir', uri])
+        try:
+            time.sleep(3)
+            latencias = asyncio.run(_carga(_app_flask(uri), args.clientes, args.escrituras))
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+    peor = max(t for t, _ in latencias)
+    mediana = statistics.median(m for _, m in latencias)
+    print(f"{args.clientes} clientes SSE: escritura en otro proceso → evento en todos: "
+          f"mediana {mediana * 1000:6.0f} ms, peor {peor * 1000:6.0f} ms")
+    print(f"sondeando cada {INTERVALO_SONDEO} s serían {args.clientes / INTERVALO_SONDEO:.0f} pet/s "
+          f"y hasta {INTERVALO_SONDEO * 1000} ms de retraso; con SSE, una consulta de versiones "
+          f"cada {INTERVALO_VIGIA} s por proceso")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Memoria y tiempo de GET /mantenimientos/exportar según el tamaño del historial.
+
+La exportación va en streaming: el pico de memoria debe quedar casi igual
+al crecer la tabla, mientras que el listado JSON completo (GET
+/mantenimientos sin limit) crece con ella.
+
+Uso:  python -m benchmarks.exportacion [equipos...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app.database import db
+from benchmarks.datos import crear_app_benchmark, generar_flota
+
+MANTENIMIENTOS_POR_EQUIPO = 10
+RUTAS = [
+    ("listado JSON", '/mantenimientos', {}),
+    ("CSV", '/mantenimientos/exportar', {}),
+    ("CSV gzip", '/mantenimientos/exportar', {'Accept-Encoding': 'gzip'}),
+    ("XLSX", '/mantenimientos/exportar?formato=xlsx', {}),
+]
+
+
+def medir(cliente, ruta, cabeceras):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    respuesta = cliente.get(ruta, headers=cabeceras, buffered=False)
+    tamano = sum(len(parte) for parte in respuesta.response)
+    respuesta.close()
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert respuesta.status_code == 200
+    return duracion, pico, tamano
+
+
+def main(tamanos=(5000, 20000)):
+    print(f"{'filas':>8} {'formato':14} {'segundos':>9} {'pico MB':>8} {'tamaño MB':>10}")
+    for equipos in tamanos:
+        descriptor, ruta_db = tempfile.mkstemp(suffix='.db')
+        os.close(descriptor)
+        try:
+            app = crear_app_benchmark(f"sqlite:///{ruta_db}")
+            cliente = app.test_client()
+            with app.app_context():
+                filas = generar_flota(equipos, MANTENIMIENTOS_POR_EQUIPO)
+                db.session.remove()
+                for nombre, ruta, cabeceras in RUTAS:
+                    duracion, pico, tamano = medir(cliente, ruta, cabeceras)
+                    print(f"{filas:>8} {nombre:14} {duracion:>9.2f} {pico / 2**20:>8.1f} {tamano / 2**20:>10.1f}")
+                db.engine.dispose()
+        finally:
+            os.unlink(ruta_db)
+
+
+if __name__ == '__main__':
+    main(tuple(map(int, sys.argv[1:])) or (5000, 20000))
@@ -0,0 +1,66 @@
+"""Subida de imágenes: memoria pico de la subida y tiempo de las variantes.
+
+Uso:  python -m benchmarks.imagenes [imagenes]
+Requiere Pillow.
+"""
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from PIL import Image
+
+from app.database import db
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def _foto(semilla, lado=(4000, 3000)):
+    buffer = io.BytesIO()
+    Image.effect_noise(lado, 40 + semilla).convert('RGB').save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def main(cantidad=16):
+    with tempfile.TemporaryDirectory() as carpeta:
+        app = crear_app_benchmark(IMAGENES_DIR=carpeta, IMAGENES_TAMANO_MAXIMO=200 * 1024 * 1024)
+        cliente = app.test_client()
+        procesador = app.extensions['imagenes']
+        with app.app_context():
+            sembrar(cantidad, 0)
+        fotos = [_foto(i) for i in range(cantidad)]
+
+        # Memoria: la subida copia por bloques, el pico no crece con el archivo
+        grande = fotos[0] + b'\0' * (64 * 1024 * 1024)  # JPEG con 64 MB de relleno
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        respuesta = cliente.put('/equipos/1/imagen', input_stream=io.BytesIO(grande),
+                                content_type='image/jpeg', headers={'Content-Length': str(len(grande))})
+        pico = tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        assert respuesta.status_code in (201, 202), respuesta.get_json()
+        procesador.esperar()
+        print(f"subida de {len(grande) / 2 ** 20:.0f} MB: pico de memoria {pico / 2 ** 20:.2f} MB")
+
+        for hilos in (0, 2, 4):
+            procesador.hilos = hilos
+            with tempfile.TemporaryDirectory() as otra:
+                procesador.carpeta = otra
+                app.config['IMAGENES_DIR'] = otra
+                inicio = time.perf_counter()
+                respuestas = [
+                    cliente.put(f'/equipos/{i + 1}/imagen', data=foto, content_type='image/jpeg')
+                    for i, foto in enumerate(fotos)
+                ]
+                peticiones = time.perf_counter() - inicio
+                procesador.esperar()
+                total = time.perf_counter() - inicio
+                assert all(r.status_code in (201, 202) for r in respuestas)
+            with app.app_context():
+                listas = db.session.scalar(db.text("SELECT count(*) FROM equipos WHERE imagen_variantes IS NOT NULL"))
+            print(f"{hilos} hilos: {cantidad} fotos 4000×3000, respuestas en {peticiones:5.2f} s, "
+                  f"variantes listas en {total:5.2f} s ({listas} equipos)")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,56 @@
+"""Registrar N mantenimientos: un POST por fila (antes) vs. POST /mantenimientos/lote.
+
+El lote admite como máximo TAMANO_LOTE ítems por petición: N mayores se
+envían en varias peticiones.
+
+Uso:  python -m benchmarks.lote_mantenimientos [mantenimientos] [equipos]
+"""
+import sys
+import time
+from datetime import date, timedelta
+
+from app.database import db
+from app.diagnostico import contar_consultas
+from app.importacion import TAMANO_LOTE
+from app.models import Mantenimiento
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def _items(cantidad, equipos):
+    inicio = date(2024, 1, 1)
+    return [{
+        "equipo_id": 1 + i % equipos,
+        "tipo": "Revisión",
+        "fecha": (inicio + timedelta(days=i % 365)).isoformat(),
+    } for i in range(cantidad)]
+
+
+def _en_lotes(cliente, items):
+    return all(
+        cliente.post('/mantenimientos/lote', json=items[i:i + TAMANO_LOTE]).status_code == 201
+        for i in range(0, len(items), TAMANO_LOTE)
+    )
+
+
+def main(cantidad=2000, equipos=50):
+    app = crear_app_benchmark()
+    cliente = app.test_client()
+    items = _items(cantidad, equipos)
+    with app.app_context():
+        sembrar(equipos, 5)
+        pruebas = (
+            ("uno por uno", lambda: all(cliente.post('/mantenimientos', json=m).status_code == 201 for m in items)),
+            ("lote", lambda: _en_lotes(cliente, items)),
+        )
+        for nombre, funcion in pruebas:
+            with contar_consultas(db.engine) as contador:
+                inicio = time.perf_counter()
+                assert funcion()
+                duracion = time.perf_counter() - inicio
+            print(f"{nombre:12} {duracion * 1000:9.1f} ms  {contador.total:6} sentencias")
+        total = db.session.scalar(db.select(db.func.count()).select_from(Mantenimiento))
+        assert total == equipos * 5 + 2 * cantidad
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:3]))
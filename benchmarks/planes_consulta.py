@@ -0,0 +1,119 @@
+"""Muestra con EXPLAIN QUERY PLAN que las consultas frecuentes usan índices.
+
+La comprobación corre con pytest en tests/test_planes_consulta.py.
+
+Uso:  python -m benchmarks.planes_consulta
+"""
+import sys
+from datetime import date
+
+from sqlalchemy import func, select, text
+
+from app.agenda import consulta_agenda
+from app.busqueda import condicion_texto
+from app.historial import borrado_en_cero
+from app.versiones import consulta_versiones
+from app.consultas import (
+    consulta_equipos_sin_mantenimiento, consulta_estados_equipos,
+    consulta_fechas_equipo, consulta_resumen_mantenimientos
+)
+from app.database import db
+from app.filtros import orden_equipos
+from app.listados import OrdenKeyset, codificar_cursor
+from app.models import Equipo, Mantenimiento
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+HOY = date(2024, 6, 15)
+
+
+def _por_cursor(modelo, orden, cursor):
+    return select(modelo.id).where(orden.despues_de(cursor)).order_by(*orden.order_by()).limit(50)
+
+
+# nombre → (consulta, índices que deben aparecer en el plan); algunas
+# dependen del motor, por eso se arman dentro del app context
+def consultas():
+    return {
+        "fechas de un equipo": (consulta_fechas_equipo(1, HOY), ["ix_mantenimientos_equipo_fecha"]),
+        "resumen de mantenimientos": (consulta_resumen_mantenimientos(HOY), ["ix_mantenimientos_fecha_id"]),
+        "equipos por estado": (consulta_estados_equipos(), ["ix_equipos_estado_id"]),
+        "estado sin mayúsculas": (
+            select(func.count()).select_from(Equipo).where(func.lower(Equipo.estado) == "en mantenimiento"),
+            ["ix_equipos_estado_lower"],
+        ),
+        "equipos sin mantenimiento": (consulta_equipos_sin_mantenimiento(), ["ix_mantenimientos_equipo_fecha"]),
+        "próximos mantenimientos": (
+            select(Equipo.id).where(Equipo.proximo_mantenimiento.between(HOY, date(2024, 7, 15))),
+            ["ix_equipos_proximo_mantenimiento"],
+        ),
+        "agenda tras escritura ajena": (consulta_agenda(HOY), ["ix_equipos_proximo_mantenimiento"]),
+        "listado por cursor": (
+            _por_cursor(Mantenimiento, OrdenKeyset(Mantenimiento.fecha, Mantenimiento.id, descendente=True),
+                        codificar_cursor([HOY, 100])),
+            ["ix_mantenimientos_fecha_id"],
+        ),
+        "equipos por nombre (cursor)": (
+            _por_cursor(Equipo, orden_equipos({"orden": "nombre"}), codificar_cursor(["Equipo 50", 50])),
+            ["ix_equipos_nombre_id"],
+        ),
+        "equipos por código (cursor)": (
+            _por_cursor(Equipo, orden_equipos({"orden": "codigo"}), codificar_cursor(["50", 50])),
+            ["ix_equipos_codigo_id"],
+        ),
+        "equipos por estado (cursor)": (
+            _por_cursor(Equipo, orden_equipos({"orden": "-estado"}), codificar_cursor(["Activo", 50])),
+            ["ix_equipos_estado_id"],
+        ),
+        "equipos por último mantenimiento (cursor)": (
+            _por_cursor(Equipo, orden_equipos({"orden": "ultimo_mantenimiento"}),
+                        codificar_cursor([HOY.isoformat(), 50])),
+            ["ix_equipos_ultimo_mantenimiento_id"],
+        ),
+        "equipos por marca": (
+            select(Equipo.id).where(Equipo.marca == "Marca").order_by(Equipo.marca, Equipo.id).limit(50),
+            ["ix_equipos_marca_id"],
+        ),
+        "limpiar historial en cero": (
+            borrado_en_cero([("2024-06", 1, "Preventivo"), ("2024-07", 2, "Correctivo")]),
+            ["sqlite_autoindex_mantenimientos_mensuales_1"],
+        ),
+        "versiones (fragmentos)": (
+            consulta_versiones(['equipos', 'mantenimientos']),
+            ["sqlite_autoindex_contadores_1"],
+        ),
+        "búsqueda de texto": (
+            select(Equipo.id).where(condicion_texto("quipo 1")),
+            ["equipos_busqueda VIRTUAL TABLE"],
+        ),
+    }
+
+
+def preparar():
+    """Base con datos y estadísticas, para que el planificador elija como en producción."""
+    sembrar(200, 20)
+    db.session.execute(text("ANALYZE"))
+
+
+def plan_de(consulta, indices):
+    """Pasos del plan y los índices esperados que no aparecen en él."""
+    sql = str(consulta.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    plan = [fila[-1] for fila in db.session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    return plan, [i for i in indices if not any(i in paso for paso in plan)]
+
+
+def main():
+    app = crear_app_benchmark()
+    fallos = 0
+    with app.app_context():
+        preparar()
+        for nombre, (consulta, indices) in consultas().items():
+            plan, faltan = plan_de(consulta, indices)
+            fallos += bool(faltan)
+            print(f"{'OK' if not faltan else 'FALLA':6} {nombre}")
+            for paso in plan:
+                print(f"         {paso}")
+    return 1 if fallos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Costo por escritura de mantenimientos a medida que crece el historial.
+
+Uso:  python -m benchmarks.recalculo_fechas
+"""
+import time
+from datetime import date, timedelta
+
+from app.database import db
+from app.diagnostico import contar_consultas
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+HISTORIALES = [10, 1000, 10000]
+ESCRITURAS = 200
+
+
+def medir(historial):
+    app = crear_app_benchmark()
+    cliente = app.test_client()
+    with app.app_context():
+        sembrar(1, historial)
+        inicio = time.perf_counter()
+        with contar_consultas(db.engine) as contador:
+            for i in range(ESCRITURAS):
+                fecha = date(2021, 1, 1) + timedelta(days=i)
+                respuesta = cliente.post('/mantenimientos', json={
+                    "equipo_id": 1, "tipo": "Preventivo", "fecha": fecha.isoformat()
+                })
+                assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+        duracion = time.perf_counter() - inicio
+    return duracion / ESCRITURAS * 1000, contador.total / ESCRITURAS
+
+
+def main():
+    print(f"{'historial':>10} {'ms/escritura':>14} {'consultas/escritura':>20}")
+    for historial in HISTORIALES:
+        ms, consultas = medir(historial)
+        print(f"{historial:>10} {ms:>14.3f} {consultas:>20.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Recalcular las fechas de toda la flota: equipo por equipo (ORM) vs. "flask recalcular-fechas".
+
+Uso:  python -m benchmarks.recalculo_flota [equipos] [uri]     (por defecto 1.000.000, SQLite en memoria)
+
+Con una base PostgreSQL desechable (se borra y se recrea) se mide el
+UPDATE ... FROM por lote, que en SQLite no existe.
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.database import db
+from app.models import Equipo, Mantenimiento
+from app.servicios import recalcular_fechas
+from benchmarks.datos import crear_app_benchmark
+
+HOY = date(2024, 6, 15)
+LOTE = 20000
+MUESTRA_ORM = 10000
+
+
+def sembrar_desfasado(cantidad):
+    """Equipos con 0 a 3 mantenimientos y fechas guardadas al azar (desfasadas)."""
+    rnd = random.Random(11)
+    for inicio in range(1, cantidad + 1, LOTE):
+        ids = range(inicio, min(inicio + LOTE, cantidad + 1))
+        db.session.execute(Equipo.__table__.insert(), [
+            {
+                "id": i,
+                "codigo": str(i),
+                "nombre": f"Equipo {i}",
+                "fecha_compra": date(2019, 1, 1) + timedelta(days=rnd.randint(0, 1500)),
+                "periodo_mantenimiento": rnd.choice([3, 6, 12]),
+                "ultimo_mantenimiento": rnd.choice([None, date(2020, 1, 1)]),
+                "proximo_mantenimiento": rnd.choice([None, date(2021, 1, 1)]),
+            }
+            for i in ids
+        ])
+        db.session.execute(Mantenimiento.__table__.insert(), [
+            {"equipo_id": i, "tipo": "Preventivo", "fecha": date(2022, 1, 1) + timedelta(days=rnd.randint(0, 1100))}
+            for i in ids
+            for _ in range(rnd.randint(0, 3))
+        ])
+    db.session.commit()
+
+
+def antes(cantidad):
+    # Como haría un script con el ORM: cargar cada equipo y recalcular
+    inicio = time.perf_counter()
+    for equipo in db.session.execute(select(Equipo).where(Equipo.id <= cantidad)).scalars():
+        recalcular_fechas(equipo, HOY)
+    db.session.commit()
+    return time.perf_counter() - inicio
+
+
+def main(equipos=1_000_000, uri="sqlite://"):
+    app = crear_app_benchmark(uri)
+    runner = app.test_cli_runner()
+    with app.app_context():
+        inicio = time.perf_counter()
+        sembrar_desfasado(equipos)
+        print(f"{equipos} equipos sembrados en {time.perf_counter() - inicio:.1f} s")
+
+        muestra = min(MUESTRA_ORM, equipos)
+        duracion = antes(muestra)
+        print(f"antes    {muestra / duracion:10,.0f} equipos/s  (estimado para la flota: {equipos / muestra * duracion:7.1f} s)")
+
+        for args in (['--dry-run', '--mostrar', '0'], [], ['--dry-run', '--mostrar', '0']):
+            resultado = runner.invoke(args=['recalcular-fechas', '--hoy', HOY.isoformat(), *args])
+            assert resultado.exit_code == 0, resultado.output
+            print(f"{' '.join(args) or 'aplicar':22} {resultado.stdout.strip().splitlines()[-1]}")
+
+        # Tras aplicar, el resultado coincide con el recálculo equipo por equipo
+        db.session.expire_all()
+        rnd = random.Random(3)
+        for equipo_id in rnd.sample(range(1, equipos + 1), min(200, equipos)):
+            equipo = db.session.get(Equipo, equipo_id)
+            guardado = (equipo.ultimo_mantenimiento, equipo.proximo_mantenimiento)
+            recalcular_fechas(equipo, HOY)
+            assert guardado == (equipo.ultimo_mantenimiento, equipo.proximo_mantenimiento), equipo_id
+        db.session.rollback()
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]), *sys.argv[2:3])
@@ -0,0 +1,138 @@
+"""Lecturas en la réplica y escrituras en la primaria, con dos SQLite locales.
+
+La "réplica" es una copia de la primaria hecha con la API de backup de
+SQLite; entre copias queda atrasada, como una réplica con retraso.
+
+Muestra:
+  - a qué base va cada sentencia de las rutas de lectura y de escritura,
+  - que quien escribió lee lo propio (cookie) y los demás ven la réplica,
+  - la latencia de lecturas mientras otro hilo escribe en la primaria.
+
+Las dos primeras se comprueban con pytest en tests/test_replica.py.
+
+Uso:  python -m benchmarks.replica [equipos]
+"""
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from app.database import db
+from app.diagnostico import contar_consultas
+from app.replicas import COOKIE_PRIMARIA
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+LECTURAS = [
+    '/equipos?limit=50',
+    '/equipos/1',
+    '/mantenimientos?limit=50',
+    '/dashboard/equipos-resumen',
+    '/dashboard/mantenimientos-historial',
+]
+EQUIPO_NUEVO = {"nombre": "Nuevo", "marca": "m", "modelo": "x", "fecha_compra": "2024-01-01",
+                "periodo_mantenimiento": "6", "estado": "Activo"}
+
+
+def replicar(app, primaria, replica):
+    app.extensions['replica'].dispose()
+    origen, destino = sqlite3.connect(primaria), sqlite3.connect(replica)
+    origen.backup(destino)
+    origen.close()
+    destino.close()
+
+
+def crear_app_con_replica(carpeta, equipos, **opciones):
+    """App con primaria y réplica en ``carpeta``, sembrada y recién replicada."""
+    primaria = os.path.join(carpeta, 'primaria.db')
+    replica = os.path.join(carpeta, 'replica.db')
+    app = crear_app_benchmark(f"sqlite:///{primaria}", REPLICA_DATABASE_URI=f"sqlite:///{replica}",
+                              METRICAS_ACTIVAS=False, **opciones)
+    with app.app_context():
+        sembrar(equipos, 10)
+    replicar(app, primaria, replica)
+    return app, primaria, replica
+
+
+def contar_por_base(app, funcion):
+    with app.app_context():
+        primaria, replica = db.engine, app.extensions['replica']
+    with contar_consultas(primaria) as en_primaria, contar_consultas(replica) as en_replica:
+        funcion()
+    return en_primaria.total, en_replica.total
+
+
+def _latencias(app, escribir, segundos=3):
+    cliente = app.test_client()
+    fin = time.monotonic() + segundos
+    parar = threading.Event()
+
+    def escritor():
+        otro = app.test_client()
+        lote = [{"equipo_id": 1 + i % 50, "tipo": "Revisión", "fecha": "2024-05-01"} for i in range(500)]
+        while not parar.is_set():
+            otro.post('/mantenimientos/lote', json=lote)
+
+    hilo = threading.Thread(target=escritor) if escribir else None
+    if hilo:
+        hilo.start()
+    tiempos = []
+    try:
+        while time.monotonic() < fin:
+            for url in LECTURAS:
+                inicio = time.perf_counter()
+                assert cliente.get(url).status_code == 200
+                tiempos.append(time.perf_counter() - inicio)
+    finally:
+        parar.set()
+        if hilo:
+            hilo.join()
+    tiempos.sort()
+    return statistics.median(tiempos) * 1000, tiempos[int(len(tiempos) * 0.95) - 1] * 1000
+
+
+def main(equipos=2000):
+    with tempfile.TemporaryDirectory() as carpeta:
+        app, primaria, replica = crear_app_con_replica(carpeta, equipos, DASHBOARD_CACHE_TTL=0)
+
+        lector, escritor = app.test_client(), app.test_client()
+        for url in LECTURAS:
+            en_primaria, en_replica = contar_por_base(app, lambda: lector.get(url))
+            print(f"GET {url:40} primaria {en_primaria:3}  réplica {en_replica:3}")
+            assert en_primaria == 0
+        en_primaria, en_replica = contar_por_base(app, lambda: escritor.post('/equipos', json=EQUIPO_NUEVO))
+        print(f"POST /equipos{'':37} primaria {en_primaria:3}  réplica {en_replica:3}")
+        assert en_replica == 0
+
+        # Leer lo propio: el escritor ve el equipo nuevo antes de que la réplica lo tenga
+        assert escritor.get_cookie(COOKIE_PRIMARIA) is not None
+        total = equipos + 1
+        vistos = {
+            "escritor": escritor.get('/dashboard/equipos-resumen').get_json()["total"],
+            "otro cliente": lector.get('/dashboard/equipos-resumen').get_json()["total"],
+        }
+        print(f"tras escribir, sin replicar: {vistos}")
+        assert vistos == {"escritor": total, "otro cliente": equipos}
+        replicar(app, primaria, replica)
+        assert lector.get('/dashboard/equipos-resumen').get_json()["total"] == total
+
+        # Latencia de lecturas con y sin escrituras concurrentes
+        for escribir in (False, True):
+            p50, p95 = _latencias(app, escribir)
+            print(f"lecturas en réplica {'con' if escribir else 'sin'} escrituras: p50 {p50:6.1f} ms  p95 {p95:6.1f} ms")
+
+    # Misma carga sin réplica: lecturas y escrituras en la primaria
+    with tempfile.TemporaryDirectory() as carpeta:
+        app = crear_app_benchmark(f"sqlite:///{os.path.join(carpeta, 'unica.db')}",
+                                  DASHBOARD_CACHE_TTL=0, METRICAS_ACTIVAS=False)
+        with app.app_context():
+            sembrar(equipos, 10)
+        for escribir in (False, True):
+            p50, p95 = _latencias(app, escribir)
+            print(f"lecturas en primaria {'con' if escribir else 'sin'} escrituras: p50 {p50:6.1f} ms  p95 {p95:6.1f} ms")
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,65 @@
+"""Serialización de 100k equipos: ORM + dicts a mano + json de Flask vs. esquema sobre tuplas.
+
+Uso:  python -m benchmarks.serializacion [filas]
+"""
+import sys
+import time
+import tracemalloc
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.database import db
+from app.models import Equipo
+from app.serializadores import ESQUEMA_EQUIPO, ProveedorJSONRapido, orjson
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def antes(app):
+    # Como lo hacían las rutas: objetos del ORM, dict a mano y str() por fecha
+    equipos = Equipo.query.all()
+    resultado = []
+    for e in equipos:
+        resultado.append({
+            "id": e.id,
+            "codigo": e.codigo,
+            "nombre": e.nombre,
+            "marca": e.marca,
+            "modelo": e.modelo,
+            "fecha_compra": str(e.fecha_compra),
+            "periodo_mantenimiento": e.periodo_mantenimiento,
+            "estado": e.estado,
+            "imagen_url": e.imagen_url,
+            "proximo_mantenimiento": str(e.proximo_mantenimiento) if e.proximo_mantenimiento else None,
+            "ultimo_mantenimiento": str(e.ultimo_mantenimiento) if e.ultimo_mantenimiento else None
+        })
+    return DefaultJSONProvider(app).dumps(resultado)
+
+
+def despues(app):
+    serializar = ESQUEMA_EQUIPO.serializador()
+    filas = db.session.execute(ESQUEMA_EQUIPO.consulta())
+    return ProveedorJSONRapido(app).dumps([serializar(f) for f in filas])
+
+
+def medir(nombre, funcion, app):
+    db.session.expunge_all()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    salida = funcion(app)
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{nombre:10} {duracion * 1000:9.1f} ms  pico {pico / 2 ** 20:7.1f} MiB  {len(salida) / 2 ** 20:6.1f} MiB de JSON")
+
+
+def main(filas=100_000):
+    app = crear_app_benchmark()
+    with app.app_context():
+        sembrar(filas, 0)
+        print(f"{filas} filas, orjson {'disponible' if orjson else 'no instalado'}")
+        medir("antes", antes, app)
+        medir("después", despues, app)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,368 @@
+"""Suite de rendimiento reproducible: latencia, consultas SQL y memoria por ruta.
+
+Para cada tamaño genera una flota determinista (benchmarks.datos.generar_flota)
+en una base local, mide cada ruta de la API con el cliente de pruebas
+(lecturas, escrituras y dashboard) y compara con una línea base guardada.
+Sale con código 1 si alguna ruta empeoró más allá de la tolerancia.
+
+Uso:
+    python -m benchmarks.suite                      # compara con benchmarks/linea_base.json
+    python -m benchmarks.suite --guardar            # reescribe la línea base
+    python -m benchmarks.suite --tamanos 1000x5,20000x10 --repeticiones 30 \\
+        --salida resultados.json --base otra_corrida.json
+    python -m benchmarks.suite --uri postgresql+psycopg2://.../bench   # base desechable
+
+Sin --uri se usa un SQLite temporal en archivo por tamaño. Los tiempos
+dependen de la máquina: la línea base debe generarse en la misma donde se
+compara (las consultas por ruta, en cambio, son exactas en cualquiera).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import date, timedelta
+
+import sqlalchemy
+
+from app.database import db
+from app.diagnostico import contar_consultas
+from benchmarks.carga import percentil
+from benchmarks.datos import crear_app_benchmark, generar_flota
+
+BASE = os.path.join(os.path.dirname(__file__), 'linea_base.json')
+TAMANOS = "500x4,5000x8"
+REPETICIONES = 20
+CALENTAMIENTO = 2
+
+# Una ruta empeora si supera a la base en la tolerancia relativa Y en el
+# mínimo absoluto (los tiempos de un par de ms son ruido). Las consultas
+# se comparan exactas: cualquier aumento es una regresión
+TOLERANCIA = 0.5
+MINIMO_MS = 2.0
+MINIMO_MEMORIA_KB = 256
+REINTENTOS = 2
+REPETICIONES_CALIBRACION = 9
+
+
+class Contexto:
+    """Estado de una corrida: tamaño de la flota y ids aún no usados por escrituras."""
+
+    def __init__(self, equipos, mantenimientos, hoy):
+        self.equipos = equipos
+        self.mantenimientos = mantenimientos
+        self.hoy = hoy
+        # Los borrados consumen ids desde el final, cada uno distinto
+        self._equipo_borrable = equipos
+        self._mantenimiento_borrable = mantenimientos
+
+    def borrar_equipo(self):
+        self._equipo_borrable -= 1
+        return self._equipo_borrable + 1
+
+    def borrar_mantenimiento(self):
+        self._mantenimiento_borrable -= 1
+        return self._mantenimiento_borrable + 1
+
+    def fecha(self, azar):
+        return (self.hoy - timedelta(days=azar.randint(0, 730))).isoformat()
+
+
+# nombre, método, ruta(ctx, azar), cuerpo(ctx, azar), estado esperado, cabeceras
+Caso = namedtuple('Caso', ['nombre', 'metodo', 'ruta', 'cuerpo', 'esperado', 'cabeceras'])
+
+
+def leer(nombre, ruta, cabeceras=None):
+    return Caso(nombre, 'GET', ruta if callable(ruta) else (lambda c, a: ruta), None, 200, cabeceras)
+
+
+def escribir(nombre, metodo, ruta, cuerpo, esperado=200):
+    return Caso(nombre, metodo, ruta if callable(ruta) else (lambda c, a: ruta), cuerpo, esperado, None)
+
+
+def _equipo(c, a):
+    return a.randint(1, c.equipos // 2)
+
+
+def _mantenimiento(c, a):
+    return a.randint(1, c.mantenimientos // 2)
+
+
+def _csv_equipos(c, a):
+    filas = ["nombre,marca,modelo,fecha_compra,periodo_mantenimiento,estado"]
+    filas += [f"Importado {a.random():.6f},Mares,MAR-1,{c.fecha(a)},6,Activo" for _ in range(100)]
+    return "\n".join(filas).encode()
+
+
+def _csv_mantenimientos(c, a):
+    filas = ["equipo_id,tipo,fecha,agente"]
+    filas += [f"{_equipo(c, a)},Preventivo,{c.fecha(a)},Técnico 1" for _ in range(100)]
+    return "\n".join(filas).encode()
+
+
+# Orden de ejecución: primero lecturas, después escrituras y al final los
+# borrados (las lecturas de cada tamaño ven siempre la misma flota)
+CASOS = [
+    leer('equipos: listado completo', '/equipos'),
+    leer('equipos: página', '/equipos?limit=50'),
+    leer('equipos: ndjson', '/equipos?formato=ndjson'),
+    leer('equipos: filtro estado', '/equipos?estado=Inactivo&limit=50'),
+    leer('equipos: búsqueda', '/equipos?q=regulador&limit=50'),
+    leer('equipos: orden próximo', '/equipos?orden=-proximo_mantenimiento&limit=50'),
+    leer('equipos: detalle', lambda c, a: f'/equipos/{_equipo(c, a)}'),
+    leer('mantenimientos: listado completo', '/mantenimientos'),
+    leer('mantenimientos: página', '/mantenimientos?limit=50'),
+    leer('mantenimientos: de un equipo', lambda c, a: f'/mantenimientos?equipo_id={_equipo(c, a)}'),
+    leer('mantenimientos: detalle', lambda c, a: f'/mantenimientos/{_mantenimiento(c, a)}'),
+    leer('dashboard', '/dashboard'),
+    leer('dashboard: equipos-resumen', '/dashboard/equipos-resumen'),
+    leer('dashboard: mantenimientos-resumen', '/dashboard/mantenimientos-resumen'),
+    leer('dashboard: equipos-sin-mantenimiento', '/dashboard/equipos-sin-mantenimiento'),
+    leer('dashboard: historial', '/dashboard/mantenimientos-historial'),
+    leer('dashboard: historial de un equipo', lambda c, a: f'/dashboard/mantenimientos-historial?equipo_id={_equipo(c, a)}'),
+    leer('dashboard: próximos', '/dashboard/proximos?dias=30'),
+    leer('dashboard: cache', '/dashboard/cache'),
+
+    escribir('equipos: crear', 'POST', '/equipos', lambda c, a: {
+        "nombre": "Regulador nuevo", "marca": "Apeks", "modelo": "XTX-50", "fecha_compra": c.fecha(a),
+        "periodo_mantenimiento": "6", "estado": "Activo"}, 201),
+    escribir('equipos: editar', 'PUT', lambda c, a: f'/equipos/{_equipo(c, a)}',
+             lambda c, a: {"estado": a.choice(["Activo", "Inactivo", "En mantenimiento"])}),
+    escribir('equipos: importar csv (100)', 'POST', '/equipos/importar', _csv_equipos),
+    escribir('mantenimientos: crear', 'POST', '/mantenimientos',
+             lambda c, a: {"equipo_id": _equipo(c, a), "tipo": "Preventivo", "fecha": c.fecha(a)}, 201),
+    escribir('mantenimientos: editar', 'PUT', lambda c, a: f'/mantenimientos/{_mantenimiento(c, a)}',
+             lambda c, a: {"fecha": c.fecha(a)}),
+    escribir('mantenimientos: lote (50)', 'POST', '/mantenimientos/lote', lambda c, a: [
+        {"equipo_id": _equipo(c, a), "tipo": "Correctivo", "fecha": c.fecha(a)} for _ in range(50)], 201),
+    escribir('mantenimientos: importar csv (100)', 'POST', '/mantenimientos/importar', _csv_mantenimientos),
+    escribir('mantenimientos: borrar', 'DELETE', lambda c, a: f'/mantenimientos/{c.borrar_mantenimiento()}', None),
+    escribir('mantenimientos: borrar por equipo', 'POST', '/mantenimientos/eliminar',
+             lambda c, a: {"equipo_id": c.borrar_equipo()}),
+    escribir('equipos: borrar', 'DELETE', lambda c, a: f'/equipos/{c.borrar_equipo()}', None),
+    escribir('equipos: borrar varios (20)', 'POST', '/equipos/eliminar',
+             lambda c, a: {"ids": [c.borrar_equipo() for _ in range(20)]}),
+]
+
+
+def _peticion(cliente, caso, ctx, azar):
+    ruta = caso.ruta(ctx, azar)
+    cuerpo = caso.cuerpo(ctx, azar) if caso.cuerpo else None
+    opciones = {"headers": caso.cabeceras}
+    if isinstance(cuerpo, bytes):
+        opciones.update(data=cuerpo, content_type='text/csv')
+    elif cuerpo is not None:
+        opciones["json"] = cuerpo
+    return lambda: cliente.open(ruta, method=caso.metodo, **opciones)
+
+
+def _ejecutar(enviar, caso):
+    respuesta = enviar()
+    respuesta.get_data()  # consumir el cuerpo (las rutas NDJSON generan al leer)
+    if respuesta.status_code != caso.esperado:
+        raise AssertionError(f"{caso.nombre}: {respuesta.status_code} (se esperaba {caso.esperado})")
+
+
+def calibrar():
+    """Tiempo (ms) de una carga fija de CPU parecida al trabajo de una petición.
+
+    Se mide junto a cada ruta y se guarda con sus resultados: al comparar,
+    el tiempo de la base se escala por la relación entre calibraciones, así
+    una máquina (o un momento) más lento no se confunde con una regresión.
+    """
+    filas = [{"id": i, "nombre": f"Equipo {i}", "fecha": date(2024, 1, 1) + timedelta(days=i % 365)}
+             for i in range(2000)]
+    tiempos = []
+    for _ in range(REPETICIONES_CALIBRACION):
+        inicio = time.perf_counter()
+        json.dumps(sorted(filas, key=lambda f: (f["fecha"], -f["id"])), default=str)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def medir(cliente, caso, ctx, repeticiones):
+    # Semilla por caso: la secuencia de ids no depende de qué otros casos corren
+    azar = random.Random(caso.nombre)
+    for _ in range(CALENTAMIENTO):
+        _ejecutar(_peticion(cliente, caso, ctx, azar), caso)
+
+    # Una corrida instrumentada (consultas y pico de memoria) aparte de las
+    # cronometradas: el rastreo de memoria multiplica el tiempo
+    enviar = _peticion(cliente, caso, ctx, azar)
+    tracemalloc.start()
+    try:
+        with contar_consultas(db.engine) as contador:
+            _ejecutar(enviar, caso)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    referencia = calibrar()
+    tiempos = []
+    for _ in range(repeticiones):
+        enviar = _peticion(cliente, caso, ctx, azar)
+        inicio = time.perf_counter()
+        _ejecutar(enviar, caso)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    return {
+        "p50_ms": round(statistics.median(tiempos), 3),
+        "p95_ms": round(percentil(tiempos, 95), 3),
+        "media_ms": round(statistics.fmean(tiempos), 3),
+        "consultas": contador.total,
+        "memoria_kb": round(pico / 1024, 1),
+        "referencia_ms": round(referencia, 3),
+    }
+
+
+def _escala(actual, anterior):
+    if anterior.get("referencia_ms") and actual.get("referencia_ms"):
+        return actual["referencia_ms"] / anterior["referencia_ms"]
+    return 1.0
+
+
+def _lento(actual, anterior, tolerancia):
+    return _empeoro(actual["p50_ms"], anterior["p50_ms"] * _escala(actual, anterior), tolerancia, MINIMO_MS)
+
+
+def medir_confirmando(cliente, caso, ctx, repeticiones, anterior, tolerancia):
+    """Mide el caso; si parece más lento que ``anterior`` lo vuelve a medir.
+
+    En máquinas compartidas una ráfaga de otro proceso duplica un p50: una
+    regresión real se repite en cada medición, el ruido no. Se queda la
+    medición con menor p50.
+    """
+    resultado = medir(cliente, caso, ctx, repeticiones)
+    for _ in range(REINTENTOS):
+        if anterior is None or not _lento(resultado, anterior, tolerancia):
+            break
+        otro = medir(cliente, caso, ctx, repeticiones)
+        if otro["p50_ms"] / _escala(otro, anterior) < resultado["p50_ms"] / _escala(resultado, anterior):
+            resultado = otro
+    return resultado
+
+
+def correr_tamano(equipos, mantenimientos, repeticiones, semilla, uri, base=None, tolerancia=TOLERANCIA):
+    base = base or {}
+    temporal = None
+    if uri is None:
+        descriptor, temporal = tempfile.mkstemp(suffix='.db')
+        os.close(descriptor)
+        uri = f"sqlite:///{temporal}"
+    try:
+        # Sin caché del dashboard: cada petición mide el cálculo completo
+        app = crear_app_benchmark(uri, DASHBOARD_CACHE_TTL=0, IMAGENES_HILOS=0)
+        hoy = date.today()
+        with app.app_context():
+            inicio = time.perf_counter()
+            total_mantenimientos = generar_flota(equipos, mantenimientos, semilla, hoy)
+            siembra = time.perf_counter() - inicio
+
+            ctx = Contexto(equipos, total_mantenimientos, hoy)
+            cliente = app.test_client()
+            rutas = {}
+            for caso in CASOS:
+                rutas[caso.nombre] = medir_confirmando(cliente, caso, ctx, repeticiones,
+                                                       base.get("rutas", {}).get(caso.nombre), tolerancia)
+                print(f"  {caso.nombre:42} {rutas[caso.nombre]['p50_ms']:9.2f} ms", file=sys.stderr)
+            db.session.remove()
+            db.engine.dispose()
+        return {"mantenimientos": total_mantenimientos, "siembra_s": round(siembra, 2), "rutas": rutas}
+    finally:
+        if temporal:
+            os.unlink(temporal)
+
+
+# ============================================================
+# 📏 Comparación con la línea base
+# ============================================================
+def _empeoro(actual, base, tolerancia, minimo):
+    return actual > base * (1 + tolerancia) and actual - base > minimo
+
+
+def comparar(resultados, base, tolerancia):
+    """Imprime la tabla actual vs. base y devuelve la lista de regresiones."""
+    regresiones = []
+    for tamano, datos in resultados["tamanos"].items():
+        rutas_base = base.get("tamanos", {}).get(tamano, {}).get("rutas", {})
+        print(f"\n== {tamano} ({datos['mantenimientos']} mantenimientos, siembra {datos['siembra_s']} s)")
+        print(f"{'ruta':42} {'p50 ms':>9} {'base':>9} {'consultas':>10} {'memoria KB':>11}  estado")
+        for nombre, actual in datos["rutas"].items():
+            anterior = rutas_base.get(nombre)
+            if anterior is None:
+                estado, base_ms = "nuevo", "-"
+            else:
+                problemas = []
+                if actual["consultas"] > anterior["consultas"]:
+                    problemas.append(f"consultas {anterior['consultas']}→{actual['consultas']}")
+                # Base expresada en la velocidad de esta máquina (ver calibrar)
+                base_p50 = round(anterior["p50_ms"] * _escala(actual, anterior), 3)
+                if _empeoro(actual["p50_ms"], base_p50, tolerancia, MINIMO_MS):
+                    problemas.append(f"p50 {base_p50}→{actual['p50_ms']} ms")
+                if _empeoro(actual["memoria_kb"], anterior["memoria_kb"], tolerancia, MINIMO_MEMORIA_KB):
+                    problemas.append(f"memoria {anterior['memoria_kb']}→{actual['memoria_kb']} KB")
+                regresiones += [f"{tamano} {nombre}: {p}" for p in problemas]
+                estado, base_ms = ("PEOR" if problemas else "OK"), f"{base_p50:.2f}"
+            print(f"{nombre:42} {actual['p50_ms']:9.2f} {base_ms:>9} {actual['consultas']:10} "
+                  f"{actual['memoria_kb']:11.1f}  {estado}")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanos', default=TAMANOS,
+                        help="equipos x mantenimientos por equipo, separados por coma (%(default)s)")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--uri', help="base a usar (se borra y se recrea); por defecto SQLite temporal")
+    parser.add_argument('--base', default=BASE, help="resultados contra los que comparar (%(default)s)")
+    parser.add_argument('--salida', help="guardar los resultados de esta corrida en un JSON")
+    parser.add_argument('--guardar', action='store_true', help="reescribir la línea base con esta corrida")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    args = parser.parse_args(argv)
+
+    resultados = {
+        "entorno": {
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "motor": (args.uri or "sqlite").split(':')[0],
+            "maquina": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "semilla": args.semilla,
+        "repeticiones": args.repeticiones,
+        "tamanos": {},
+    }
+    base = {}
+    if os.path.exists(args.base) and not args.guardar:
+        with open(args.base, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+
+    for tamano in args.tamanos.split(','):
+        equipos, mantenimientos = (int(n) for n in tamano.lower().split('x'))
+        print(f"{tamano}...", file=sys.stderr)
+        resultados["tamanos"][tamano] = correr_tamano(equipos, mantenimientos, args.repeticiones, args.semilla,
+                                                      args.uri, base.get("tamanos", {}).get(tamano), args.tolerancia)
+
+    regresiones = comparar(resultados, base, args.tolerancia)
+
+    for destino in filter(None, [args.salida, args.base if args.guardar else None]):
+        with open(destino, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+            archivo.write('\n')
+        print(f"\nResultados guardados en {destino}")
+
+    if regresiones:
+        print("\nRegresiones:\n  " + "\n  ".join(regresiones))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Escrituras concurrentes: contador de versión en una sola fila vs. repartido.
+
+Cada commit que toca una tabla incrementa su contador de versión
+(app/versiones.py) y la fila queda bloqueada hasta el commit. Con
+VERSIONES_FRAGMENTOS=1 todos los que escriben se turnan en esa fila; con
+varios fragmentos cada commit toma uno al azar.
+
+Uso:  python -m benchmarks.versiones_concurrentes uri [hilos] [commits_por_hilo]
+
+Requiere PostgreSQL (base desechable: se borra y se recrea); en SQLite las
+escrituras ya se serializan por archivo y no hay nada que comparar.
+"""
+import sys
+import threading
+import time
+
+from sqlalchemy import update
+
+from app.cambios import marcar_cambio
+from app.database import db
+from app.models import Equipo
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def escrituras_concurrentes(app, hilos, por_hilo):
+    """Cada hilo edita su propio equipo ``por_hilo`` veces, un commit por vez."""
+    def escribir(equipo_id):
+        with app.app_context():
+            for n in range(por_hilo):
+                db.session.execute(update(Equipo).where(Equipo.id == equipo_id).values(modelo=f"M{n}"))
+                marcar_cambio('equipos', 'editar', equipo_id)
+                db.session.commit()
+
+    trabajadores = [threading.Thread(target=escribir, args=(i,)) for i in range(1, hilos + 1)]
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    return time.perf_counter() - inicio
+
+
+def main(uri, hilos=16, por_hilo=200):
+    total = hilos * por_hilo
+    for fragmentos in (1, 16):
+        app = crear_app_benchmark(uri, VERSIONES_FRAGMENTOS=fragmentos,
+                                  SQLALCHEMY_ENGINE_OPTIONS={"pool_size": hilos})
+        with app.app_context():
+            sembrar(hilos, 0)
+        duracion = escrituras_concurrentes(app, hilos, por_hilo)
+        with app.app_context():
+            version = db.session.execute(db.text(
+                "SELECT SUM(valor) FROM contadores WHERE nombre LIKE 'version:equipos%'")).scalar()
+            db.engine.dispose()
+        print(f"{fragmentos:>2} fragmento(s): {total} commits en {duracion:.2f}s "
+              f"({total / duracion:.0f}/s), versión de equipos {version}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(sys.argv[1], *(int(a) for a in sys.argv[2:4]))
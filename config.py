@@ -1,14 +1,114 @@
 import os
 
+
+def _entero(nombre, defecto):
+    return int(os.environ.get(nombre, defecto))
+
+
+def _booleano(nombre, defecto):
+    return os.environ.get(nombre, str(defecto)).lower() in ('1', 'true', 'si', 'sí', 'yes')
+
+
 class Config:
-    # Configuración de la base de datos
-    DB_NAME = "buceo_db"
-    DB_USER = "postgres"
-    DB_PASSWORD = "UTP123" 
-    DB_HOST = "localhost"
-    DB_PORT = "5432"
-
-    SQLALCHEMY_DATABASE_URI = (
+    # Configuración de la base de datos (se puede sobrescribir con variables de entorno)
+    DB_NAME = os.environ.get("DB_NAME", "buceo_db")
+    DB_USER = os.environ.get("DB_USER", "postgres")
+    DB_PASSWORD = os.environ.get("DB_PASSWORD", "UTP123")
+    DB_HOST = os.environ.get("DB_HOST", "localhost")
+    DB_PORT = os.environ.get("DB_PORT", "5432")
+
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "DATABASE_URL",
         f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Pool de conexiones por proceso. Con gunicorn el total de conexiones
+    # es workers × (pool_size + max_overflow): debe caber en max_connections
+    # de PostgreSQL. pool_size ≈ hilos por worker suele ser suficiente.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": _entero("DB_POOL_SIZE", 5),
+        "max_overflow": _entero("DB_MAX_OVERFLOW", 5),
+        "pool_timeout": _entero("DB_POOL_TIMEOUT", 10),
+        "pool_recycle": _entero("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _booleano("DB_POOL_PRE_PING", True),
+    }
+
+    # Réplica de lectura (opcional): las peticiones GET leen de ella y las
+    # escrituras van a la primaria. Un cliente que acaba de escribir lee de
+    # la primaria durante REPLICA_PEGAJOSA_SEGUNDOS (debe superar el retraso
+    # de replicación). El pool de la réplica usa las mismas opciones.
+    REPLICA_DATABASE_URI = os.environ.get("REPLICA_DATABASE_URL")
+    REPLICA_PEGAJOSA_SEGUNDOS = _entero("REPLICA_PEGAJOSA_SEGUNDOS", 5)
+
+    # Dashboard asíncrono (asgi.py): por defecto la misma base con el driver
+    # asíncrono (postgresql+asyncpg, sqlite+aiosqlite)
+    SQLALCHEMY_ASYNC_DATABASE_URI = os.environ.get("ASYNC_DATABASE_URL")
+
+    # Serializar respuestas con orjson si está instalado
+    JSON_RAPIDO = True
+
+    # Cache-Control de las lecturas con ETag: con 0 el navegador revalida
+    # cada vez (If-None-Match → 304); con N > 0 reutiliza N segundos sin preguntar
+    HTTP_MAX_AGE = _entero("HTTP_MAX_AGE", 0)
+    # Respuestas más grandes que esto (bytes) se comprimen con gzip;
+    # un valor negativo desactiva la compresión
+    COMPRESION_MINIMA = _entero("COMPRESION_MINIMA", 1024)
+    COMPRESION_NIVEL = 6
+
+    # Segundos que se reutilizan los resúmenes del dashboard
+    DASHBOARD_CACHE_TTL = 30
+
+    # Caché del detalle de equipos: entradas por proceso (0 la desactiva) y
+    # segundos de vida. Con EQUIPOS_CACHE_URL (redis://...) se comparte
+    # entre workers; requiere el paquete redis. Recomendada con más de un
+    # worker: la local se vacía con cada escritura de otro worker
+    EQUIPOS_CACHE_TAMANO = _entero("EQUIPOS_CACHE_TAMANO", 10000)
+    EQUIPOS_CACHE_TTL = _entero("EQUIPOS_CACHE_TTL", 300)
+    EQUIPOS_CACHE_URL = os.environ.get("EQUIPOS_CACHE_URL")
+
+    # Formato de los códigos de equipo generados ("{n}" → 1, 2, 3...;
+    # "EQ-{n:05d}" → EQ-00001). También acepta una función numero → str.
+    EQUIPO_CODIGO_FORMATO = "{n}"
+    # Números que cada proceso reserva de una vez cuando no hay secuencias
+    EQUIPO_CODIGO_BLOQUE = 20
+
+    # Imágenes de equipos: se guardan con el hash del contenido como nombre
+    # (nunca cambian, se sirven con caché de un año). IMAGENES_DIR puede ser
+    # un bucket montado e IMAGENES_URL la URL pública (CDN) que lo sirve.
+    IMAGENES_DIR = os.environ.get("IMAGENES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "imagenes"))
+    IMAGENES_URL = os.environ.get("IMAGENES_URL", "/imagenes")
+    IMAGENES_TAMANO_MAXIMO = _entero("IMAGENES_TAMANO_MAXIMO", 20 * 1024 * 1024)
+    IMAGENES_MAX_AGE = 365 * 24 * 3600
+    # Variantes (lado mayor en píxeles), generadas con Pillow si está instalado
+    IMAGENES_VARIANTES = {"miniatura": 256, "mediana": 1024}
+    # Hilos que generan las variantes (0: dentro de la misma petición)
+    IMAGENES_HILOS = _entero("IMAGENES_HILOS", 2)
+
+    # Flujo de cambios en /eventos (Server-Sent Events)
+    EVENTOS_HISTORIAL = 1000   # eventos guardados para reanudar con Last-Event-ID
+    EVENTOS_COLA = 256         # eventos pendientes por cliente antes de cortarlo
+    EVENTOS_HEARTBEAT = 15     # segundos entre comentarios ": ping"
+    EVENTOS_INTERVALO = 2      # cada cuántos segundos se revisan cambios de otros procesos
+
+    # Años de mantenimientos que quedan en la tabla de trabajo (el actual y
+    # los N anteriores); "flask archivar-mantenimientos" archiva el resto
+    MANTENIMIENTOS_ANIOS_ACTIVOS = _entero("MANTENIMIENTOS_ANIOS_ACTIVOS", 2)
+
+    # Filas en que se reparte el contador de versión de cada tabla (ETag):
+    # con una sola, todas las escrituras a la tabla se turnan para
+    # incrementarla hasta el commit
+    VERSIONES_FRAGMENTOS = _entero("VERSIONES_FRAGMENTOS", 16)
+
+    # Cada cuántos segundos se recarga la agenda de próximos mantenimientos
+    # (0 desactiva el hilo; la agenda igual se actualiza con cada escritura)
+    AGENDA_INTERVALO = 300
+
+    # Métricas en /metrics y cabecera Server-Timing
+    METRICAS_ACTIVAS = True
+    # /metrics y /metrics/consultas-lentas solo se exponen con un token
+    # (Authorization: Bearer <token>); sin él no existen
+    METRICAS_TOKEN = os.environ.get("METRICAS_TOKEN")
+    # Sentencias SQL más lentas que esto se guardan como muestra
+    METRICAS_CONSULTA_LENTA_MS = 200
+    METRICAS_MUESTRAS_LENTAS = 50
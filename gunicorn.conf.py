@@ -0,0 +1,47 @@
+import multiprocessing
+import os
+
+# ============================================================
+# ⚙️ Configuración de gunicorn (gunicorn -c gunicorn.conf.py wsgi:app)
+# ============================================================
+# Workers con hilos (gthread): cada proceso atiende varias peticiones a
+# la vez mientras esperan a la base de datos. Ajustar DB_POOL_SIZE al
+# número de hilos para que ningún hilo espere por una conexión.
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar workers de vez en cuando evita que la memoria crezca sin control
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    # La caché local de detalle se vacía entera con cada escritura de otro
+    # worker; con varios workers conviene la compartida (app/cache_equipos.py)
+    from config import Config
+    if server.cfg.workers > 1 and Config.EQUIPOS_CACHE_TAMANO > 0 and not Config.EQUIPOS_CACHE_URL:
+        server.log.warning("%d workers con caché de equipos local: defina EQUIPOS_CACHE_URL (redis://...) "
+                           "para que una escritura no vacíe la caché de los demás", server.cfg.workers)
+
+
+def post_fork(server, worker):
+    # Con --preload cada worker debe abrir sus propias conexiones: las
+    # heredadas del proceso padre no se pueden compartir entre procesos.
+    if not server.cfg.preload_app:
+        return
+    from wsgi import app
+    from app.database import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+        if 'replica' in app.extensions:
+            app.extensions['replica'].dispose(close=False)
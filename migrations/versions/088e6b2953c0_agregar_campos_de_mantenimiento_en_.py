@@ -1,7 +1,7 @@
 """Agregar campos de mantenimiento en equipos
 
 Revision ID: 088e6b2953c0
-Revises: 
+Revises: 0b1e7c3a9f52
 Create Date: 2025-11-01 13:20:11.326071
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = '088e6b2953c0'
-down_revision = None
+down_revision = '0b1e7c3a9f52'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,53 @@
+"""Tablas iniciales de equipos y mantenimientos
+
+Revision ID: 0b1e7c3a9f52
+Revises: 
+Create Date: 2025-10-25 10:02:47.513208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b1e7c3a9f52'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Las bases que ya existían se crearon con db.create_all() (run.py) y
+# quedaron marcadas en 088e6b2953c0: para ellas esta revisión ya está
+# aplicada. Las nuevas parten de aquí con "flask db upgrade".
+
+
+def upgrade():
+    op.create_table(
+        'equipos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('codigo', sa.String(length=50), nullable=False),
+        sa.Column('nombre', sa.String(length=100), nullable=False),
+        sa.Column('marca', sa.String(length=50), nullable=True),
+        sa.Column('modelo', sa.String(length=50), nullable=True),
+        sa.Column('fecha_compra', sa.Date(), nullable=True),
+        sa.Column('periodo_mantenimiento', sa.Integer(), nullable=True),
+        sa.Column('imagen_url', sa.String(length=255), nullable=True),
+        sa.Column('estado', sa.String(length=50), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('codigo')
+    )
+    op.create_table(
+        'mantenimientos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=100), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('agente', sa.String(length=100), nullable=True),
+        sa.Column('descripcion', sa.String(length=200), nullable=True),
+        sa.Column('equipo_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['equipo_id'], ['equipos.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('mantenimientos')
+    op.drop_table('equipos')
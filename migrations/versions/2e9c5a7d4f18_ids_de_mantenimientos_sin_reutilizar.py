@@ -0,0 +1,40 @@
+"""Ids de mantenimientos sin reutilizar en SQLite (AUTOINCREMENT)
+
+Revision ID: 2e9c5a7d4f18
+Revises: 7a4c2e9b1d35
+Create Date: 2026-10-18 21:40:05.902716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e9c5a7d4f18'
+down_revision = '7a4c2e9b1d35'
+branch_labels = None
+depends_on = None
+
+
+# Sin AUTOINCREMENT, SQLite da a la fila nueva el mayor rowid + 1: si los
+# mantenimientos de id más alto se archivaron, ese id vuelve a usarse y
+# choca con el archivo. PostgreSQL usa una secuencia y no lo necesita.
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('mantenimientos', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        pass
+    # El contador arranca después del mayor id emitido, también los archivados
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'mantenimientos'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'mantenimientos', COALESCE(MAX(id), 0) FROM ("
+        "SELECT id FROM mantenimientos UNION ALL SELECT id FROM mantenimientos_archivo)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('mantenimientos', recreate='always') as batch_op:
+        pass
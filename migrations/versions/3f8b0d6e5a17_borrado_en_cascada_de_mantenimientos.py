@@ -0,0 +1,43 @@
+"""Borrado en cascada de mantenimientos
+
+Revision ID: 3f8b0d6e5a17
+Revises: e7a2c9d14b63
+Create Date: 2026-10-18 13:48:37.215094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8b0d6e5a17'
+down_revision = 'e7a2c9d14b63'
+branch_labels = None
+depends_on = None
+
+FK = 'mantenimientos_equipo_id_fkey'
+# Nombre para la clave foránea si la base la creó sin nombre (SQLite)
+CONVENCION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _nombre_actual():
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys('mantenimientos'):
+        if fk['referred_table'] == 'equipos' and fk['constrained_columns'] == ['equipo_id']:
+            return fk['name'] or FK
+    return None
+
+
+def _recrear(ondelete):
+    nombre = _nombre_actual()
+    with op.batch_alter_table('mantenimientos', schema=None, naming_convention=CONVENCION) as batch_op:
+        if nombre:
+            batch_op.drop_constraint(nombre, type_='foreignkey')
+        batch_op.create_foreign_key(FK, 'equipos', ['equipo_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _recrear('CASCADE')
+
+
+def downgrade():
+    _recrear(None)
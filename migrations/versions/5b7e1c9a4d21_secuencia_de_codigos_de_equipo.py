@@ -0,0 +1,47 @@
+"""Secuencia de códigos de equipo
+
+Revision ID: 5b7e1c9a4d21
+Revises: 088e6b2953c0
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e1c9a4d21'
+down_revision = '088e6b2953c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'contadores',
+        sa.Column('nombre', sa.String(length=50), nullable=False),
+        sa.Column('valor', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('nombre')
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # La secuencia continúa desde el mayor código numérico existente
+        op.execute(sa.schema.CreateSequence(sa.Sequence('equipos_codigo_seq')))
+        op.execute(
+            "SELECT setval('equipos_codigo_seq', "
+            "COALESCE((SELECT MAX(codigo::bigint) FROM equipos WHERE codigo ~ '^[0-9]+$'), 0) + 1, false)"
+        )
+    else:
+        op.execute(
+            "INSERT INTO contadores (nombre, valor) "
+            "SELECT 'equipos', COALESCE(MAX(CAST(codigo AS INTEGER)), 0) FROM equipos "
+            "WHERE codigo <> '' AND codigo NOT GLOB '*[^0-9]*'"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(sa.schema.DropSequence(sa.Sequence('equipos_codigo_seq')))
+    op.drop_table('contadores')
@@ -0,0 +1,75 @@
+"""Búsqueda de texto y orden del listado de equipos
+
+Revision ID: 6c1d4e8f9a02
+Revises: 3f8b0d6e5a17
+Create Date: 2026-10-18 14:35:52.661390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1d4e8f9a02'
+down_revision = '3f8b0d6e5a17'
+branch_labels = None
+depends_on = None
+
+INDICES = {
+    'ix_equipos_nombre_id': ['nombre', 'id'],
+    'ix_equipos_marca_id': ['marca', 'id'],
+    'ix_equipos_modelo_id': ['modelo', 'id'],
+    'ix_equipos_fecha_compra_id': ['fecha_compra', 'id'],
+}
+
+# Mismas sentencias que app/busqueda.py (crear pg_trgm requiere permisos
+# sobre la base; en SQLite se usa FTS5 con tokenizador trigram)
+DDL_POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_equipos_busqueda_trgm ON equipos "
+    "USING gin (nombre gin_trgm_ops, marca gin_trgm_ops, modelo gin_trgm_ops)",
+]
+
+DDL_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS equipos_busqueda USING fts5("
+    "nombre, marca, modelo, content='equipos', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS equipos_busqueda_ai AFTER INSERT ON equipos BEGIN "
+    "INSERT INTO equipos_busqueda(rowid, nombre, marca, modelo) VALUES (new.id, new.nombre, new.marca, new.modelo); END",
+    "CREATE TRIGGER IF NOT EXISTS equipos_busqueda_ad AFTER DELETE ON equipos BEGIN "
+    "INSERT INTO equipos_busqueda(equipos_busqueda, rowid, nombre, marca, modelo) "
+    "VALUES ('delete', old.id, old.nombre, old.marca, old.modelo); END",
+    "CREATE TRIGGER IF NOT EXISTS equipos_busqueda_au AFTER UPDATE OF nombre, marca, modelo ON equipos BEGIN "
+    "INSERT INTO equipos_busqueda(equipos_busqueda, rowid, nombre, marca, modelo) "
+    "VALUES ('delete', old.id, old.nombre, old.marca, old.modelo); "
+    "INSERT INTO equipos_busqueda(rowid, nombre, marca, modelo) VALUES (new.id, new.nombre, new.marca, new.modelo); END",
+]
+
+
+def upgrade():
+    with op.batch_alter_table('equipos', schema=None) as batch_op:
+        for nombre, columnas in INDICES.items():
+            batch_op.create_index(nombre, columnas, unique=False)
+
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'postgresql':
+        for sentencia in DDL_POSTGRESQL:
+            op.execute(sentencia)
+    elif dialecto == 'sqlite':
+        for sentencia in DDL_SQLITE:
+            op.execute(sentencia)
+        # Indexar los equipos que ya existían
+        op.execute("INSERT INTO equipos_busqueda(equipos_busqueda) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialecto = op.get_bind().dialect.name
+    if dialecto == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_equipos_busqueda_trgm")
+    elif dialecto == 'sqlite':
+        for trigger in ('equipos_busqueda_ai', 'equipos_busqueda_ad', 'equipos_busqueda_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS equipos_busqueda")
+
+    with op.batch_alter_table('equipos', schema=None) as batch_op:
+        for nombre in reversed(list(INDICES)):
+            batch_op.drop_index(nombre)
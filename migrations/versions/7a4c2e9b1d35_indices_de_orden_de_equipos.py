@@ -0,0 +1,38 @@
+"""Índices (columna, id) para el resto de los órdenes del listado de equipos
+
+Revision ID: 7a4c2e9b1d35
+Revises: d5f2b7a9c316
+Create Date: 2026-10-18 21:12:40.318254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4c2e9b1d35'
+down_revision = 'd5f2b7a9c316'
+branch_labels = None
+depends_on = None
+
+INDICES = {
+    'ix_equipos_codigo_id': ['codigo', 'id'],
+    'ix_equipos_ultimo_mantenimiento_id': ['ultimo_mantenimiento', 'id'],
+}
+
+
+def upgrade():
+    with op.batch_alter_table('equipos', schema=None) as batch_op:
+        for nombre, columnas in INDICES.items():
+            batch_op.create_index(nombre, columnas, unique=False)
+        # (estado, id) reemplaza a (estado): sirve igual para contar por estado
+        batch_op.create_index('ix_equipos_estado_id', ['estado', 'id'], unique=False)
+        batch_op.drop_index('ix_equipos_estado')
+
+
+def downgrade():
+    with op.batch_alter_table('equipos', schema=None) as batch_op:
+        batch_op.create_index('ix_equipos_estado', ['estado'], unique=False)
+        batch_op.drop_index('ix_equipos_estado_id')
+        for nombre in reversed(list(INDICES)):
+            batch_op.drop_index(nombre)
@@ -0,0 +1,41 @@
+"""Índices para consultas frecuentes
+
+Revision ID: 9d3f6a2b8e47
+Revises: 5b7e1c9a4d21
+Create Date: 2026-10-18 10:03:11.540972
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3f6a2b8e47'
+down_revision = '5b7e1c9a4d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('mantenimientos', schema=None) as batch_op:
+        batch_op.create_index('ix_mantenimientos_equipo_fecha', ['equipo_id', 'fecha'], unique=False)
+        batch_op.create_index('ix_mantenimientos_fecha_id', ['fecha', 'id'], unique=False)
+
+    with op.batch_alter_table('equipos', schema=None) as batch_op:
+        batch_op.create_index('ix_equipos_estado', ['estado'], unique=False)
+        batch_op.create_index('ix_equipos_proximo_mantenimiento', ['proximo_mantenimiento', 'id'], unique=False)
+
+    # Índice de expresión para comparaciones sin distinguir mayúsculas
+    op.create_index('ix_equipos_estado_lower', 'equipos', [sa.text('lower(estado)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_equipos_estado_lower', table_name='equipos')
+
+    with op.batch_alter_table('equipos', schema=None) as batch_op:
+        batch_op.drop_index('ix_equipos_proximo_mantenimiento')
+        batch_op.drop_index('ix_equipos_estado')
+
+    with op.batch_alter_table('mantenimientos', schema=None) as batch_op:
+        batch_op.drop_index('ix_mantenimientos_fecha_id')
+        batch_op.drop_index('ix_mantenimientos_equipo_fecha')
@@ -0,0 +1,27 @@
+"""Variantes de la imagen de cada equipo
+
+Revision ID: a8d35c7e1f64
+Revises: 6c1d4e8f9a02
+Create Date: 2026-10-18 16:02:11.384615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d35c7e1f64'
+down_revision = '6c1d4e8f9a02'
+branch_labels = None
+depends_on = None
+
+
+# ALTER TABLE directo (sin batch): en SQLite el batch recrea la tabla y se
+# perderían los triggers de búsqueda de equipos_busqueda (DROP COLUMN
+# requiere SQLite 3.35+)
+def upgrade():
+    op.add_column('equipos', sa.Column('imagen_variantes', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('equipos', 'imagen_variantes')
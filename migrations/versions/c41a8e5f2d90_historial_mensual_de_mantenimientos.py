@@ -0,0 +1,43 @@
+"""Historial mensual de mantenimientos
+
+Revision ID: c41a8e5f2d90
+Revises: 9d3f6a2b8e47
+Create Date: 2026-10-18 11:26:54.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41a8e5f2d90'
+down_revision = '9d3f6a2b8e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'mantenimientos_mensuales',
+        sa.Column('mes', sa.String(length=7), nullable=False),
+        sa.Column('equipo_id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=100), nullable=False),
+        sa.Column('cantidad', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('mes', 'equipo_id', 'tipo')
+    )
+
+    # Carga inicial desde los mantenimientos existentes
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        mes = "to_char(fecha, 'YYYY-MM')"
+    else:
+        mes = "strftime('%Y-%m', fecha)"
+    op.execute(
+        "INSERT INTO mantenimientos_mensuales (mes, equipo_id, tipo, cantidad) "
+        f"SELECT {mes}, equipo_id, tipo, COUNT(*) FROM mantenimientos "
+        f"GROUP BY {mes}, equipo_id, tipo"
+    )
+
+
+def downgrade():
+    op.drop_table('mantenimientos_mensuales')
@@ -0,0 +1,106 @@
+"""Mantenimientos particionados por año y tabla de archivo
+
+Revision ID: d5f2b7a9c316
+Revises: a8d35c7e1f64
+Create Date: 2026-10-18 18:41:07.553120
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f2b7a9c316'
+down_revision = 'a8d35c7e1f64'
+branch_labels = None
+depends_on = None
+
+COLUMNAS = "id, tipo, fecha, agente, descripcion, equipo_id"
+# Años más viejos que esto (respecto del actual) van a la partición por
+# defecto: una fecha mal cargada (año 1900) no crea cien particiones
+ANIOS_MAXIMOS = 20
+
+
+def _crear_tabla(sufijo_particion):
+    op.execute(
+        "CREATE TABLE mantenimientos ("
+        " id integer NOT NULL DEFAULT nextval('mantenimientos_id_seq'),"
+        " tipo varchar(100) NOT NULL,"
+        " fecha date NOT NULL,"
+        " agente varchar(100),"
+        " descripcion varchar(200),"
+        " equipo_id integer NOT NULL"
+        f"){sufijo_particion}"
+    )
+
+
+def _reemplazar(tabla_vieja, clave_primaria, crear_particiones=None):
+    """Copia ``tabla_vieja`` en una mantenimientos nueva y la elimina.
+
+    Las restricciones e índices se crean después de copiar (y de borrar la
+    vieja, que todavía tiene esos nombres). La secuencia de ids pasa a la
+    tabla nueva para que no se borre con la vieja.
+    """
+    _crear_tabla(" PARTITION BY RANGE (fecha)" if crear_particiones else "")
+    if crear_particiones:
+        crear_particiones()
+    op.execute(f"INSERT INTO mantenimientos ({COLUMNAS}) SELECT {COLUMNAS} FROM {tabla_vieja}")
+    op.execute("ALTER SEQUENCE mantenimientos_id_seq OWNED BY mantenimientos.id")
+    op.execute(f"DROP TABLE {tabla_vieja}")
+    op.execute(f"ALTER TABLE mantenimientos ADD CONSTRAINT mantenimientos_pkey PRIMARY KEY ({clave_primaria})")
+    op.execute("ALTER TABLE mantenimientos ADD CONSTRAINT mantenimientos_equipo_id_fkey "
+               "FOREIGN KEY (equipo_id) REFERENCES equipos (id) ON DELETE CASCADE")
+    op.execute("CREATE INDEX ix_mantenimientos_equipo_fecha ON mantenimientos (equipo_id, fecha)")
+    op.execute("CREATE INDEX ix_mantenimientos_fecha_id ON mantenimientos (fecha, id)")
+
+
+def _particionar():
+    op.execute("ALTER TABLE mantenimientos RENAME TO mantenimientos_sin_particionar")
+    primera = op.get_bind().execute(sa.text("SELECT MIN(fecha) FROM mantenimientos_sin_particionar")).scalar()
+    actual = date.today().year
+    desde = max(min(primera.year if primera else actual, actual), actual - ANIOS_MAXIMOS)
+
+    def crear_particiones():
+        for anio in range(desde, actual + 2):
+            op.execute(f"CREATE TABLE mantenimientos_{anio} PARTITION OF mantenimientos "
+                       f"FOR VALUES FROM ('{anio}-01-01') TO ('{anio + 1}-01-01')")
+        op.execute("CREATE TABLE mantenimientos_default PARTITION OF mantenimientos DEFAULT")
+
+    # En una tabla particionada la clave primaria debe incluir la columna de partición
+    _reemplazar('mantenimientos_sin_particionar', 'id, fecha', crear_particiones)
+
+
+def _despartir():
+    op.execute("ALTER TABLE mantenimientos RENAME TO mantenimientos_particionada")
+    _reemplazar('mantenimientos_particionada', 'id')
+
+
+def upgrade():
+    op.create_table(
+        'mantenimientos_archivo',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('tipo', sa.String(length=100), nullable=False),
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('agente', sa.String(length=100), nullable=True),
+        sa.Column('descripcion', sa.String(length=200), nullable=True),
+        sa.Column('equipo_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['equipo_id'], ['equipos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_mantenimientos_archivo_equipo_fecha', 'mantenimientos_archivo', ['equipo_id', 'fecha'])
+
+    # Particiones nativas solo en PostgreSQL; los demás motores usan solo el archivo
+    if op.get_bind().dialect.name == 'postgresql':
+        _particionar()
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        _despartir()
+
+    # Lo archivado vuelve a la tabla de trabajo
+    op.execute(f"INSERT INTO mantenimientos ({COLUMNAS}) SELECT {COLUMNAS} FROM mantenimientos_archivo")
+    op.drop_index('ix_mantenimientos_archivo_equipo_fecha', table_name='mantenimientos_archivo')
+    op.drop_table('mantenimientos_archivo')
@@ -0,0 +1,31 @@
+"""Versiones por tabla para ETag
+
+Revision ID: e7a2c9d14b63
+Revises: c41a8e5f2d90
+Create Date: 2026-10-18 13:02:11.384526
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c9d14b63'
+down_revision = 'c41a8e5f2d90'
+branch_labels = None
+depends_on = None
+
+TABLAS = ('equipos', 'mantenimientos')
+
+
+def upgrade():
+    # Un contador "version:<tabla>" por tabla; las escrituras lo incrementan
+    contadores = sa.table('contadores', sa.column('nombre', sa.String), sa.column('valor', sa.BigInteger))
+    op.bulk_insert(contadores, [{'nombre': f'version:{t}', 'valor': 1} for t in TABLAS])
+
+
+def downgrade():
+    op.execute(
+        "DELETE FROM contadores WHERE nombre IN ("
+        + ", ".join(f"'version:{t}'" for t in TABLAS) + ")"
+    )
@@ -1,11 +1,17 @@
+import os
+
 from app import create_app
-from app.database import db
-from app.models import Equipo
 
+# Servidor de desarrollo. En producción usar wsgi.py con gunicorn:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# Las tablas se crean/actualizan con "flask db upgrade", no al arrancar.
 
 app = create_app()
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()  # 👈 crea las tablas en la base de datos
-    app.run(debug=True)
+    app.run(
+        host=os.environ.get('HOST', '127.0.0.1'),
+        port=int(os.environ.get('PORT', 5000)),
+        debug=os.environ.get('FLASK_DEBUG', '0') == '1',
+        threaded=True
+    )
@@ -0,0 +1,59 @@
+"""La agenda en memoria debe coincidir con la base."""
+import random
+from datetime import date, timedelta
+
+from app.agenda import obtener_agenda
+from app.database import db
+from benchmarks.agenda import escrituras, flota_con_fechas, fuerza_bruta
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def test_heap_coincide_con_fuerza_bruta():
+    azar = random.Random(42)
+    app = crear_app_benchmark()
+    with app.app_context(), app.test_request_context():
+        flota_con_fechas(azar, 2000)
+        agenda = obtener_agenda()
+        agenda.cargar()
+        for _ in range(20):
+            limite = escrituras(azar, 2000)
+            heap = [(fecha, equipo_id) for fecha, equipo_id, _, _ in agenda.hasta(limite)]
+            assert heap == fuerza_bruta(limite), limite
+
+
+def test_consulta_la_base_si_escribio_otro_proceso(tmp_path):
+    # Dos apps sobre la misma base: cada una con su agenda, como dos procesos
+    uri = f"sqlite:///{tmp_path / 'agenda.db'}"
+    app, otra = crear_app_benchmark(uri), crear_app_benchmark(uri)
+    with app.app_context():
+        sembrar(20, 0)
+        db.engine.dispose()
+    cliente = app.test_client()
+    assert cliente.get('/dashboard/proximos').get_json() == []
+
+    fecha = date.today() + timedelta(days=10)
+    respuesta = otra.test_client().post('/mantenimientos', json={
+        "equipo_id": 1, "tipo": "Preventivo", "fecha": fecha.isoformat()
+    })
+    assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+
+    proximos = cliente.get('/dashboard/proximos').get_json()
+    assert [(e["id"], e["proximo_mantenimiento"]) for e in proximos] == [(1, fecha.isoformat())]
+
+    # El heap no se recargó: queda atrasado hasta la próxima recarga completa
+    with app.app_context():
+        agenda = obtener_agenda()
+        assert agenda._ajena and 1 not in agenda._vigentes
+
+    # Una escritura propia sigue viéndose mientras tanto
+    otra_fecha = date.today() + timedelta(days=5)
+    assert cliente.post('/mantenimientos', json={
+        "equipo_id": 2, "tipo": "Preventivo", "fecha": otra_fecha.isoformat()
+    }).status_code == 201
+    proximos = cliente.get('/dashboard/proximos').get_json()
+    assert [e["id"] for e in proximos] == [2, 1]
+
+    with app.app_context():
+        agenda.cargar()
+        assert not agenda._ajena
+        assert [e[1] for e in agenda.hasta(date.today() + timedelta(days=30))] == [2, 1]
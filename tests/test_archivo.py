@@ -0,0 +1,28 @@
+"""Un mantenimiento nuevo nunca toma el id de uno archivado."""
+from app.archivo import archivar_anio
+from app.database import db
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def _registrar(cliente, fecha):
+    respuesta = cliente.post('/mantenimientos', json={"equipo_id": 1, "tipo": "Preventivo", "fecha": fecha})
+    assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+    return respuesta.get_json()["id"]
+
+
+def test_no_reutiliza_ids_archivados():
+    app = crear_app_benchmark()
+    cliente = app.test_client()
+    with app.app_context():
+        sembrar(1, 0)
+        _registrar(cliente, "2024-03-01")
+        # Los de id más alto son los del año que se archiva
+        archivados = [_registrar(cliente, "2019-03-01"), _registrar(cliente, "2019-04-01")]
+        assert archivar_anio(2019) == 2
+        db.session.commit()
+
+        nuevo = _registrar(cliente, "2024-05-01")
+        assert nuevo > max(archivados)
+        for id in archivados:
+            assert cliente.get(f'/mantenimientos/{id}').get_json()["archivado"] is True
+        assert cliente.get(f'/mantenimientos/{nuevo}').get_json()["fecha"] == "2024-05-01"
@@ -0,0 +1,55 @@
+"""Borrado masivo por ids o por filtro."""
+import pytest
+from sqlalchemy import func, select
+
+from app import borrado
+from app.database import db
+from app.models import Equipo, Mantenimiento, MantenimientoMensual
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+@pytest.fixture
+def app():
+    app = crear_app_benchmark()
+    with app.app_context():
+        sembrar(20, 3)
+    return app
+
+
+@pytest.mark.parametrize("ruta", ['/equipos/eliminar', '/mantenimientos/eliminar'])
+@pytest.mark.parametrize("cuerpo", [[1, 2], "1", {"ids": [True]}, {"ids": [1, "2"]}])
+def test_cuerpos_invalidos(app, ruta, cuerpo):
+    respuesta = app.test_client().post(ruta, json=cuerpo)
+    assert respuesta.status_code == 400, respuesta.get_data(as_text=True)
+
+
+def test_equipo_id_booleano(app):
+    respuesta = app.test_client().post('/mantenimientos/eliminar', json={"equipo_id": True})
+    assert respuesta.status_code == 400
+
+
+def test_equipos_por_ids(app):
+    respuesta = app.test_client().post('/equipos/eliminar', json={"ids": [1, 2, 99]})
+    assert respuesta.get_json()["ids"] == [1, 2]
+
+
+def test_equipos_por_filtro_sin_ids_si_son_muchos(app, monkeypatch):
+    monkeypatch.setattr(borrado, 'LIMITE_IDS', 5)
+    datos = app.test_client().post('/equipos/eliminar', json={"estado": "activo"}).get_json()
+    assert datos["eliminados"] == 16 and "ids" not in datos
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Equipo)) == 4
+
+
+def test_mantenimientos_por_filtro_ajustan_historial_y_fechas(app):
+    cliente = app.test_client()
+    datos = cliente.post('/mantenimientos/eliminar', json={"equipo_id": 1, "desde": "2020-01-15"}).get_json()
+    assert datos["eliminados"] == 2
+    with app.app_context():
+        assert db.session.scalars(select(Mantenimiento.fecha).where(Mantenimiento.equipo_id == 1)).all() \
+            == [db.session.get(Equipo, 1).ultimo_mantenimiento]
+        cantidades = db.session.execute(
+            select(MantenimientoMensual.equipo_id, func.sum(MantenimientoMensual.cantidad))
+            .group_by(MantenimientoMensual.equipo_id)
+        ).all()
+        assert dict(cantidades) == {1: 1, **{i: 3 for i in range(2, 21)}}
@@ -0,0 +1,63 @@
+"""Caché del detalle de equipos con varios procesos escribiendo.
+
+Dos apps sobre la misma base hacen de dos workers. La prueba con Redis
+necesita un servidor desechable (se vacía la base indicada):
+
+    PRUEBAS_REDIS_URL=redis://localhost:6379/15 python -m pytest tests/test_cache_equipos.py
+"""
+import os
+
+import pytest
+
+from app.cache import redis
+from app.cache_equipos import obtener_cache_equipos
+from app.database import db
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+REDIS_URL = os.environ.get('PRUEBAS_REDIS_URL')
+
+
+def _workers(tmp_path, **opciones):
+    uri = f"sqlite:///{tmp_path / 'cache.db'}"
+    app, otra = crear_app_benchmark(uri, **opciones), crear_app_benchmark(uri, **opciones)
+    with app.app_context():
+        sembrar(3, 0)
+        db.engine.dispose()
+    return app, otra
+
+
+def _leer_todos(cliente):
+    return [cliente.get(f'/equipos/{i}').get_json()["modelo"] for i in (1, 2, 3)]
+
+
+def test_backend_local_se_vacia_con_escrituras_ajenas(tmp_path):
+    app, otra = _workers(tmp_path)
+    cliente = app.test_client()
+    _leer_todos(cliente)
+
+    assert otra.test_client().put('/equipos/1', json={"modelo": "Nuevo"}).status_code == 200
+
+    # Correcto, pero la escritura de un solo equipo vació toda la caché local
+    assert _leer_todos(cliente) == ["Nuevo", "Modelo", "Modelo"]
+    with app.app_context():
+        estadisticas = obtener_cache_equipos().estadisticas()
+    assert estadisticas["vaciados"] == 1
+    assert estadisticas["aciertos"] == 0
+
+
+@pytest.mark.skipif(redis is None or not REDIS_URL, reason="requiere redis y PRUEBAS_REDIS_URL")
+def test_backend_redis_invalida_solo_lo_escrito(tmp_path):
+    redis.Redis.from_url(REDIS_URL).flushdb()
+    app, otra = _workers(tmp_path, EQUIPOS_CACHE_URL=REDIS_URL)
+    cliente, cliente_otra = app.test_client(), otra.test_client()
+    assert _leer_todos(cliente) == ["Modelo"] * 3
+    # El otro worker ya encuentra lo que guardó el primero
+    assert _leer_todos(cliente_otra) == ["Modelo"] * 3
+
+    assert cliente_otra.put('/equipos/1', json={"modelo": "Nuevo"}).status_code == 200
+
+    assert _leer_todos(cliente) == ["Nuevo", "Modelo", "Modelo"]
+    with app.app_context():
+        estadisticas = obtener_cache_equipos().estadisticas()
+    # 3 fallos de la primera lectura, 1 por el equipo escrito; el resto aciertos
+    assert (estadisticas["fallos"], estadisticas["aciertos"]) == (4, 2)
@@ -0,0 +1,21 @@
+"""Altas concurrentes de equipos: ni códigos repetidos ni 409/500."""
+import pytest
+
+from benchmarks.datos import crear_app_benchmark
+from benchmarks.estres_codigos import altas_concurrentes
+
+HILOS, POR_HILO = 4, 15
+
+
+@pytest.mark.parametrize("procesos", [1, 2])
+def test_altas_concurrentes_sin_codigos_repetidos(tmp_path, procesos):
+    uri = f"sqlite:///{tmp_path / 'codigos.db'}"
+    # Cada app tiene su engine y su bloque de códigos, como otro proceso
+    # (crearla recrea las tablas: todas antes de las altas)
+    apps = [crear_app_benchmark(uri) for _ in range(procesos)]
+
+    fallos, codigos = altas_concurrentes(apps, HILOS, POR_HILO)
+
+    assert fallos == []
+    assert len(codigos) == procesos * HILOS * POR_HILO
+    assert len(set(codigos)) == len(codigos)
@@ -0,0 +1,15 @@
+"""Las consultas SQL por endpoint no deben crecer con el número de filas."""
+import pytest
+
+from benchmarks.consultas_por_endpoint import ENDPOINTS, TAMANOS, contar
+
+
+@pytest.fixture(scope="module")
+def conteos():
+    return [contar(tamano) for tamano in TAMANOS]
+
+
+@pytest.mark.parametrize("url", ENDPOINTS)
+def test_consultas_no_crecen(conteos, url):
+    por_tamano = [c[url] for c in conteos]
+    assert len(set(por_tamano)) == 1, f"{url}: {por_tamano} consultas con {TAMANOS}"
@@ -0,0 +1,35 @@
+"""La tabla resumen mensual sigue a las escrituras de mantenimientos."""
+from sqlalchemy import select
+
+from app.database import db
+from app.models import MantenimientoMensual
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def _resumen():
+    return {
+        (f.mes, f.equipo_id, f.tipo): f.cantidad
+        for f in db.session.execute(select(MantenimientoMensual)).scalars()
+    }
+
+
+def test_borrar_y_editar_ajustan_solo_sus_claves():
+    app = crear_app_benchmark()
+    cliente = app.test_client()
+    with app.app_context():
+        sembrar(2, 0)
+        for equipo_id, fecha in [(1, "2024-05-01"), (1, "2024-05-20"), (2, "2024-05-01")]:
+            assert cliente.post('/mantenimientos', json={
+                "equipo_id": equipo_id, "tipo": "Preventivo", "fecha": fecha
+            }).status_code == 201
+        assert _resumen() == {("2024-05", 1, "Preventivo"): 2, ("2024-05", 2, "Preventivo"): 1}
+
+        assert cliente.delete('/mantenimientos/1').status_code == 200
+        assert _resumen() == {("2024-05", 1, "Preventivo"): 1, ("2024-05", 2, "Preventivo"): 1}
+
+        # Mover el último del mes deja la clave vieja en cero: se borra
+        assert cliente.put('/mantenimientos/3', json={"fecha": "2024-06-01"}).status_code == 200
+        assert _resumen() == {("2024-05", 1, "Preventivo"): 1, ("2024-06", 2, "Preventivo"): 1}
+
+        assert cliente.post('/mantenimientos/eliminar', json={"equipo_id": 1}).status_code == 200
+        assert _resumen() == {("2024-06", 2, "Preventivo"): 1}
@@ -0,0 +1,59 @@
+"""Importación masiva: una fila inválida solo se reporta, no corta la carga."""
+import json
+
+import pytest
+
+from app.database import db
+from app.models import Equipo
+from benchmarks.datos import crear_app_benchmark
+
+EQUIPO = {"nombre": "Regulador", "marca": "Apeks", "modelo": "XTX50", "fecha_compra": "2024-01-01",
+          "periodo_mantenimiento": 6, "estado": "Activo"}
+
+
+@pytest.fixture
+def app():
+    return crear_app_benchmark()
+
+
+def _importar(app, ruta, filas):
+    cuerpo = '\n'.join(json.dumps(fila) for fila in filas)
+    respuesta = app.test_client().post(ruta, data=cuerpo, content_type='application/x-ndjson')
+    assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+    return respuesta.get_json()
+
+
+def test_equipos_con_textos_invalidos(app):
+    reporte = _importar(app, '/equipos/importar', [
+        EQUIPO,
+        {**EQUIPO, "nombre": {"x": 1}},
+        {**EQUIPO, "marca": "M" * 51},
+        {**EQUIPO, "imagen_url": ["a"]},
+        {**EQUIPO, "codigo": 120},
+    ])
+    assert reporte["insertados"] == 2
+    assert reporte["errores"] == [
+        {"fila": 2, "error": "nombre debe ser texto"},
+        {"fila": 3, "error": "marca admite hasta 50 caracteres"},
+        {"fila": 4, "error": "imagen_url debe ser texto"},
+    ]
+    with app.app_context():
+        assert db.session.get(Equipo, 2).codigo == "120"
+
+
+def test_codigo_repetido_en_la_base_se_reporta_por_fila(app):
+    _importar(app, '/equipos/importar', [{**EQUIPO, "codigo": "A-1"}])
+    reporte = _importar(app, '/equipos/importar', [EQUIPO, {**EQUIPO, "codigo": "A-1"}, EQUIPO])
+    assert reporte["insertados"] == 2
+    assert reporte["errores"] == [{"fila": 2, "error": "El código A-1 ya existe"}]
+
+
+def test_mantenimientos_con_textos_invalidos(app):
+    _importar(app, '/equipos/importar', [EQUIPO])
+    reporte = _importar(app, '/mantenimientos/importar', [
+        {"equipo_id": 1, "tipo": "Preventivo", "fecha": "2024-05-01"},
+        {"equipo_id": 1, "tipo": "T" * 101, "fecha": "2024-05-01"},
+        {"equipo_id": 1, "tipo": "Preventivo", "fecha": "2024-05-01", "agente": 7},
+    ])
+    assert reporte["insertados"] == 1
+    assert [e["fila"] for e in reporte["errores"]] == [2, 3]
@@ -0,0 +1,40 @@
+"""Paginación por cursor: NDJSON manda el cursor siguiente igual que JSON."""
+import json
+
+import pytest
+
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def _paginas(cliente, ruta, extra, ndjson):
+    paginas, cursor = [], None
+    while True:
+        params = {"limit": 2, **extra}
+        if ndjson:
+            params["formato"] = "ndjson"
+        if cursor:
+            params["cursor"] = cursor
+        respuesta = cliente.get(ruta, query_string=params)
+        assert respuesta.status_code == 200
+        if ndjson:
+            filas = [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+        else:
+            filas = respuesta.get_json()
+        paginas.append([f["id"] for f in filas])
+        cursor = respuesta.headers.get('X-Siguiente-Cursor')
+        if cursor is None:
+            assert 'Link' not in respuesta.headers
+            return paginas
+        assert f'cursor={cursor}' in respuesta.headers['Link']
+
+
+@pytest.mark.parametrize("ruta, extra", [('/equipos', {"orden": "-nombre"}), ('/mantenimientos', {})])
+def test_ndjson_con_limite_trae_el_cursor_siguiente(ruta, extra):
+    app = crear_app_benchmark()
+    with app.app_context():
+        sembrar(5, 1)
+    cliente = app.test_client()
+
+    paginas = _paginas(cliente, ruta, extra, ndjson=True)
+    assert [len(p) for p in paginas] == [2, 2, 1]
+    assert paginas == _paginas(cliente, ruta, extra, ndjson=False)
@@ -0,0 +1,51 @@
+"""/metrics: acceso con token, formato de Prometheus y SQL de respuestas en streaming."""
+import re
+
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+TOKEN = "secreto"
+
+
+def _metricas(cliente):
+    return cliente.get('/metrics', headers={'Authorization': f'Bearer {TOKEN}'}).get_data(as_text=True)
+
+
+def test_sin_token_configurado_no_se_exponen():
+    cliente = crear_app_benchmark().test_client()
+    assert cliente.get('/metrics').status_code == 404
+    assert cliente.get('/metrics/consultas-lentas').status_code == 404
+
+
+def test_piden_el_token():
+    cliente = crear_app_benchmark(METRICAS_TOKEN=TOKEN).test_client()
+    for ruta in ('/metrics', '/metrics/consultas-lentas'):
+        assert cliente.get(ruta).status_code == 401
+        assert cliente.get(ruta, headers={'Authorization': 'Bearer otro'}).status_code == 401
+        assert cliente.get(ruta, headers={'Authorization': f'Bearer {TOKEN}'}).status_code == 200
+
+
+def test_cada_metrica_tiene_help_y_type():
+    cliente = crear_app_benchmark(METRICAS_TOKEN=TOKEN).test_client()
+    cliente.get('/dashboard/estados')
+    lineas = _metricas(cliente).splitlines()
+    for i, linea in enumerate(lineas):
+        if linea.startswith('# TYPE '):
+            nombre = linea.split()[2]
+            assert lineas[i - 1].startswith(f'# HELP {nombre} '), nombre
+
+
+def test_sql_del_streaming_se_cuenta_al_cerrar():
+    app = crear_app_benchmark(METRICAS_TOKEN=TOKEN)
+    with app.app_context():
+        sembrar(50, 0)
+    cliente = app.test_client()
+
+    # La exportación ejecuta sus consultas mientras genera el cuerpo
+    respuesta = cliente.get('/equipos/exportar?formato=csv')
+    # Server-Timing sale con las cabeceras: solo ve las consultas previas
+    antes = int(re.search(r'"(\d+) consultas"', respuesta.headers['Server-Timing']).group(1))
+    assert respuesta.status_code == 200 and respuesta.get_data(as_text=True).count('\n') == 51
+    respuesta.close()
+
+    encontrado = re.search(r'buceo_sql_statements_total\{endpoint="/equipos/exportar"\} (\d+)', _metricas(cliente))
+    assert int(encontrado.group(1)) > antes
@@ -0,0 +1,78 @@
+"""Las migraciones deben crear desde cero el esquema de los modelos."""
+from pathlib import Path
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect, text
+
+from app import create_app
+from app.database import db
+from benchmarks.datos import ConfigBenchmark
+
+MIGRACIONES = str(Path(__file__).resolve().parents[1] / 'migrations')
+# Tablas que crean las migraciones sin modelo (índice FTS5 de SQLite)
+SIN_MODELO = 'equipos_busqueda'
+
+pytestmark = [
+    pytest.mark.filterwarnings("ignore:.*expression-based index"),
+    pytest.mark.filterwarnings("ignore:'get_engine' is deprecated"),
+]
+
+
+@pytest.fixture
+def app(tmp_path):
+    config = type("ConfigMigraciones", (ConfigBenchmark,), {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'vacia.db'}",
+    })
+    return create_app(config)
+
+
+def _diferencias():
+    with db.engine.connect() as conexion:
+        diferencias = compare_metadata(MigrationContext.configure(conexion), db.metadata)
+    return [d for d in diferencias if not (d[0] == 'remove_table' and d[1].name.startswith(SIN_MODELO))]
+
+
+def test_upgrade_en_base_vacia(app):
+    with app.app_context():
+        upgrade(directory=MIGRACIONES)
+        assert _diferencias() == []
+
+    cliente = app.test_client()
+    respuesta = cliente.post('/equipos', json={
+        "nombre": "Regulador", "marca": "Apeks", "modelo": "XTX50", "fecha_compra": "2024-01-01",
+        "periodo_mantenimiento": "6", "estado": "Activo",
+    })
+    assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+    # Base recién creada: es el equipo 1
+    respuesta = cliente.post('/mantenimientos', json={"equipo_id": 1, "tipo": "Preventivo", "fecha": "2024-05-01"})
+    assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+
+
+def test_downgrade_hasta_base(app):
+    with app.app_context():
+        upgrade(directory=MIGRACIONES)
+        downgrade(directory=MIGRACIONES, revision='base')
+        assert inspect(db.engine).get_table_names() == ['alembic_version']
+
+
+def test_autoincrement_parte_del_mayor_id_archivado(app):
+    with app.app_context():
+        upgrade(directory=MIGRACIONES, revision='7a4c2e9b1d35')
+        db.session.execute(text(
+            "INSERT INTO equipos (id, codigo, nombre) VALUES (1, '1', 'Regulador')"))
+        db.session.execute(text(
+            "INSERT INTO mantenimientos (id, tipo, fecha, equipo_id) VALUES (1, 'Preventivo', '2024-05-01', 1)"))
+        db.session.execute(text(
+            "INSERT INTO mantenimientos_archivo (id, tipo, fecha, equipo_id) VALUES (7, 'Preventivo', '2019-05-01', 1)"))
+        db.session.commit()
+
+        upgrade(directory=MIGRACIONES)
+        assert 'AUTOINCREMENT' in db.session.execute(text(
+            "SELECT sql FROM sqlite_master WHERE name = 'mantenimientos'")).scalar()
+
+    respuesta = app.test_client().post('/mantenimientos', json={"equipo_id": 1, "tipo": "Preventivo", "fecha": "2024-06-01"})
+    assert respuesta.status_code == 201, respuesta.get_data(as_text=True)
+    assert respuesta.get_json()["id"] == 8
@@ -0,0 +1,15 @@
+"""Las consultas frecuentes deben usar sus índices (EXPLAIN QUERY PLAN)."""
+from benchmarks.datos import crear_app_benchmark
+from benchmarks.planes_consulta import consultas, plan_de, preparar
+
+
+def test_consultas_usan_indices():
+    app = crear_app_benchmark()
+    with app.app_context():
+        preparar()
+        fallos = {}
+        for nombre, (consulta, indices) in consultas().items():
+            plan, faltan = plan_de(consulta, indices)
+            if faltan:
+                fallos[nombre] = (faltan, plan)
+    assert not fallos, fallos
@@ -0,0 +1,70 @@
+"""recalcular_lote debe dar lo mismo que recalcular_fechas equipo por equipo."""
+from datetime import date
+
+from sqlalchemy import select
+
+from app.database import db
+from app.models import Equipo, Mantenimiento, MantenimientoArchivado
+from app.servicios import recalcular_fechas, recalcular_lote
+from benchmarks.datos import crear_app_benchmark
+
+HOY = date(2024, 6, 15)
+
+# (fecha_compra, periodo, mantenimientos, archivados)
+CASOS = [
+    (date(2024, 1, 31), 1, [], []),                                  # fin de mes: 29/02
+    (date(2023, 8, 31), 6, [date(2023, 11, 30)], []),                 # 30/11 + 6 = 30/05
+    (date(2020, 2, 29), 12, [], []),                                  # bisiesto: 28/02
+    (date(2022, 3, 1), 0, [date(2024, 1, 10)], []),                   # periodo 0: sin estimar
+    (date(2022, 3, 1), None, [date(2024, 1, 10)], []),                # sin periodo
+    (None, 6, [], []),                                                # sin compra ni historial
+    (date(2022, 3, 1), 3, [date(2024, 5, 31), date(2024, 7, 2)], []),  # próximo programado
+    (date(2015, 5, 5), 6, [date(2024, 9, 1)], [date(2016, 8, 31)]),   # último en el archivo
+    (date(2015, 5, 5), 6, [], [date(2016, 8, 31), date(2017, 1, 31)]),
+]
+
+
+def _sembrar():
+    for i, (compra, periodo, fechas, archivadas) in enumerate(CASOS, start=1):
+        db.session.add(Equipo(id=i, codigo=str(i), nombre=f"Equipo {i}", fecha_compra=compra,
+                              periodo_mantenimiento=periodo, ultimo_mantenimiento=date(2000, 1, 1)))
+        db.session.flush()
+        db.session.add_all(Mantenimiento(equipo_id=i, tipo="Preventivo", fecha=f) for f in fechas)
+        db.session.add_all(MantenimientoArchivado(id=1000 * i + n, equipo_id=i, tipo="Preventivo", fecha=f)
+                           for n, f in enumerate(archivadas))
+    db.session.commit()
+
+
+def _fechas():
+    return db.session.execute(
+        select(Equipo.id, Equipo.ultimo_mantenimiento, Equipo.proximo_mantenimiento).order_by(Equipo.id)
+    ).all()
+
+
+def test_lote_coincide_con_recalculo_por_equipo():
+    app = crear_app_benchmark()
+    with app.app_context():
+        _sembrar()
+        # Lotes de 4: el último queda incompleto
+        desde, revisados, simuladas = 0, 0, []
+        while desde is not None:
+            desde, cantidad, diferencias = recalcular_lote(desde, HOY, 4, aplicar=False)
+            revisados += cantidad
+            simuladas += diferencias
+        assert revisados == len(CASOS)
+
+        desde, aplicadas = 0, []
+        while desde is not None:
+            desde, _, diferencias = recalcular_lote(desde, HOY, 4)
+            aplicadas += diferencias
+        db.session.commit()
+        assert aplicadas == simuladas
+        en_lote = _fechas()
+
+        for equipo in db.session.execute(select(Equipo)).scalars():
+            recalcular_fechas(equipo, HOY)
+        assert _fechas() == en_lote
+        assert [d.id for d in aplicadas] == list(range(1, len(CASOS) + 1))
+
+        _, _, pendientes = recalcular_lote(0, HOY, 100, aplicar=False)
+        assert pendientes == []
@@ -0,0 +1,50 @@
+"""Lecturas en la réplica, escrituras en la primaria y leer lo propio."""
+import pytest
+
+from app.replicas import COOKIE_PRIMARIA
+from benchmarks.replica import EQUIPO_NUEVO, LECTURAS, contar_por_base, crear_app_con_replica, replicar
+
+EQUIPOS = 50
+
+
+@pytest.fixture
+def replica(tmp_path):
+    return crear_app_con_replica(str(tmp_path), EQUIPOS, DASHBOARD_CACHE_TTL=0)
+
+
+@pytest.mark.parametrize("url", LECTURAS)
+def test_lecturas_van_a_la_replica(replica, url):
+    app, _, _ = replica
+    cliente = app.test_client()
+    en_primaria, en_replica = contar_por_base(app, lambda: cliente.get(url))
+    assert (en_primaria, en_replica > 0) == (0, True)
+
+
+def test_escrituras_van_a_la_primaria(replica):
+    app, _, _ = replica
+    cliente = app.test_client()
+    en_primaria, en_replica = contar_por_base(app, lambda: cliente.post('/equipos', json=EQUIPO_NUEVO))
+    assert (en_primaria > 0, en_replica) == (True, 0)
+
+
+def test_quien_escribe_lee_lo_propio(replica):
+    app, primaria, copia = replica
+    lector, escritor = app.test_client(), app.test_client()
+    assert escritor.post('/equipos', json=EQUIPO_NUEVO).status_code == 201
+    assert escritor.get_cookie(COOKIE_PRIMARIA) is not None
+
+    # Sin replicar todavía: el escritor va a la primaria, el resto a la réplica
+    assert escritor.get('/dashboard/equipos-resumen').get_json()["total"] == EQUIPOS + 1
+    assert lector.get('/dashboard/equipos-resumen').get_json()["total"] == EQUIPOS
+    replicar(app, primaria, copia)
+    assert lector.get('/dashboard/equipos-resumen').get_json()["total"] == EQUIPOS + 1
+
+
+def test_cache_del_dashboard_no_mezcla_replica_y_primaria(tmp_path):
+    app, _, _ = crear_app_con_replica(str(tmp_path), EQUIPOS)
+    lector, escritor = app.test_client(), app.test_client()
+    # El lector llena la caché con lo que ve la réplica
+    assert lector.get('/dashboard/equipos-resumen').get_json()["total"] == EQUIPOS
+    assert escritor.post('/equipos', json=EQUIPO_NUEVO).status_code == 201
+    assert escritor.get('/dashboard/equipos-resumen').get_json()["total"] == EQUIPOS + 1
+    assert lector.get('/dashboard/equipos-resumen').get_json()["total"] == EQUIPOS
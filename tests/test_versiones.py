@@ -0,0 +1,35 @@
+"""El contador de versión repartido en fragmentos sube 1 por commit."""
+from sqlalchemy import select
+
+from app.database import db
+from app.models import Contador
+from app.versiones import leer_versiones
+from benchmarks.datos import crear_app_benchmark, sembrar
+
+
+def test_la_version_es_la_suma_de_los_fragmentos():
+    app = crear_app_benchmark(VERSIONES_FRAGMENTOS=4)
+    cliente = app.test_client()
+    with app.app_context():
+        sembrar(1, 0)
+        inicial, mantenimientos = leer_versiones(['equipos', 'mantenimientos'])
+        etag = cliente.get('/equipos/1').headers['ETag']
+
+        for n in range(1, 21):
+            assert cliente.put('/equipos/1', json={"modelo": f"M{n}"}).status_code == 200
+            assert leer_versiones(['equipos', 'mantenimientos']) == [inicial + n, mantenimientos]
+            respuesta = cliente.get('/equipos/1', headers={'If-None-Match': etag})
+            assert respuesta.status_code == 200 and respuesta.json["modelo"] == f"M{n}"
+            etag = respuesta.headers['ETag']
+        assert cliente.get('/equipos/1', headers={'If-None-Match': etag}).status_code == 304
+
+        fragmentos = db.session.execute(
+            select(Contador.nombre).where(Contador.nombre.like('version:equipos%'))
+        ).scalars().all()
+        assert 1 < len(fragmentos) <= 4
+
+    # Con menos fragmentos configurados se siguen sumando las filas que ya había
+    app.config['VERSIONES_FRAGMENTOS'] = 1
+    with app.app_context():
+        assert cliente.put('/equipos/1', json={"modelo": "final"}).status_code == 200
+        assert leer_versiones(['equipos']) == [inicial + 21]